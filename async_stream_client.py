@@ -0,0 +1,415 @@
+"""
+asyncio-native variant of ``WeightedStreamClient``.
+
+A single event loop runs audio capture, the AssemblyAI websocket and keyword
+emission, so many sessions can share one loop and one process instead of
+running a thread trio each. Callbacks (``on_keywords``, ``on_transcript``,
+``on_final``, ``stream_id_provider``) behave exactly as in the thread-based
+client and run on the loop, so they must not block.
+
+Usage:
+    import asyncio
+    from async_stream_client import AsyncWeightedStreamClient
+    asyncio.run(AsyncWeightedStreamClient().run())
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Optional, Set
+
+from capture_ring import CaptureRing
+from weighted_audio_stream import (
+    FORMAT,
+    FRAMES_PER_BUFFER,
+    SAMPLE_RATE,
+    Keywords,
+    WeightedStreamClient,
+    assemblyai_api_key,
+    capture_format,
+)
+
+if TYPE_CHECKING:
+    import pyaudio
+    from websockets.asyncio.client import ClientConnection
+
+
+class MicrophoneSource:
+    """
+    Callback-mode PyAudio capture into a ``capture_ring.CaptureRing``.
+
+    The device is opened at its native rate and channel count
+    (``capture_format``); PyAudio's callback thread converts each buffer to
+    16 kHz mono with ``audio_dsp.Resampler``, copies the 50ms frames into the
+    ring of ``max_frames`` slots and wakes the loop. Iterating yields
+    zero-copy views of the ring, each released when the sender asks for the
+    next one. When the sender falls behind, the oldest unsent frame is dropped
+    so capture never blocks; ``stats()`` has the counters.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_frames: int = 40,
+        audio: Optional[pyaudio.PyAudio] = None,
+        input_device_index: Optional[int] = None,
+    ):
+        self.max_frames = max_frames
+        self.input_device_index = input_device_index
+        self.ring = CaptureRing(FRAMES_PER_BUFFER * 2, capacity=max_frames)
+        self._audio = audio
+        self._owns_audio = audio is None
+        self._stream = None
+        self._pyaudio = None
+        self._resampler = None
+        self._ready: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def dropped_frames(self) -> int:
+        return self.ring.dropped_frames
+
+    @property
+    def overflows(self) -> int:
+        return self.ring.overflows
+
+    def stats(self) -> Dict:
+        return self.ring.stats()
+
+    def __aiter__(self) -> AsyncIterator[memoryview]:
+        return self._frames()
+
+    async def _frames(self) -> AsyncIterator[memoryview]:
+        self._open()
+        while True:
+            frame = self.ring.get(timeout=0)
+            if frame is None:
+                self._ready.clear()
+                if not self.ring.depth:  # a frame may have landed before the clear
+                    await self._ready.wait()
+                continue
+            try:
+                yield frame
+            finally:
+                self.ring.release()
+
+    def _open(self) -> None:
+        import pyaudio
+
+        from audio_dsp import Resampler
+
+        self._pyaudio = pyaudio
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+        rate, channels = capture_format(self._audio, self.input_device_index)
+        self._resampler = Resampler(rate, SAMPLE_RATE, channels)
+        try:
+            self._stream = self._audio.open(
+                input=True,
+                frames_per_buffer=rate * FRAMES_PER_BUFFER // SAMPLE_RATE,
+                channels=channels,
+                format=FORMAT,
+                rate=rate,
+                input_device_index=self.input_device_index,
+                stream_callback=self._on_audio,
+            )
+        except Exception as exc:
+            self.close()
+            raise RuntimeError(f"Unable to open microphone: {exc}") from exc
+
+    def _on_audio(self, in_data, _frame_count, _time_info, status):
+        if status & self._pyaudio.paInputOverflow:
+            self.ring.note_overflow()
+        frames = self._resampler.process(in_data)
+        for frame in frames:
+            self.ring.write(frame)
+        if frames:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        return None, self._pyaudio.paContinue
+
+    def close(self) -> None:
+        if self._stream:
+            if self._stream.is_active():
+                self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio and self._owns_audio:
+            self._audio.terminate()
+            self._audio = None
+
+
+class _AsyncSession:
+    """One AssemblyAI websocket of an ``AsyncWeightedStreamClient``; mirrors ``weighted_audio_stream._Session``."""
+
+    def __init__(self, number: int):
+        self.number = number
+        self.ws: Optional[ClientConnection] = None
+        self.receiver: Optional[asyncio.Task] = None
+        self.begun = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.expires_at: Optional[float] = None
+        self.rotate_at: Optional[float] = None
+        self.retiring = False
+        self.replayed_after: Optional[str] = None
+
+
+class AsyncWeightedStreamClient(WeightedStreamClient):
+    """
+    ``WeightedStreamClient`` driven by coroutines on one event loop.
+
+    ``audio_source`` is any async iterable of 16 kHz mono PCM16 chunks (such as
+    ``wav_source.WavFileSource``); it defaults to a ``MicrophoneSource``. Cancelling ``run()`` or calling ``stop()``
+    sends ``Terminate``, waits briefly for the server to close, and releases audio.
+    Reconnects, audio replay and rotation work as in the thread-based client;
+    failing to open the first session raises.
+    """
+
+    def __init__(self, *, terminate_timeout: float = 2.0, **kwargs):
+        super().__init__(**kwargs)
+        self.terminate_timeout = terminate_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._live: Set[_AsyncSession] = set()
+
+    def start(self):
+        asyncio.run(self.run())
+
+    def stop(self) -> None:
+        """Request shutdown; safe to call from any thread."""
+        self.stop_event.set()
+        if self._loop and self._stopping:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def run(self) -> None:
+        api_key = assemblyai_api_key()
+        if not api_key:
+            raise RuntimeError("API_KEY missing. Please set it in your environment.")
+        if self.daydream_enabled and not self.daydream_key:
+            print("[daydream] disabling automatic updates: DAYDREAM_API_KEY missing.")
+            self.daydream_enabled = False
+
+        self._api_key = api_key
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._changed = asyncio.Event()
+        self._uplink_lock = asyncio.Lock()
+        self._has_active = asyncio.Event()
+        self._turn_ended = asyncio.Event()
+        self.stop_event.clear()
+        source = self.audio_source if self.audio_source is not None else MicrophoneSource()
+        if isinstance(source, MicrophoneSource):
+            self.capture = source.ring
+        try:
+            session = await self._connect()
+            if session is None:
+                raise RuntimeError(f"Unable to start an AssemblyAI session at {self.api_endpoint}")
+            await self._activate(session)
+            await self._run_sessions(session, source)
+        finally:
+            self.stop_event.set()
+            close = getattr(source, "close", None)
+            if close:
+                close()
+            self._report_audio()
+            print("Clean exit.")
+
+    async def _run_sessions(self, session: "_AsyncSession", source) -> None:
+        supervisor = asyncio.create_task(self._supervise(session), name="assemblyai-session")
+        sender = asyncio.create_task(self._send(source), name="audio-send")
+        emitter = asyncio.create_task(self._emit_task(), name="keyword-emit")
+        stopper = asyncio.create_task(self._stopping.wait(), name="stop-wait")
+        try:
+            await asyncio.wait({supervisor, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.stop_event.set()
+            for task in (sender, stopper, emitter, supervisor):
+                task.cancel()
+            active = self._active
+            if active is not None and not active.closed.is_set():
+                await self._retire(active)
+                try:
+                    await asyncio.wait_for(active.closed.wait(), self.terminate_timeout)
+                except asyncio.TimeoutError:
+                    pass
+            for live in list(self._live):
+                await live.ws.close()
+            results = await asyncio.gather(sender, stopper, emitter, supervisor, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
+                    print(f"Stream task error: {result}")
+
+    async def _supervise(self, session: "_AsyncSession") -> None:
+        """Async twin of ``WeightedStreamClient._supervise``."""
+        while session is not None:
+            if session.closed.is_set():
+                if session.retiring or not self.reconnect:
+                    return
+                print(f"[ws] session {session.number} dropped; reconnecting.")
+                self.reconnects += 1
+                session = await self._reopen()
+            elif session.rotate_at is not None and time.time() >= session.rotate_at and not session.retiring:
+                session = await self._rotate(session)
+            else:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(session.closed.wait(), 0.25)
+
+    async def _reopen(self) -> Optional["_AsyncSession"]:
+        while True:
+            session = await self._connect()
+            if session is not None and await self._activate(session):
+                self.backoff.reset()
+                if self._source_done.is_set():
+                    await self._retire(session)
+                return session
+            delay = self.backoff.next()
+            print(f"[ws] connecting failed; retrying in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+
+    async def _rotate(self, session: "_AsyncSession") -> "_AsyncSession":
+        print(f"[ws] session {session.number} expires in {session.expires_at - time.time():.0f}s; rotating.")
+        successor = await self._connect()
+        if successor is None:
+            session.rotate_at = time.time() + self.backoff.next()
+            return session
+        self._turn_ended.clear()
+        handover = min(self.rotate_before_expiry / 2.0, session.expires_at - time.time())
+        waits = [asyncio.ensure_future(event.wait()) for event in (self._turn_ended, session.closed, successor.closed)]
+        await asyncio.wait(waits, timeout=max(0.0, handover), return_when=asyncio.FIRST_COMPLETED)
+        for waiter in waits:
+            waiter.cancel()
+        if successor.closed.is_set() or not await self._activate(successor):
+            session.rotate_at = time.time() + self.backoff.next()
+            return session
+        self.backoff.reset()
+        self.rotations += 1
+        if self._source_done.is_set() and not successor.retiring:
+            await self._retire(successor)  # the source ran out during the handover
+        return successor
+
+    async def _connect(self, timeout: float = 10.0) -> Optional["_AsyncSession"]:
+        from websockets.asyncio.client import connect
+
+        session = _AsyncSession(self._sessions)
+        self._sessions += 1
+        try:
+            session.ws = await asyncio.wait_for(
+                connect(self.api_endpoint, additional_headers={"Authorization": self._api_key}), timeout
+            )
+        except Exception as exc:  # noqa: BLE001
+            print(f"[ws] connecting session {session.number} failed: {exc}")
+            return None
+        print("Connected to AssemblyAI streaming endpoint.")
+        self._live.add(session)
+        session.receiver = asyncio.create_task(self._receive(session), name=f"assemblyai-recv-{session.number}")
+        waits = [asyncio.ensure_future(session.begun.wait()), asyncio.ensure_future(session.closed.wait())]
+        await asyncio.wait(waits, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in waits:
+            waiter.cancel()
+        if not session.begun.is_set():
+            await session.ws.close()
+            return None
+        if session.expires_at is not None:
+            session.rotate_at = session.expires_at - self.rotate_before_expiry
+        return session
+
+    async def _activate(self, session: "_AsyncSession") -> bool:
+        async with self._uplink_lock:
+            payloads = self.replay.payloads()
+            try:
+                for payload in payloads:
+                    await session.ws.send(payload)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[ws] replay into session {session.number} failed: {exc}")
+                return False
+            previous, self._active = self._active, session
+            self._hand_over(session, bool(payloads))
+            self._has_active.set()
+        if payloads:
+            print(f"[ws] session {session.number}: replayed {len(payloads) * self.replay.chunk_bytes / self.replay.bytes_per_second:.1f}s of audio.")
+        if previous is not None and not previous.closed.is_set():
+            await self._retire(previous)
+        return True
+
+    async def _retire(self, session: "_AsyncSession") -> None:
+        session.retiring = True
+        with contextlib.suppress(Exception):
+            await session.ws.send(json.dumps({"type": "Terminate"}))
+
+    async def _send(self, source) -> None:
+        # ws.send waits for the transport to drain, which back-pressures the source
+        async for chunk in source:
+            for payload in self._uplink(chunk):
+                await self._send_audio(payload)
+        print("Audio source exhausted.")
+        self._source_done.set()
+        if self._active is not None:
+            await self._retire(self._active)
+
+    async def _send_audio(self, payload) -> None:
+        while True:
+            await self._has_active.wait()
+            async with self._uplink_lock:
+                session = self._active
+                if session is None:
+                    continue
+                self.replay.append(payload)
+            # send outside the lock: a stalled socket must not hold up _activate
+            try:
+                await session.ws.send(payload)
+            except Exception:  # noqa: BLE001
+                # replayed into the next session by the supervisor
+                self._drop_active(session)
+            return
+
+    def _drop_active(self, session: "_AsyncSession") -> None:
+        if self._active is session:
+            self._active = None
+            self._has_active.clear()
+
+    async def _receive(self, session: "_AsyncSession") -> None:
+        try:
+            async for message in session.ws:
+                self._on_message(session.ws, message, session)
+        except Exception as exc:  # noqa: BLE001
+            print(f"WebSocket error: {exc}")
+        finally:
+            self._live.discard(session)
+            self._drop_active(session)
+            session.closed.set()
+            print("WebSocket closed.")
+
+    async def _emit_task(self) -> None:
+        while True:
+            self.segmenter.flush_if_idle()
+            if self.emit_mode == "push":
+                try:
+                    await asyncio.wait_for(self._changed.wait(), self.refresh_interval)
+                except asyncio.TimeoutError:
+                    continue
+                delay = max(self.debounce_seconds, self._last_emit_at + self.min_emit_interval - time.monotonic())
+                await asyncio.sleep(delay)
+                self._changed.clear()
+                self._emit(self.tracker.current_keywords())
+            else:
+                version = self.tracker.snapshot_version
+                if version != self._emitted_version:
+                    self._emitted_version = version
+                    self._emit(self.tracker.current_keywords())
+                await asyncio.sleep(self.refresh_interval)
+
+    def _on_keywords_changed(self, keywords: Keywords):
+        if self._changed is not None and self.change_filter.is_material(self._emitted_keywords, keywords):
+            self._changed.set()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(AsyncWeightedStreamClient().run())
+    except KeyboardInterrupt:
+        print("\nStopping stream...")
@@ -0,0 +1,263 @@
+"""
+Vectorized NumPy stages for the audio uplink, between ``stream.read`` and ``ws.send``.
+
+``EnergyVAD`` gates silence out of the stream: per-10ms RMS energy against an
+adaptive noise floor, with hangover after speech and a short pre-roll before it.
+All timing is in audio time (samples seen), so a replayed file gates the same
+way at any speed. ``mulaw_encode`` turns PCM16 into 8-bit G.711 μ-law
+(``encoding=pcm_mulaw``) with one table lookup per buffer, halving the uplink.
+``Resampler`` turns native-rate multichannel capture into 16 kHz mono 50ms
+frames with a streaming polyphase filter.
+
+Usage:
+    vad = EnergyVAD()
+    for chunk in chunks:
+        for payload in vad.feed(chunk):
+            ws.send(payload)
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+
+ENCODINGS = ("pcm_s16le", "pcm_mulaw")
+
+
+def _mulaw_tables():
+    # G.711 on the top 14 bits, as in the reference g711.c (and audioop.lin2ulaw):
+    # bias 0x21, clip 8159, 3-bit segment + 4-bit mantissa, bits inverted
+    samples = np.arange(-32768, 32768, dtype=np.int32)
+    coarse = samples >> 2
+    mask = np.where(coarse < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(coarse), 8159) + 0x21
+    segment = np.searchsorted(np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), magnitude)
+    mantissa = (magnitude >> (segment + 1)) & 0x0F
+    encode = np.empty(65536, dtype=np.uint8)
+    code = np.where(segment > 7, 0x7F, (segment << 4) | mantissa)  # saturate past the last segment
+    encode[samples & 0xFFFF] = code ^ mask
+
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    magnitude = (((codes & 0x0F) << 3) + 0x84) << ((codes >> 4) & 0x07)
+    decode = np.where(codes & 0x80, 0x84 - magnitude, magnitude - 0x84).astype(np.int16)
+    return encode, decode
+
+
+MULAW_ENCODE, MULAW_DECODE = _mulaw_tables()  # indexed by the uint16 view of a sample / by the code byte
+
+
+def mulaw_encode(chunk: bytes) -> bytes:
+    """16-bit little-endian PCM to one μ-law byte per sample."""
+    return MULAW_ENCODE[np.frombuffer(chunk, dtype="<u2")].tobytes()
+
+
+def mulaw_decode(data: bytes) -> bytes:
+    return MULAW_DECODE[np.frombuffer(data, dtype=np.uint8)].astype("<i2").tobytes()
+
+
+class EnergyVAD:
+    """
+    Energy gate for 16-bit mono PCM.
+
+    A chunk is speech when its loudest 10ms window is ``threshold_db`` above the
+    noise floor and above ``min_rms_db`` (dBFS). The floor follows the quietest
+    window of non-speech chunks, falling fast and rising slowly (``floor_rise``
+    per chunk). After speech, ``hangover_seconds`` of audio still goes out so
+    trailing words reach the recognizer; on onset the last ``preroll_seconds``
+    of suppressed audio is sent first. For ``turn_silence_seconds`` after the
+    hangover every chunk is replaced by digital silence of the same length, so
+    the recognizer's silence-based end of turn (AssemblyAI's
+    ``max_turn_silence``, 2.4 s by default) fires as it would without the
+    gate. After that a 50ms block of silence goes out every
+    ``keepalive_seconds`` of audio to keep the session open.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = 16000,
+        threshold_db: float = 10.0,
+        min_rms_db: float = -50.0,
+        hangover_seconds: float = 0.6,
+        preroll_seconds: float = 0.1,
+        keepalive_seconds: float = 0.5,
+        turn_silence_seconds: float = 2.4,
+        floor_rise: float = 0.02,
+        window_ms: float = 10.0,
+    ):
+        self.sample_rate = sample_rate
+        self.ratio = 10.0 ** (threshold_db / 20.0)
+        self.min_rms = 10.0 ** (min_rms_db / 20.0)
+        self.hangover_seconds = hangover_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.turn_silence_seconds = turn_silence_seconds
+        self.floor_rise = floor_rise
+        self.window = max(1, int(sample_rate * window_ms / 1000.0))
+        self.keepalive = bytes(int(sample_rate * 0.05) * 2)
+        self.noise_floor: Optional[float] = None
+        self.seconds = 0.0
+        self.suppressed_seconds = 0.0
+        self.keepalives = 0
+        self.silence_seconds = 0.0
+        self._silence = self.keepalive
+        self._preroll: deque = deque()
+        self._preroll_seconds = preroll_seconds
+        self._preroll_held = 0.0
+        self._active_until = -1.0
+        self._last_sent = 0.0
+
+    @property
+    def suppressed_fraction(self) -> float:
+        return self.suppressed_seconds / self.seconds if self.seconds else 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.seconds <= self._active_until
+
+    def stats(self) -> dict:
+        return {
+            "audio_seconds": self.seconds,
+            "suppressed_seconds": self.suppressed_seconds,
+            "suppressed_fraction": self.suppressed_fraction,
+            "keepalives": self.keepalives,
+            "silence_seconds": self.silence_seconds,
+            "noise_floor_db": 20.0 * np.log10(self.noise_floor) if self.noise_floor else None,
+        }
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Payloads to send for ``chunk``: nothing, the chunk (after any pre-roll), silence or a keep-alive."""
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        duration = len(samples) / self.sample_rate
+        self.seconds += duration
+        usable = len(samples) - len(samples) % self.window
+        if usable:
+            frames = samples[:usable].astype(np.float32).reshape(-1, self.window) / 32768.0
+            rms = np.sqrt(np.mean(frames * frames, axis=1))
+            loud, quiet = float(rms.max()), float(rms.min())
+        else:
+            loud = quiet = 0.0
+        if self.noise_floor is None:
+            self.noise_floor = max(quiet, 1e-6)
+
+        if loud > max(self.noise_floor * self.ratio, self.min_rms):
+            self._active_until = self.seconds + self.hangover_seconds
+        elif quiet < self.noise_floor:
+            self.noise_floor = max(quiet, 1e-6)
+        else:
+            self.noise_floor += self.floor_rise * (quiet - self.noise_floor)
+
+        if self.active:
+            payloads = list(self._preroll) + [chunk]
+            self._preroll.clear()
+            self.suppressed_seconds -= self._preroll_held
+            self._preroll_held = 0.0
+            self._last_sent = self.seconds
+            return payloads
+
+        self.suppressed_seconds += duration
+        self._preroll.append(chunk if isinstance(chunk, bytes) else bytes(chunk))  # views are reused once sent
+        self._preroll_held += duration
+        while self._preroll and self._preroll_held - len(self._preroll[0]) / 2 / self.sample_rate >= self._preroll_seconds:
+            self._preroll_held -= len(self._preroll.popleft()) / 2 / self.sample_rate
+        if self._active_until >= 0 and self.seconds - duration < self._active_until + self.turn_silence_seconds:
+            # the recognizer ends the turn on received silence: give it the full pause, counted
+            # from the end of the hangover in case it heard speech the gate did not
+            size = len(samples) * 2
+            if len(self._silence) != size:
+                self._silence = bytes(size)
+            self._last_sent = self.seconds
+            self.silence_seconds += duration
+            return [self._silence]
+        if self.seconds - self._last_sent >= self.keepalive_seconds:
+            self._last_sent = self.seconds
+            self.keepalives += 1
+            return [self.keepalive]
+        return []
+
+
+class Resampler:
+    """
+    Streaming downmix + rational-ratio polyphase resampler for interleaved PCM16.
+
+    The ratio ``output_rate / input_rate`` is reduced to ``up / down`` and a
+    Kaiser-windowed sinc low-pass (flat to 0.8 x the lower Nyquist, at least
+    ``attenuation_db`` down from the Nyquist) is split into ``up`` phases. Each chunk
+    is downmixed by averaging channels, then every output sample is one dot
+    product of ``taps_per_phase`` inputs with its phase's taps, all in one
+    vectorized gather. The filter history and the phase carry over between
+    chunks, so chunked output equals resampling the whole signal at once.
+    ``process`` returns complete ``frame_samples`` frames (50ms at 16 kHz).
+    """
+
+    def __init__(
+        self,
+        input_rate: int,
+        output_rate: int = 16000,
+        channels: int = 1,
+        *,
+        frame_samples: int = 800,
+        attenuation_db: float = 70.0,
+    ):
+        divisor = math.gcd(int(input_rate), int(output_rate))
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        self.channels = channels
+        self.up = self.output_rate // divisor
+        self.down = self.input_rate // divisor
+        self.frame_bytes = frame_samples * 2
+        self.passthrough = self.up == self.down
+        if not self.passthrough:
+            self.taps = self._design(attenuation_db)
+            self.taps_per_phase = self.taps.shape[1]
+            self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        self._position = 0  # next output sample, in upsampled units from the start of the next chunk
+        self._pending = b""
+
+    def _design(self, attenuation_db: float) -> np.ndarray:
+        nyquist = 0.5 * min(self.input_rate, self.output_rate)
+        upsampled_rate = self.input_rate * self.up
+        cutoff = 0.9 * nyquist / upsampled_rate  # cycles per upsampled sample
+        transition = 0.2 * nyquist / upsampled_rate
+        # Kaiser's estimates for length and beta
+        length = math.ceil((attenuation_db - 8.0) / (2.285 * 2.0 * math.pi * transition)) + 1
+        taps_per_phase = max(2, math.ceil(length / self.up))
+        length = taps_per_phase * self.up
+        if attenuation_db > 50:
+            beta = 0.1102 * (attenuation_db - 8.7)
+        else:
+            beta = 0.5842 * max(attenuation_db - 21, 0) ** 0.4 + 0.07886 * max(attenuation_db - 21, 0)
+        n = np.arange(length) - (length - 1) / 2.0
+        prototype = 2.0 * cutoff * np.sinc(2.0 * cutoff * n) * np.kaiser(length, beta) * self.up
+        # phase p uses taps p, p + up, p + 2 up, ...: row p of the (taps_per_phase x up) reshape, transposed
+        return prototype.reshape(taps_per_phase, self.up).T.astype(np.float32).copy()
+
+    def process(self, chunk: bytes) -> List[bytes]:
+        """Complete output frames (PCM16 mono at ``output_rate``) available after ``chunk``."""
+        samples = np.frombuffer(chunk, dtype="<i2")
+        if self.channels > 1:
+            samples = samples[: len(samples) - len(samples) % self.channels].reshape(-1, self.channels).mean(axis=1)
+        if self.passthrough:
+            converted = samples.astype("<i2").tobytes() if self.channels > 1 else chunk
+        else:
+            converted = self._resample(samples.astype(np.float32))
+        data = self._pending + converted
+        cut = len(data) - len(data) % self.frame_bytes
+        self._pending = data[cut:]
+        return [data[offset : offset + self.frame_bytes] for offset in range(0, cut, self.frame_bytes)]
+
+    def _resample(self, samples: np.ndarray) -> bytes:
+        span = len(samples) * self.up
+        positions = np.arange(self._position, span, self.down)
+        self._position = (positions[-1] + self.down - span) if len(positions) else self._position - span
+        if not len(positions):
+            self._history = np.concatenate((self._history, samples))[-(self.taps_per_phase - 1) :]
+            return b""
+        buffer = np.concatenate((self._history, samples))
+        newest = positions // self.up + self.taps_per_phase - 1  # index in buffer of the newest input per output
+        window = newest[:, None] - np.arange(self.taps_per_phase)[None, :]
+        output = np.einsum("ij,ij->i", buffer[window], self.taps[positions % self.up])
+        self._history = buffer[-(self.taps_per_phase - 1) :]
+        return np.clip(np.rint(output), -32768, 32767).astype("<i2").tobytes()
@@ -0,0 +1 @@
+"""Micro-benchmarks for the Mindstream pipeline. Run each with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,71 @@
+"""
+Audio-thread jitter while summaries generate: in-process vs. worker process.
+
+A thread stands in for the PyAudio reader: it wakes every 50ms (one
+``FRAMES_PER_BUFFER`` at 16 kHz) and records how late each wake-up was, while
+another thread keeps the summarizer busy. With the in-process
+``LocalSummarizer`` generate competes for the GIL and cores; with
+``ProcessSummarizer`` it runs in a spawned worker.
+
+Usage:
+    python -m benchmarks.audio_jitter [--seconds 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+
+from summarizer_pool import ProcessSummarizer
+
+PERIOD = 0.05
+TEXT = " ".join(["the neon castle glows over the river while forest mist drifts between lanterns"] * 12)
+
+
+def _measure(summarizer, seconds: float):
+    stop = threading.Event()
+    summaries = 0
+
+    def busy() -> None:
+        nonlocal summaries
+        while not stop.is_set():
+            summarizer.summarize(TEXT)
+            summaries += 1
+
+    worker = threading.Thread(target=busy, daemon=True)
+    worker.start()
+    lateness = []
+    deadline = time.perf_counter() + PERIOD
+    end = time.perf_counter() + seconds
+    while deadline < end:
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+        lateness.append(time.perf_counter() - deadline)
+        deadline += PERIOD
+    stop.set()
+    worker.join()
+    lateness.sort()
+    return summaries / seconds, lateness[len(lateness) // 2], lateness[int(0.99 * (len(lateness) - 1))], lateness[-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    from local_summarizer import LocalSummarizer
+
+    pool = ProcessSummarizer().start()
+    candidates = (("in-process", LocalSummarizer()), ("worker process", pool))
+    print(f"{'summarizer':<15}  {'summaries/s':>11}  {'p50 late ms':>11}  {'p99 late ms':>11}  {'max late ms':>11}")
+    try:
+        for name, summarizer in candidates:
+            summarizer.summarize("warm up")
+            rate, p50, p99, worst = _measure(summarizer, args.seconds)
+            print(f"{name:<15}  {rate:>11.2f}  {p50 * 1000:>11.2f}  {p99 * 1000:>11.2f}  {worst * 1000:>11.2f}")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Inline message handling vs. the offloaded dispatch pipeline, under a slow callback.
+
+Replays a synthetic WAV through the thread-based client into
+``mock_assemblyai.py`` with a script of long turns (one partial per word), and
+an ``on_transcript`` callback that takes ``--callback-ms`` per call: sleeping,
+like a blocking network call, or spinning with ``--cpu``. Runs twice:
+``offload_messages=False`` (parse, tracker, segmenter and callback on the
+websocket receive thread, as before) and ``offload_messages=True``.
+
+Reports per run:
+
+- ``recv``: mock sent a message -> the receive thread got it (how long the
+  socket went unread), p50/p95/max;
+- ``final``: mock sent a final turn -> its tokens reached the tracker;
+- partials coalesced/shed by the lag policy, and the callback's own p95.
+
+Usage:
+    python -m benchmarks.dispatch [--seconds 30] [--speed 4] [--callback-ms 50] [--cpu]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.replay import WORDS, synthetic_wav
+from local_summarizer import _percentile
+from mock_assemblyai import MockAssemblyAIServer
+from wav_source import WavFileSource
+from weighted_audio_stream import WeightedStreamClient
+
+
+class _TimedClient(WeightedStreamClient):
+    """Records when the receive thread sees each message and when finals are handled."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.arrivals: List[float] = []
+        self.finals: List[float] = []
+
+    def _on_message(self, ws, message, session=None):
+        self.arrivals.append(time.time())
+        super()._on_message(ws, message, session)
+
+    def _handle_turn(self, session, payload):
+        super()._handle_turn(session, payload)
+        if payload.get("end_of_turn") and payload.get("turn_is_formatted"):
+            self.finals.append(time.time())
+
+
+def _script(seconds: float, turn_seconds: float) -> List[Tuple[float, str]]:
+    turns, at, index = [], turn_seconds, 0
+    while at <= seconds:
+        words = [WORDS[(index + offset) % len(WORDS)] for offset in range(24)]
+        turns.append((at, " ".join(words).capitalize() + "."))
+        at += turn_seconds
+        index += 5
+    return turns
+
+
+def _slow_callback(milliseconds: float, cpu: bool):
+    def callback(_text: str) -> None:
+        deadline = time.perf_counter() + milliseconds / 1000.0
+        if cpu:
+            while time.perf_counter() < deadline:
+                pass
+        else:
+            time.sleep(milliseconds / 1000.0)
+
+    return callback
+
+
+def _summary(values: List[float]) -> str:
+    values = sorted(values)
+    if not values:
+        return "n/a"
+    return f"{_percentile(values, 0.5) * 1000:6.0f} /{_percentile(values, 0.95) * 1000:6.0f} /{values[-1] * 1000:6.0f}"
+
+
+def run(args, path: str, script, offload: bool) -> Dict:
+    mock = MockAssemblyAIServer(script).start()
+    client = _TimedClient(
+        audio_source=WavFileSource(path, speed=args.speed),
+        api_endpoint=mock.url,
+        enable_daydream_updates=False,
+        on_transcript=_slow_callback(args.callback_ms, args.cpu),
+        offload_messages=offload,
+    )
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            client.start()
+    finally:
+        mock.stop()
+    with mock._lock:
+        sent = [sent_at for sent_at, _, _ in mock.sent]
+    receive = [arrived - left for left, arrived in zip(sent, client.arrivals)]
+    finals = [handled - left for (left, _, _), handled in zip(mock.turns_sent(), client.finals)]
+    stats = client.dispatch_stats()
+    callback = stats.get("callbacks", {}).get("callbacks", {}).get("transcript", {})
+    return {
+        "receive": _summary(receive),
+        "final": _summary(finals),
+        "finals": f"{len(client.finals)}/{len(mock.turns_sent())}",
+        "coalesced": stats.get("coalesced_partials", 0),
+        "shed": stats.get("process", {}).get("shed", 0) + stats.get("callbacks", {}).get("shed", 0),
+        "callback_p95": callback.get("p95_ms"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--speed", type=float, default=4.0)
+    parser.add_argument("--turn-seconds", type=float, default=6.0)
+    parser.add_argument("--callback-ms", type=float, default=50.0)
+    parser.add_argument("--cpu", action="store_true", help="busy-wait in the callback instead of sleeping")
+    args = parser.parse_args()
+
+    os.environ.setdefault("ASSEMBLYAI_API_KEY", "local")  # the mock accepts any key
+    script = _script(args.seconds, args.turn_seconds)
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "dispatch.wav")
+        synthetic_wav(path, args.seconds)
+        kind = "busy" if args.cpu else "sleeping"
+        print(f"{args.seconds:.0f}s at {args.speed:g}x, {kind} callback of {args.callback_ms:g}ms per transcript")
+        print(f"{'mode':<8}  {'recv p50/p95/max ms':>21}  {'final p50/p95/max ms':>21}  {'finals':>6}  {'coalesced':>9}  {'shed':>4}  {'cb p95':>6}")
+        for offload in (False, True):
+            result = run(args, path, script, offload)
+            callback = f"{result['callback_p95']:.0f}" if result["callback_p95"] is not None else "n/a"
+            print(
+                f"{'offload' if offload else 'inline':<8}  {result['receive']:>21}  {result['final']:>21}"
+                f"  {result['finals']:>6}  {result['coalesced']:>9}  {result['shed']:>4}  {callback:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
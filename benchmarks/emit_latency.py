@@ -0,0 +1,101 @@
+"""
+Speech-to-prompt latency of the polling and push keyword emitters.
+
+Scripted turns introduce a new theme every ``--gap`` seconds; latency is the
+time from the first partial naming a theme until a local Daydream stand-in
+receives a prompt containing it. Themes the emitter skipped over are not
+counted as delivered.
+
+Usage:
+    python -m benchmarks.emit_latency [--themes 6] [--gap 3.0] [--patch-delay 0.05]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+
+from daydream_api import PromptDispatcher
+from mock_daydream import MockDaydreamServer
+from weighted_audio_stream import WeightedStreamClient
+
+THEMES = ("dragon", "lighthouse", "glacier", "carnival", "orchard", "nebula", "cathedral", "monsoon", "volcano", "harbor")
+
+
+def _turn(order: int, text: str, *, final: bool, formatted: bool = False) -> str:
+    return json.dumps(
+        {
+            "type": "Turn",
+            "turn_order": order,
+            "transcript": text,
+            "end_of_turn": final,
+            "turn_is_formatted": formatted,
+        }
+    )
+
+
+def _measure(mode: str, themes, gap: float, patch_delay: float, refresh_interval: float):
+    server = MockDaydreamServer(delay=patch_delay).start()
+    dispatcher = PromptDispatcher(api_base=server.api_base)
+    client = WeightedStreamClient(
+        daydream_api_key="sk_local",
+        default_stream_id="str_bench",
+        dispatcher=dispatcher,
+        emit_mode=mode,
+        refresh_interval=refresh_interval,
+    )
+    client.start_emitter()
+    spoken_at = {}
+    try:
+        for order, theme in enumerate(themes):
+            sentence = f"{theme} {theme} {theme} rising slowly"
+            words = sentence.split()
+            spoken_at[theme] = time.time()
+            for count in range(1, len(words) + 1):
+                client._on_message(None, _turn(order, " ".join(words[:count]), final=False))
+                time.sleep(0.05)
+            client._on_message(None, _turn(order, sentence, final=True))
+            client._on_message(None, _turn(order, sentence.capitalize() + ".", final=True, formatted=True))
+            time.sleep(gap)
+        time.sleep(refresh_interval + patch_delay)
+    finally:
+        client.stop_event.set()
+        client._keywords_changed.set()
+        if client.refresh_thread:
+            client.refresh_thread.join(timeout=refresh_interval + 1.0)
+        dispatcher.close()
+        server.stop()
+
+    latencies = []
+    for theme, started in spoken_at.items():
+        arrivals = [arrived for arrived, _, prompt in server.received if theme in prompt and arrived >= started]
+        if arrivals:
+            latencies.append(min(arrivals) - started)
+    return latencies, len(server.received)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--themes", type=int, default=6)
+    parser.add_argument("--gap", type=float, default=3.0, help="seconds between theme changes")
+    parser.add_argument("--patch-delay", type=float, default=0.05, help="seconds the stand-in stalls each PATCH")
+    parser.add_argument("--refresh-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    themes = THEMES[: args.themes]
+    print(f"{'mode':<6} {'delivered':>9} {'patches':>8} {'mean s':>8} {'p50 s':>8} {'max s':>8}")
+    for mode in ("poll", "push"):
+        latencies, patches = _measure(mode, themes, args.gap, args.patch_delay, args.refresh_interval)
+        if not latencies:
+            print(f"{mode:<6} {0:>9} {patches:>8}")
+            continue
+        print(
+            f"{mode:<6} {len(latencies):>9} {patches:>8} {statistics.mean(latencies):>8.2f} "
+            f"{statistics.median(latencies):>8.2f} {max(latencies):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+1,000 keyword sessions: per-session dict trackers vs. the shared NumPy engine.
+
+Each round every session ingests one turn, decay is applied, and every
+session's top-k is read. At this scale the engine is not faster than the lazy
+dict tracker (per-token Python work dominates), which is why it stays opt-in
+behind ``server.py --keyword-engine``. Before timing, a quiet spell long enough
+for every word to decay and its column to be recycled checks that the engine
+only ever reports live keywords of the session asking.
+
+Usage:
+    python -m benchmarks.keyword_engine [--sessions 1000] [--rounds 40] [--vocabulary 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from keyword_engine import KeywordEngine
+from weighted_audio_stream import KeywordMomentumTracker, LazyKeywordMomentumTracker
+
+TOKENS_PER_TURN = 12
+
+
+def _workload(sessions: int, rounds: int, vocabulary: int, seed: int = 3):
+    rng = random.Random(seed)
+    words = [f"word{index}" for index in range(vocabulary)]
+    weights = [1.0 / (rank + 1) for rank in range(vocabulary)]
+    return [
+        [rng.choices(words, weights=weights, k=TOKENS_PER_TURN) for _ in range(sessions)]
+        for _ in range(rounds)
+    ]
+
+
+def _run_trackers(tracker_cls, workload, start: float) -> float:
+    trackers = [tracker_cls() for _ in workload[0]]
+    began = time.perf_counter()
+    for step, turns in enumerate(workload, start=1):
+        now = start + step * 0.5
+        for tracker, tokens in zip(trackers, turns):
+            tracker.ingest_tokens(tokens, now)
+        for tracker in trackers:
+            tracker.current_keywords()
+    return (time.perf_counter() - began) / len(workload)
+
+
+def _run_engine(workload, start: float) -> float:
+    engine = KeywordEngine(tick_interval=0.5)
+    engine.last_tick = start
+    sessions = [engine.session() for _ in workload[0]]
+    began = time.perf_counter()
+    for step, turns in enumerate(workload, start=1):
+        now = start + step * 0.5
+        engine.tick(now)
+        engine.add_batch(((session.row, tokens) for session, tokens in zip(sessions, turns)), now)
+        engine.top_keywords_all()
+    return (time.perf_counter() - began) / len(workload)
+
+
+def check_live_keywords() -> None:
+    """Decay, recycle and reuse columns, then check no session sees stale or foreign words."""
+    engine = KeywordEngine(compact_every=1)
+    start = engine.last_tick + 1.0
+    first, second = engine.session(), engine.session()
+    engine.add(first.row, ["neon", "castle"], start)
+    assert [word for word, _ in engine.top_keywords(first.row)] == ["neon", "castle"]
+    engine.tick(start + 10 * engine.halflife)
+    assert engine.top_keywords(first.row) == (), engine.top_keywords(first.row)
+    engine.add(second.row, ["glass", "river"], start + 10 * engine.halflife + 1.0)
+    assert engine.top_keywords(first.row) == (), engine.top_keywords(first.row)
+    assert sorted(word for word, _ in engine.top_keywords(second.row)) == ["glass", "river"]
+    print("live keywords: decayed and recycled columns never reported")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=40)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    args = parser.parse_args()
+
+    check_live_keywords()
+    workload = _workload(args.sessions, args.rounds, args.vocabulary)
+    start = time.time() + 1.0
+    print(f"{args.sessions} sessions, {args.vocabulary}-word vocabulary, {TOKENS_PER_TURN} tokens per turn")
+    for name, runner in (
+        ("dict tracker", lambda: _run_trackers(KeywordMomentumTracker, workload, start)),
+        ("lazy dict tracker", lambda: _run_trackers(LazyKeywordMomentumTracker, workload, start)),
+        ("numpy engine", lambda: _run_engine(workload, start)),
+    ):
+        per_round = runner()
+        print(f"{name:<18} {per_round * 1000:8.2f} ms/round  {per_round / args.sessions * 1e6:7.2f} us/session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-ingest cost of the eager and lazy keyword trackers as the vocabulary grows.
+
+Usage:
+    python -m benchmarks.keyword_tracker [--ingests 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+
+from weighted_audio_stream import KeywordMomentumTracker, LazyKeywordMomentumTracker, SpaceSavingKeywordTracker
+
+VOCAB_SIZES = (1_000, 10_000, 100_000)
+TOKENS_PER_TURN = 12
+
+
+def _word(index: int) -> str:
+    return f"word{index}"
+
+
+def _prefill(tracker: KeywordMomentumTracker, vocab_size: int, start: float) -> None:
+    batch = 500
+    for offset in range(0, vocab_size, batch):
+        text = " ".join(_word(i) for i in range(offset, min(offset + batch, vocab_size)))
+        tracker.ingest(text, now=start)
+
+
+def _turns(vocab_size: int, count: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [" ".join(_word(rng.randrange(vocab_size)) for _ in range(TOKENS_PER_TURN)) for _ in range(count)]
+
+
+def _time_ingests(tracker: KeywordMomentumTracker, turns, start: float) -> float:
+    began = time.perf_counter()
+    for step, text in enumerate(turns, start=1):
+        tracker.ingest(text, now=start + step * 0.001)
+    return (time.perf_counter() - began) / len(turns)
+
+
+def check_agreement(turns: int = 3000, seed: int = 11, idle_every: int = 500) -> None:
+    """
+    Replay a random session through the eager, lazy and (uncapped) Space-Saving
+    trackers and compare every emission. Every ``idle_every`` turns the speaker
+    goes quiet for far longer than the lazy trackers' rescale window
+    (``RESCALE_EXPONENT`` half-lives), so their epoch has to be rebased.
+    """
+    rng = random.Random(seed)
+    eager = KeywordMomentumTracker()
+    lazy = LazyKeywordMomentumTracker()
+    capped = SpaceSavingKeywordTracker(capacity=10 * turns)
+    now = max(eager.last_timestamp, lazy.last_timestamp, capped.last_timestamp)
+    idle = 2 * LazyKeywordMomentumTracker.RESCALE_EXPONENT * eager.halflife
+    for turn in range(1, turns + 1):
+        now += idle if turn % idle_every == 0 else rng.expovariate(1.0)
+        text = " ".join(_word(int(rng.paretovariate(1.2))) for _ in range(rng.randint(1, 15)))
+        expected = list(eager.ingest(text, now=now))
+        for tracker in (lazy, capped):
+            actual = list(tracker.ingest(text, now=now))
+            expected_words = [word for word, _ in expected]
+            actual_words = [word for word, _ in actual]
+            assert expected_words == actual_words, (type(tracker).__name__, now, expected, actual)
+            for (_, want), (_, got) in zip(expected, actual):
+                assert math.isclose(want, got, rel_tol=1e-9), (type(tracker).__name__, now, want, got)
+    print(
+        f"agreement: {turns} turns with {turns // idle_every} idle gaps of {idle / 60:.0f} min"
+        " identical within 1e-9 relative tolerance"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ingests", type=int, default=2000)
+    args = parser.parse_args()
+
+    check_agreement()
+    print(f"{'vocabulary':>10}  {'eager us/ingest':>16}  {'lazy us/ingest':>15}")
+    for vocab_size in VOCAB_SIZES:
+        turns = _turns(vocab_size, args.ingests)
+        results = []
+        for tracker_cls in (KeywordMomentumTracker, LazyKeywordMomentumTracker):
+            # keep the whole vocabulary above the decay floor for the timed run
+            tracker = tracker_cls(halflife_seconds=3600.0)
+            start = tracker.last_timestamp + 1.0
+            _prefill(tracker, vocab_size, start=start)
+            results.append(_time_ingests(tracker, turns, start=start) * 1e6)
+        print(f"{vocab_size:>10}  {results[0]:>16.1f}  {results[1]:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
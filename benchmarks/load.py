@@ -0,0 +1,249 @@
+"""
+Load test: ramp concurrent sessions on ``server.py --multi-session`` until latency degrades.
+
+Starts the local AssemblyAI and Daydream stand-ins in this process and the
+server as a subprocess pointed at them. For every step of ``--ramp`` it creates
+that many sessions over ``POST /api/sessions``, each replaying a looping WAV
+at real time while the mock ASR repeats a transcript script, holds them for
+``--step-seconds``, and deletes them again. Sessions are created one at a time
+so ASR connection ``i`` belongs to stream ``str_load_<i>``.
+
+Per step it reports p50/p95/p99 of each stage:
+
+- ``create``: ``POST /api/sessions`` round trip.
+- ``connect``: session created -> mock ASR sent ``Begin``.
+- ``turn_to_patch``: mock ASR sent a final turn -> next Daydream PATCH for that
+  stream (websocket receive, keyword tracking, push debounce and dispatch).
+- ``api``: ``GET /api/sessions`` round trip while the step is loaded.
+
+plus PATCHes/s, server CPU (cores busy, from /proc, so Linux only), RSS at the
+end of the step and peak RSS. Results go to ``--output`` as JSON tagged with the
+git commit, so runs can be diffed across commits.
+
+Usage:
+    python -m benchmarks.load [--ramp 1 4 16 64] [--step-seconds 30] [--output load-results.json]
+        [--server-args "--keyword-engine"]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+
+from benchmarks.replay import synthetic_script, synthetic_wav
+from local_summarizer import _percentile
+from mock_assemblyai import MockAssemblyAIServer
+from mock_daydream import MockDaydreamServer
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def _request(method: str, url: str, payload: Optional[dict] = None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=30.0) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read() or b"{}")
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as handle:
+        fields = handle.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS  # utime + stime
+
+
+def _memory_mb(pid: int) -> Dict[str, float]:
+    values = {}
+    with open(f"/proc/{pid}/status") as handle:
+        for line in handle:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                name, kilobytes = line.split()[:2]
+                values[name.rstrip(":")] = int(kilobytes) / 1024.0
+    return {"rss_mb": values.get("VmRSS", 0.0), "peak_rss_mb": values.get("VmHWM", 0.0)}
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50_ms": _percentile(values, 0.5) * 1000.0,
+        "p95_ms": _percentile(values, 0.95) * 1000.0,
+        "p99_ms": _percentile(values, 0.99) * 1000.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+
+class LoadRun:
+    def __init__(self, args, wav_path: str, script):
+        self.args = args
+        self.wav_path = wav_path
+        self.asr = MockAssemblyAIServer(script, delay=args.asr_delay, repeat=True).start()
+        self.daydream = MockDaydreamServer(delay=args.patch_delay).start()
+        self.base = f"http://127.0.0.1:{args.port}/api"
+        env = dict(
+            os.environ,
+            ASSEMBLYAI_ENDPOINT=self.asr.url,
+            ASSEMBLYAI_API_KEY="local",
+            DAYDREAM_API_BASE=self.daydream.api_base,
+            DAYDREAM_API_KEY="sk_local",
+        )
+        command = [sys.executable, "server.py", "--multi-session", "--port", str(args.port), "--no-summaries"]
+        command += ["--max-sessions", str(max(args.ramp))] + shlex.split(args.server_args)
+        self.server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self._wait_healthy()
+
+    def close(self) -> None:
+        self.server.terminate()
+        try:
+            self.server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.server.kill()
+        self.asr.stop()
+        self.daydream.stop()
+
+    def _wait_healthy(self) -> None:
+        deadline = time.monotonic() + 30.0
+        while time.monotonic() < deadline:
+            if self.server.poll() is not None:
+                raise RuntimeError(f"server.py exited with code {self.server.returncode}")
+            try:
+                if _request("GET", f"{self.base}/health")[0] == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.1)
+        raise RuntimeError("server.py did not answer /api/health within 30s")
+
+    def step(self, sessions: int) -> Dict:
+        create, connect, api = [], [], []
+        streams: Dict[int, str] = {}  # ASR connection number -> stream id
+        created_at: Dict[int, float] = {}
+        ids = []
+        for index in range(sessions):
+            number = self.asr.connections
+            stream_id = f"str_load_{number}"
+            started = time.perf_counter()
+            created_wall = time.time()
+            status, body = _request(
+                "POST",
+                f"{self.base}/sessions",
+                {"stream_id": stream_id, "source": {"type": "wav", "path": self.wav_path, "loop": True}},
+            )
+            create.append(time.perf_counter() - started)
+            if status != 201:
+                raise RuntimeError(f"creating session {index + 1}/{sessions} failed ({status}): {body}")
+            ids.append(body["id"])
+            streams[number], created_at[number] = stream_id, created_wall
+            deadline = time.monotonic() + 10.0
+            while self.asr.connections <= number and time.monotonic() < deadline:
+                time.sleep(0.001)
+
+        loaded_at = time.time()
+        cpu_before = _cpu_seconds(self.server.pid)
+        while time.time() - loaded_at < self.args.step_seconds:
+            started = time.perf_counter()
+            _request("GET", f"{self.base}/sessions")
+            api.append(time.perf_counter() - started)
+            time.sleep(1.0)
+        loaded_until = time.time()
+        cpu = (_cpu_seconds(self.server.pid) - cpu_before) / (loaded_until - loaded_at)
+        memory = _memory_mb(self.server.pid)
+
+        for session_id in ids:
+            _request("DELETE", f"{self.base}/sessions/{session_id}")
+
+        with self.asr._lock:
+            sent = list(self.asr.sent)
+        for sent_at, number, message in sent:
+            if message.get("type") == "Begin" and number in created_at:
+                connect.append(sent_at - created_at[number])
+
+        patches: Dict[str, List[float]] = {}
+        with self.daydream._lock:
+            for arrived, stream_id, _ in self.daydream.received:
+                if loaded_at <= arrived <= loaded_until:
+                    patches.setdefault(stream_id, []).append(arrived)
+        turn_to_patch = []
+        for sent_at, number, _ in self.asr.turns_sent():
+            if number not in streams or not loaded_at <= sent_at <= loaded_until:
+                continue
+            after = next((arrived for arrived in patches.get(streams[number], ()) if arrived >= sent_at), None)
+            if after is not None:
+                turn_to_patch.append(after - sent_at)
+
+        return {
+            "sessions": sessions,
+            "stages": {
+                "create": _summary(create),
+                "connect": _summary(connect),
+                "turn_to_patch": _summary(turn_to_patch),
+                "api": _summary(api),
+            },
+            "patches_per_second": sum(len(times) for times in patches.values()) / (loaded_until - loaded_at),
+            "cpu_cores": cpu,
+            **memory,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ramp", type=int, nargs="+", default=[1, 4, 16, 64], help="concurrent sessions per step")
+    parser.add_argument("--step-seconds", type=float, default=30.0)
+    parser.add_argument("--turn-seconds", type=float, default=3.0, help="scripted seconds of speech per turn")
+    parser.add_argument("--asr-delay", type=float, default=0.0, help="mock ASR latency per message")
+    parser.add_argument("--patch-delay", type=float, default=0.0, help="mock Daydream latency per PATCH")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--server-args", default="", help="extra server.py flags, e.g. '--keyword-engine'")
+    parser.add_argument("--output", default="load-results.json")
+    args = parser.parse_args()
+
+    results = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine": {"cpus": os.cpu_count(), "python": platform.python_version(), "platform": platform.platform()},
+        "config": vars(args),
+        "steps": [],
+    }
+    with tempfile.TemporaryDirectory() as scratch:
+        wav_path = os.path.join(scratch, "load.wav")
+        synthetic_wav(wav_path, 30.0)
+        run = LoadRun(args, wav_path, synthetic_script(30.0, args.turn_seconds))
+        print(f"{'sessions':>8}  {'turn->PATCH p50/p95/p99 ms':>27}  {'create p95':>10}  {'PATCH/s':>7}  {'cpu':>5}  {'RSS MB':>6}")
+        try:
+            for sessions in args.ramp:
+                step = run.step(sessions)
+                results["steps"].append(step)
+                latency = step["stages"]["turn_to_patch"]
+                print(
+                    f"{sessions:>8}  {latency['p50_ms']:>8.0f} /{latency['p95_ms']:>7.0f} /{latency['p99_ms']:>7.0f}"
+                    f"  {step['stages']['create']['p95_ms']:>10.1f}  {step['patches_per_second']:>7.1f}"
+                    f"  {step['cpu_cores']:>5.2f}  {step['rss_mb']:>6.0f}"
+                )
+        finally:
+            run.close()
+            with open(args.output, "w", encoding="utf-8") as handle:
+                json.dump(results, handle, indent=2)
+            print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
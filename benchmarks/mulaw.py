@@ -0,0 +1,165 @@
+"""
+μ-law vs. raw PCM on the uplink: bandwidth, CPU and recognition agreement.
+
+For each fixture (``--wav`` files, or the synthetic fixture from
+``benchmarks.vad``) reports uplink bytes per second per session for
+``pcm_s16le`` and ``pcm_mulaw`` (websocket framing included, with and without
+the energy VAD), CPU per 50ms chunk for the encode stage, and the SNR of the
+μ-law round trip.
+
+Recognition agreement needs the real service: with ``--live`` each fixture is
+streamed at real time to AssemblyAI once per encoding (``ASSEMBLYAI_API_KEY``
+required) and the final transcripts are compared word by word. Without it the
+same two runs go to ``mock_assemblyai.py`` instead, which checks that the μ-law
+path negotiates the encoding and keeps audio time (same turns at the same
+offsets) but cannot judge recognition.
+
+Usage:
+    python -m benchmarks.mulaw [--wav recorded_audio.wav ...] [--live]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import difflib
+import io
+import os
+import tempfile
+import time
+import wave
+from typing import List
+
+import numpy as np
+
+from audio_dsp import EnergyVAD, mulaw_decode, mulaw_encode
+from benchmarks.vad import read_wav, synthetic_speech
+from mock_assemblyai import MockAssemblyAIServer
+from wav_source import WavFileSource
+from weighted_audio_stream import FRAMES_PER_BUFFER, SAMPLE_RATE, WeightedStreamClient
+
+FRAME_OVERHEAD = 8  # masked client frame: 2-byte header + 2-byte length + 4-byte mask
+
+
+def _chunks(samples: np.ndarray) -> List[bytes]:
+    raw = samples.tobytes()
+    step = FRAMES_PER_BUFFER * 2
+    return [raw[offset : offset + step] for offset in range(0, len(raw), step)]
+
+
+def uplink_rate(chunks: List[bytes], *, mulaw: bool, vad: bool) -> float:
+    """Bytes per second of audio on the wire, framing included."""
+    gate = EnergyVAD() if vad else None
+    sent = 0
+    for chunk in chunks:
+        for payload in gate.feed(chunk) if gate else [chunk]:
+            sent += (len(payload) // 2 if mulaw else len(payload)) + FRAME_OVERHEAD
+    return sent / (len(chunks) * FRAMES_PER_BUFFER / SAMPLE_RATE)
+
+
+def encode_cost(chunks: List[bytes], repeats: int = 5) -> float:
+    """CPU microseconds per 50ms chunk for ``mulaw_encode``."""
+    started = time.process_time()
+    for _ in range(repeats):
+        for chunk in chunks:
+            mulaw_encode(chunk)
+    return (time.process_time() - started) / (repeats * len(chunks)) * 1e6
+
+
+def snr_db(samples: np.ndarray) -> float:
+    decoded = np.frombuffer(mulaw_decode(mulaw_encode(samples.tobytes())), dtype=np.int16).astype(np.float64)
+    original = samples.astype(np.float64)
+    noise = np.sum((original - decoded) ** 2)
+    return float(10.0 * np.log10(np.sum(original**2) / noise)) if noise else float("inf")
+
+
+class _FinalsClient(WeightedStreamClient):
+    """Collects the final text of every turn."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.finals: List[str] = []
+
+    def _ingest_sentence(self, text: str):
+        self.finals.append(text)
+        super()._ingest_sentence(text)
+
+
+def transcribe(path: str, encoding: str, endpoint: str, speed: float) -> List[str]:
+    client = _FinalsClient(
+        audio_source=WavFileSource(path, speed=speed),
+        api_endpoint=endpoint,
+        encoding=encoding,
+        enable_daydream_updates=False,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.start()
+    return client.finals
+
+
+def agreement(reference: List[str], candidate: List[str]) -> float:
+    """1 - word error rate of ``candidate`` against ``reference`` (lower-cased, punctuation stripped)."""
+
+    def words(texts: List[str]) -> List[str]:
+        return [word.strip(".,!?;:").lower() for text in texts for word in text.split()]
+
+    want, got = words(reference), words(candidate)
+    if not want:
+        return 1.0 if not got else 0.0
+    matcher = difflib.SequenceMatcher(a=want, b=got, autojunk=False)
+    edits = sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal")
+    return max(0.0, 1.0 - edits / len(want))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", nargs="*", default=[], help="16 kHz mono PCM16 WAV files")
+    parser.add_argument("--seconds", type=float, default=60.0, help="length of the synthetic fixture")
+    parser.add_argument("--live", action="store_true", help="compare transcripts from the real AssemblyAI endpoint")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        fixtures = [(path, read_wav(path)) for path in args.wav]
+        if not fixtures:
+            samples, _ = synthetic_speech(args.seconds)
+            path = os.path.join(scratch, "synthetic.wav")
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(SAMPLE_RATE)
+                wav.writeframes(samples.tobytes())
+            fixtures.append((path, samples))
+
+        print(f"{'fixture':<24}  {'pcm B/s':>8}  {'mulaw B/s':>9}  {'+vad pcm':>8}  {'+vad mulaw':>10}  {'encode us':>9}  {'SNR dB':>6}")
+        for path, samples in fixtures:
+            chunks = _chunks(samples)
+            rates = [uplink_rate(chunks, mulaw=mulaw, vad=vad) for vad in (False, True) for mulaw in (False, True)]
+            print(
+                f"{os.path.basename(path)[-24:]:<24}  {rates[0]:>8.0f}  {rates[1]:>9.0f}  {rates[2]:>8.0f}  {rates[3]:>10.0f}"
+                f"  {encode_cost(chunks):>9.1f}  {snr_db(samples):>6.1f}"
+            )
+
+        print()
+        mock = None
+        if args.live:
+            endpoint, speed, label = None, 1.0, "AssemblyAI"
+        else:
+            os.environ.setdefault("ASSEMBLYAI_API_KEY", "local")  # the mock accepts any key
+            mock = MockAssemblyAIServer(
+                [(at, f"Scripted turn {index}.") for index, at in enumerate(range(3, int(args.seconds), 3))]
+            ).start()
+            endpoint, speed, label = mock.url, 0.0, "mock (protocol only)"
+        try:
+            for path, _ in fixtures:
+                reference = transcribe(path, "pcm_s16le", endpoint, speed)
+                candidate = transcribe(path, "pcm_mulaw", endpoint, speed)
+                # the mock ignores audio content, so agreement would always read 100%
+                result = f"word agreement {agreement(reference, candidate):.1%}" if args.live else "no agreement measured"
+                print(f"{label}: {os.path.basename(path)}  turns pcm {len(reference)} / mulaw {len(candidate)}  {result}")
+        finally:
+            if mock:
+                mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Prompt dispatch against a slow local Daydream stand-in.
+
+Submits bursts of prompts for several streams and reports how long the caller
+was blocked, how many prompts were coalesced away, and per-PATCH latency.
+
+Usage:
+    python -m benchmarks.prompt_dispatcher [--delay 0.25] [--streams 4] [--prompts 40]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from daydream_api import PromptDispatcher
+from mock_daydream import MockDaydreamServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.25, help="seconds the stand-in stalls each PATCH")
+    parser.add_argument("--streams", type=int, default=4)
+    parser.add_argument("--prompts", type=int, default=40, help="prompts per stream")
+    parser.add_argument("--interval", type=float, default=0.02, help="seconds between submissions")
+    args = parser.parse_args()
+
+    server = MockDaydreamServer(delay=args.delay).start()
+    dispatcher = PromptDispatcher(api_base=server.api_base, workers=args.streams)
+    try:
+        blocked = 0.0
+        for index in range(args.prompts):
+            for stream in range(args.streams):
+                started = time.perf_counter()
+                dispatcher.submit(f"str_{stream}", "sk_local", f"prompt {index}")
+                blocked = max(blocked, time.perf_counter() - started)
+            time.sleep(args.interval)
+
+        deadline = time.time() + args.delay * args.prompts + 5.0
+        while time.time() < deadline:
+            stats = dispatcher.stats()
+            if not stats["pending"] and not stats["inflight"]:
+                break
+            time.sleep(0.05)
+
+        stats = dispatcher.stats()
+        last_prompts = {stream: prompts[-1] for stream, prompts in server.prompts().items()}
+        print(f"submitted          {args.prompts * args.streams}")
+        print(f"max submit block   {blocked * 1000:.2f} ms")
+        for key in ("sent", "failed", "dropped", "latency_p50_ms", "latency_p95_ms", "queue_delay_p95_ms"):
+            print(f"{key:<18} {stats[key]:.2f}" if isinstance(stats[key], float) else f"{key:<18} {stats[key]}")
+        print(f"final prompts      {sorted(set(last_prompts.values()))}")
+    finally:
+        dispatcher.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
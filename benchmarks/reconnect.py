@@ -0,0 +1,169 @@
+"""
+Session resilience against a mock ASR that drops and expires connections.
+
+Replays a synthetic WAV through the thread-based or asyncio client into
+``mock_assemblyai.py`` under four scenarios:
+
+- ``steady``: one session, nothing goes wrong (baseline);
+- ``drops``: the mock aborts every connection after ``--drop-after`` seconds of audio;
+- ``outage``: all connections are aborted every ``--outage-every`` wall seconds;
+- ``expiry``: sessions expire after ``--expires-in`` seconds and are rotated
+  ``--rotate-before`` seconds ahead.
+
+For each it reports connections opened, reconnects and rotations, final turns
+the client handled vs. turns the mock sent (every final should arrive), audio
+the mock received beyond the file itself (replayed after reconnects), and the
+longest stretch of audio between two final turns reaching the client. Each mock
+connection plays the script from its own start, so turn counts differ between
+scenarios; compare received to sent.
+
+The mock ignores audio content, so it cannot show words of replayed audio being
+counted twice. ``check_replay_dedupe`` first drives the client's turn handling
+directly through a drop: the partial words already counted, the end of the last
+final re-transcribed from the kept tail, and late messages of the superseded
+session must each reach the tracker, the callbacks and the segmenter once.
+
+Usage:
+    python -m benchmarks.reconnect [--seconds 60] [--speed 4] [--client thread|async]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from async_stream_client import AsyncWeightedStreamClient
+from benchmarks.replay import synthetic_script, synthetic_wav
+from mock_assemblyai import MockAssemblyAIServer
+from wav_source import WavFileSource
+from weighted_audio_stream import SAMPLE_RATE, KeywordMomentumTracker, WeightedStreamClient, _Session
+
+
+def _finals_client(base):
+    class FinalsClient(base):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.final_times: List[float] = []
+
+        def _ingest_sentence(self, text: str):
+            self.final_times.append(time.monotonic())
+            super()._ingest_sentence(text)
+
+    return FinalsClient
+
+
+def check_replay_dedupe() -> None:
+    transcripts: List[str] = []
+    sentences: List[str] = []
+    client = _finals_client(WeightedStreamClient)(
+        enable_daydream_updates=False,
+        offload_messages=False,
+        tracker=KeywordMomentumTracker(halflife_seconds=3600.0),
+        on_transcript=transcripts.append,
+    )
+    client.segmenter.on_sentence = sentences.append
+    first, second = _Session(0), _Session(1)
+
+    def turn(session, order, text, final=False):
+        payload = {"type": "Turn", "turn_order": order, "transcript": text, "end_of_turn": final, "turn_is_formatted": final}
+        client._handle_turn(session, payload)
+
+    client._hand_over(first, replayed=False)
+    turn(first, 0, "neon castle over the river", final=False)
+    turn(first, 0, "Neon castle over the river.", final=True)
+    turn(first, 1, "glass towers and", final=False)
+    # the first session drops; the kept tail and the unfinished turn are replayed into the second
+    client._hand_over(second, replayed=True)
+    turn(first, 1, "Glass towers.", final=True)  # late message of the superseded session
+    turn(second, 0, "river glass towers and", final=False)
+    turn(second, 0, "River. Glass towers and lanterns.", final=True)
+    client.segmenter.flush()
+
+    counts = {word: round(weight) for word, weight in client.tracker.weights.items()}
+    assert counts == {"neon": 1, "castle": 1, "over": 1, "river": 1, "glass": 1, "towers": 1, "lanterns": 1}, counts
+    finals = [text for text in transcripts if text.endswith(".")]
+    assert finals == ["Neon castle over the river.", "Glass towers and lanterns."], transcripts
+    assert sentences == finals, sentences
+    print("replay dedupe: replayed words counted, emitted and segmented once")
+
+
+def run(args, path: str, script, mock_options: Dict, outage_every: float = 0.0) -> Dict:
+    mock = MockAssemblyAIServer(script, **mock_options).start()
+    client_class = _finals_client(AsyncWeightedStreamClient if args.client == "async" else WeightedStreamClient)
+    client = client_class(
+        audio_source=WavFileSource(path, speed=args.speed),
+        api_endpoint=mock.url,
+        enable_daydream_updates=False,
+        replay_seconds=args.replay_seconds,
+        rotate_before_expiry=args.rotate_before,
+    )
+    stop = threading.Event()
+
+    def outages():
+        while not stop.wait(outage_every):
+            mock.drop_connections()
+
+    if outage_every:
+        threading.Thread(target=outages, daemon=True).start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            client.start()
+    finally:
+        stop.set()
+        mock.stop()
+    marks = client.final_times
+    longest_gap = max((later - earlier for earlier, later in zip(marks, marks[1:])), default=0.0) * args.speed
+    return {
+        "connections": mock.connections,
+        "reconnects": client.reconnects,
+        "rotations": client.rotations,
+        "received": len(client.final_times),
+        "sent": len(mock.turns_sent()),
+        "replayed": mock.audio_bytes / (2 * SAMPLE_RATE) - args.seconds,
+        "gap": longest_gap,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--speed", type=float, default=4.0)
+    parser.add_argument("--client", choices=("thread", "async"), default="thread")
+    parser.add_argument("--turn-seconds", type=float, default=2.0)
+    parser.add_argument("--drop-after", type=float, default=7.0, help="audio seconds per connection in 'drops'")
+    parser.add_argument("--outage-every", type=float, default=3.0, help="wall seconds between outages in 'outage'")
+    parser.add_argument("--expires-in", type=float, default=4.0, help="session lifetime (wall seconds) in 'expiry'")
+    parser.add_argument("--rotate-before", type=float, default=2.0)
+    parser.add_argument("--replay-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("ASSEMBLYAI_API_KEY", "local")  # the mock accepts any key
+    check_replay_dedupe()
+    script = synthetic_script(args.seconds, args.turn_seconds)
+    scenarios = [
+        ("steady", {}, 0.0),
+        ("drops", {"drop_after": args.drop_after}, 0.0),
+        ("outage", {}, args.outage_every),
+        ("expiry", {"expires_in": args.expires_in}, 0.0),
+    ]
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "reconnect.wav")
+        synthetic_wav(path, args.seconds)
+        print(f"client {args.client}  {args.seconds:.0f}s of audio at {args.speed:g}x, a final turn every {args.turn_seconds:g}s")
+        print(f"{'scenario':<8}  {'conns':>5}  {'reconn':>6}  {'rotated':>7}  {'finals recv/sent':>16}  {'replayed s':>10}  {'max gap s':>9}")
+        for name, options, outage_every in scenarios:
+            result = run(args, path, script, options, outage_every)
+            print(
+                f"{name:<8}  {result['connections']:>5}  {result['reconnects']:>6}  {result['rotations']:>7}"
+                f"  {result['received']:>7} / {result['sent']:<6}  {result['replayed']:>10.1f}  {result['gap']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
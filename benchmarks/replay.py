@@ -0,0 +1,151 @@
+"""
+End-to-end replay with no network: WAV file -> client -> mock AssemblyAI -> mock Daydream.
+
+A synthetic WAV (low-level noise) and a turn script are generated unless
+``--wav``/``--script`` are given. The file is replayed through
+``WavFileSource`` at ``--speed`` into the thread-based or asyncio client, which
+talks to ``mock_assemblyai.py`` (with ``--asr-delay`` per message) and pushes
+prompts to ``mock_daydream.py``. Reports replay throughput, the latency from
+the mock sending each final turn to the client's transcript callback, and from
+there to the next Daydream PATCH. The same script produces the same turns at
+every speed, so runs are comparable.
+
+Usage:
+    python -m benchmarks.replay [--seconds 60] [--speed 4] [--client thread|async] [--asr-delay 0.0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import struct
+import tempfile
+import time
+import wave
+
+from async_stream_client import AsyncWeightedStreamClient
+from daydream_api import PromptDispatcher
+from local_summarizer import _percentile
+from mock_assemblyai import MockAssemblyAIServer, load_script
+from mock_daydream import MockDaydreamServer
+from wav_source import WavFileSource
+from weighted_audio_stream import CONNECTION_PARAMS, LazyKeywordMomentumTracker, WeightedStreamClient
+
+WORDS = "neon castle river glow forest mist lantern moss desert storm sand chrome ocean whale coral drift".split()
+
+
+def synthetic_wav(path: str, seconds: float) -> None:
+    rng = random.Random(5)
+    frames = int(seconds * CONNECTION_PARAMS["sample_rate"])
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(CONNECTION_PARAMS["sample_rate"])
+        wav.writeframes(struct.pack(f"<{frames}h", *(rng.randint(-200, 200) for _ in range(frames))))
+
+
+def synthetic_script(seconds: float, turn_seconds: float):
+    rng = random.Random(11)
+    turns, at = [], turn_seconds
+    while at <= seconds:
+        text = " ".join(rng.choices(WORDS, k=rng.randint(5, 12)))
+        turns.append((round(at, 2), text[0].upper() + text[1:] + "."))
+        at += turn_seconds
+    return turns
+
+
+def replay(args, wav_path: str, script) -> None:
+    asr = MockAssemblyAIServer(script, delay=args.asr_delay).start()
+    daydream = MockDaydreamServer().start()
+    dispatcher = PromptDispatcher(api_base=daydream.api_base)
+    received = {}  # final transcript -> wall time the callback saw it
+    finals = {text for _, text in script}
+
+    def on_transcript(text: str) -> None:
+        if text in finals and text not in received:
+            received[text] = time.time()
+
+    source = WavFileSource(wav_path, speed=args.speed)
+    options = dict(
+        audio_source=source,
+        api_endpoint=asr.url,
+        tracker=LazyKeywordMomentumTracker(),
+        dispatcher=dispatcher,
+        on_transcript=on_transcript,
+        daydream_api_key="sk_local",
+        default_stream_id="str_replay",
+        emit_mode="push",
+        debounce_seconds=0.05,
+        min_emit_interval=0.25,
+    )
+    os.environ.setdefault("ASSEMBLYAI_API_KEY", "local")  # the mock accepts any key
+    began = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if args.client == "async":
+                asyncio.run(AsyncWeightedStreamClient(**options).run())
+            else:
+                # returns once the mock closes the socket after Terminate
+                WeightedStreamClient(**options).start()
+        elapsed = time.perf_counter() - began
+        time.sleep(0.5)  # let the last prompt PATCH land
+    finally:
+        dispatcher.close()
+        asr.stop()
+        daydream.stop()
+
+    turns = asr.turns_sent()
+    patches = sorted(arrived for arrived, _, _ in daydream.received)
+    transcript_latency, prompt_latency = [], []
+    for sent_at, _, message in turns:
+        seen = received.get(message["transcript"])
+        if seen is None:
+            continue
+        transcript_latency.append(seen - sent_at)
+        after = next((arrived for arrived in patches if arrived >= seen), None)
+        if after is not None:
+            prompt_latency.append(after - seen)
+    transcript_latency.sort()
+    prompt_latency.sort()
+
+    audio = source.audio_seconds
+    print(f"client {args.client}  speed {args.speed:g}x  asr delay {args.asr_delay * 1000:.0f}ms")
+    print(f"audio replayed   {audio:8.1f}s in {elapsed:.1f}s wall ({audio / elapsed:.1f}x real time)")
+    print(f"final turns      {len(received):>4} of {len(script)} received  ({len(turns)} sent)")
+    print(f"Daydream PATCHes {len(patches):>4}")
+    for name, values in (("ASR final -> transcript", transcript_latency), ("transcript -> PATCH", prompt_latency)):
+        if values:
+            print(
+                f"{name:<24} p50 {_percentile(values, 0.5) * 1000:7.1f}ms  "
+                f"p95 {_percentile(values, 0.95) * 1000:7.1f}ms  max {values[-1] * 1000:7.1f}ms"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", help="16 kHz mono PCM16 WAV (default: synthetic noise)")
+    parser.add_argument("--script", help="turn script for mock_assemblyai.py (default: synthetic)")
+    parser.add_argument("--seconds", type=float, default=60.0, help="length of the synthetic WAV")
+    parser.add_argument("--turn-seconds", type=float, default=3.0)
+    parser.add_argument("--speed", type=float, default=4.0, help="replay speed (1 = real time, 0 = unpaced)")
+    parser.add_argument("--client", choices=("thread", "async"), default="thread")
+    parser.add_argument("--asr-delay", type=float, default=0.0, help="mock ASR latency per message")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        wav_path = args.wav
+        if wav_path is None:
+            wav_path = os.path.join(scratch, "replay.wav")
+            synthetic_wav(wav_path, args.seconds)
+        with wave.open(wav_path, "rb") as wav:
+            seconds = wav.getnframes() / wav.getframerate()
+        script = load_script(args.script) if args.script else synthetic_script(seconds, args.turn_seconds)
+        replay(args, wav_path, script)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Native-rate capture conversion: CPU per chunk and conversion quality.
+
+Runs ``audio_dsp.Resampler`` over 50ms capture buffers at the rates and channel
+counts USB and pro-audio interfaces typically run at, and reports per format:
+
+- CPU microseconds per captured 50ms chunk (downmix + resample + re-framing),
+  and the share of one core that is at real time;
+- ``seam``: largest sample difference between converting in 50ms chunks and
+  converting the whole signal in one call (0 means no chunk-boundary artifacts);
+- ``ripple``: level error of a 1 kHz tone (passband);
+- ``alias``: level of a tone above 8 kHz after conversion, relative to the
+  input (how much folds back into the 16 kHz stream).
+
+Usage:
+    python -m benchmarks.resample [--seconds 10] [--formats 48000x2 44100x2 48000x1 32000x1 16000x1]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List
+
+import numpy as np
+
+from audio_dsp import Resampler
+from weighted_audio_stream import FRAMES_PER_BUFFER, SAMPLE_RATE
+
+
+def tone(rate: int, channels: int, seconds: float, frequency: float) -> bytes:
+    t = np.arange(int(rate * seconds)) / rate
+    samples = (8000.0 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+    return np.repeat(samples, channels).tobytes()
+
+
+def chunked(data: bytes, rate: int, channels: int) -> List[bytes]:
+    step = rate * FRAMES_PER_BUFFER // SAMPLE_RATE * channels * 2
+    return [data[offset : offset + step] for offset in range(0, len(data), step)]
+
+
+def convert(resampler: Resampler, chunks: List[bytes]) -> np.ndarray:
+    frames = [frame for chunk in chunks for frame in resampler.process(chunk)]
+    return np.frombuffer(b"".join(frames), dtype=np.int16).astype(np.float64)
+
+
+def level_db(samples: np.ndarray) -> float:
+    settled = samples[SAMPLE_RATE // 10 : -SAMPLE_RATE // 10]  # skip the filter's start-up and tail
+    rms = np.sqrt(np.mean(settled**2)) if len(settled) else 0.0
+    return float(20.0 * np.log10(max(rms, 1e-3) / (8000.0 / np.sqrt(2))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--formats", nargs="+", default=["48000x2", "44100x2", "48000x1", "32000x1", "16000x1"])
+    args = parser.parse_args()
+
+    print(f"{'format':<10}  {'taps':>5}  {'us/chunk':>8}  {'core %':>6}  {'seam':>5}  {'ripple dB':>9}  {'alias dB':>8}")
+    for spec in args.formats:
+        rate, channels = (int(part) for part in spec.split("x"))
+        chunks = chunked(tone(rate, channels, args.seconds, 1000.0), rate, channels)
+
+        resampler = Resampler(rate, SAMPLE_RATE, channels)
+        started = time.process_time()
+        streamed = convert(resampler, chunks)
+        micros = (time.process_time() - started) / len(chunks) * 1e6
+
+        whole = convert(Resampler(rate, SAMPLE_RATE, channels), [b"".join(chunks)])
+        seam = float(np.max(np.abs(streamed - whole[: len(streamed)]))) if len(streamed) else 0.0
+
+        alias_chunks = chunked(tone(rate, channels, 2.0, min(12000.0, 0.45 * rate)), rate, channels)
+        alias = level_db(convert(Resampler(rate, SAMPLE_RATE, channels), alias_chunks))
+        alias_text = "n/a" if rate <= SAMPLE_RATE else f"{alias:.1f}"
+        print(
+            f"{spec:<10}  {getattr(resampler, 'taps_per_phase', 0):>5}  {micros:>8.1f}"
+            f"  {micros / 50000.0:>6.2%}  {seam:>5.0f}  {level_db(streamed):>9.2f}  {alias_text:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Sentence segmentation cost on multi-hour unpunctuated speech.
+
+Compares the previous buffer-and-resplit approach with ``SentenceSegmenter``
+on ~150 words per minute of text without terminal punctuation, delivered as
+one fragment per turn.
+
+Usage:
+    python -m benchmarks.sentence_segmenter [--hours 3] [--legacy-hours 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+
+from weighted_audio_stream import SentenceSegmenter
+
+WORDS_PER_MINUTE = 150
+WORDS_PER_TURN = 12
+VOCABULARY = ("castle", "river", "neon", "forest", "glass", "ocean", "ember", "violet", "storm", "lantern", "quiet", "drift")
+
+
+def _turns(hours: float, seed: int = 5):
+    rng = random.Random(seed)
+    total_words = int(hours * 60 * WORDS_PER_MINUTE)
+    for _ in range(total_words // WORDS_PER_TURN):
+        yield " ".join(rng.choice(VOCABULARY) for _ in range(WORDS_PER_TURN))
+
+
+class LegacySegmenter:
+    """The pre-segmenter ``_ingest_sentence``: append and re-split the whole buffer."""
+
+    def __init__(self, on_sentence):
+        self.on_sentence = on_sentence
+        self.pending_text = ""
+
+    def append(self, text: str) -> None:
+        fragment = text.strip()
+        if not fragment:
+            return
+        if self.pending_text:
+            self.pending_text += " "
+        self.pending_text += fragment
+        sentences = re.split(r"(?<=[.!?])\s+", self.pending_text)
+        if len(sentences) <= 1:
+            return
+        self.pending_text = sentences[-1]
+        for sentence in sentences[:-1]:
+            self.on_sentence(sentence)
+
+
+def _run(segmenter, hours: float):
+    seconds_per_turn = WORDS_PER_TURN * 60.0 / WORDS_PER_MINUTE
+    now = 1.0
+    began = time.perf_counter()
+    turns = 0
+    for text in _turns(hours):
+        now += seconds_per_turn
+        if isinstance(segmenter, SentenceSegmenter):
+            segmenter.append(text, now=now)
+        else:
+            segmenter.append(text)
+        turns += 1
+    return time.perf_counter() - began, turns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--legacy-hours", type=float, default=3.0, help="the legacy path is quadratic in the unflushed buffer")
+    args = parser.parse_args()
+
+    sentences = []
+    legacy = LegacySegmenter(sentences.append)
+    elapsed, turns = _run(legacy, args.legacy_hours)
+    print(
+        f"legacy      {args.legacy_hours:>4.1f}h  {turns:>6} turns  {elapsed:8.3f}s  "
+        f"{elapsed / turns * 1e6:9.1f} us/turn  pending={len(legacy.pending_text)} chars  sentences={len(sentences)}"
+    )
+
+    sentences = []
+    segmenter = SentenceSegmenter(sentences.append)
+    elapsed, turns = _run(segmenter, args.hours)
+    print(
+        f"segmenter   {args.hours:>4.1f}h  {turns:>6} turns  {elapsed:8.3f}s  "
+        f"{elapsed / turns * 1e6:9.1f} us/turn  pending={len(segmenter.pending_text)} chars  sentences={len(sentences)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Summarizer time per hour of speech: full re-summarization vs. incremental mode.
+
+Replays a synthetic session into ``SLMSummaryBridge`` instances, one with
+``incremental=False`` and one with the default incremental mode, running one
+summary cycle per ``--interval`` seconds of speech. A turn ends every
+``--turn-seconds`` while the speaker talks; ``--pause-fraction`` of cycles are
+silent. Each turn arrives as Universal Streaming would send it, one growing
+partial per word then the end-of-turn and formatted finals, through a
+``WeightedStreamClient`` wired like ``main()`` (``on_final=bridge.ingest``).
+A third row wires ``on_transcript`` instead, to show what partials cost.
+PATCHes go to a local Daydream stand-in.
+
+By default the real ``LocalSummarizer`` runs and the wall-clock seconds spent
+waiting on it are reported. ``--proxy`` swaps in a summarizer that only counts input words, for
+machines without torch/transformers; encoder cost scales with those words.
+
+Usage:
+    python -m benchmarks.slm_incremental [--minutes 10] [--proxy]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import random
+
+from daydream_api import PromptDispatcher
+from mock_daydream import MockDaydreamServer
+from slm_daydream_bridge import SLMSummaryBridge
+from weighted_audio_stream import WeightedStreamClient
+
+WORDS = "neon castle river glow forest mist lantern moss desert storm sand chrome ocean whale coral drift".split()
+
+
+class WordCountSummarizer:
+    """Cost proxy: counts input words and returns a short deterministic phrase."""
+
+    def __init__(self):
+        self.words = 0
+
+    def summarize(self, text: str, budget=None) -> str:
+        words = [word.strip(".") for word in text.split()]
+        self.words += len(words)
+        return " ".join(sorted(set(words))[:5]) + "."
+
+
+def _speak(client: WeightedStreamClient, turn_order: int, words) -> None:
+    for count in range(1, len(words) + 1):
+        client._handle_turn(None, {"turn_order": turn_order, "transcript": " ".join(words[:count]), "end_of_turn": False})
+    final = " ".join(words)
+    client._handle_turn(None, {"turn_order": turn_order, "transcript": final, "end_of_turn": True, "turn_is_formatted": False})
+    formatted = final.capitalize() + "."
+    client._handle_turn(None, {"turn_order": turn_order, "transcript": formatted, "end_of_turn": True, "turn_is_formatted": True})
+
+
+def replay(bridge: SLMSummaryBridge, wiring: str, minutes: float, interval: float, turn_seconds: float, pause_fraction: float):
+    client = WeightedStreamClient(enable_daydream_updates=False, offload_messages=False, **{wiring: bridge.ingest})
+    rng = random.Random(9)
+    per_cycle = max(1, round(interval / turn_seconds))
+    turn_order = 0
+    for _ in range(int(minutes * 60 / interval)):
+        if rng.random() < pause_fraction:
+            bridge.run_once()
+            continue
+        for _ in range(per_cycle):
+            _speak(client, turn_order, rng.choices(WORDS, k=rng.randint(4, 14)))
+            turn_order += 1
+        bridge.run_once()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0, help="minutes of speech to replay")
+    parser.add_argument("--interval", type=float, default=8.0, help="seconds between summary cycles")
+    parser.add_argument("--turn-seconds", type=float, default=2.0)
+    parser.add_argument("--pause-fraction", type=float, default=0.25)
+    parser.add_argument("--proxy", action="store_true", help="count input words instead of running the model")
+    args = parser.parse_args()
+
+    os.environ.setdefault("ASSEMBLYAI_API_KEY", "local")  # the client never connects
+    runs = [("full", False, "on_final"), ("incremental", True, "on_final"), ("partials", True, "on_transcript")]
+    if args.proxy:
+        summarizers = {name: WordCountSummarizer() for name, _, _ in runs}
+    else:
+        from local_summarizer import LocalSummarizer
+
+        shared = LocalSummarizer()
+        shared.summarize("warm up the model before timing")
+        summarizers = {name: shared for name, _, _ in runs}
+
+    server = MockDaydreamServer().start()
+    dispatcher = PromptDispatcher(api_base=server.api_base)
+    hours = args.minutes / 60.0
+    results = {}
+    try:
+        for name, incremental, wiring in runs:
+            bridge = SLMSummaryBridge(
+                stream_id="str_bench",
+                api_key="sk_local",
+                interval=args.interval,
+                dispatcher=dispatcher,
+                summarizer=summarizers[name],
+                incremental=incremental,
+            )
+            with contextlib.redirect_stdout(io.StringIO()):
+                replay(bridge, wiring, args.minutes, args.interval, args.turn_seconds, args.pause_fraction)
+            results[name] = stats = bridge.stats
+            line = (
+                f"{name:<12} runs {stats['runs']:>5}  skipped {stats['skipped']:>4}  model calls {stats['summaries']:>5}"
+                f"  cache hits {stats['cache_hits']:>4}"
+            )
+            if args.proxy:
+                line += f"  input words {summarizers[name].words / hours:8.0f} /h"
+            else:
+                line += f"  model {stats['summary_seconds'] / hours:8.1f} s/h"
+            print(line)
+    finally:
+        dispatcher.close()
+        server.stop()
+
+    calls_saved = 1 - results["incremental"]["summaries"] / results["full"]["summaries"]
+    if args.proxy:
+        words_saved = 1 - summarizers["incremental"].words / summarizers["full"].words
+        print(f"input words saved: {words_saved:.1%}  model calls saved: {calls_saved:.1%}")
+    else:
+        saved = (results["full"]["summary_seconds"] - results["incremental"]["summary_seconds"]) / hours
+        print(f"model seconds saved per hour of speech: {saved:.1f}  model calls saved: {calls_saved:.1%}")
+
+
+if __name__ == "__main__":
+    main()
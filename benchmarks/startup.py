@@ -0,0 +1,139 @@
+"""
+Cold-start cost: import time per module and server time-to-ready.
+
+Each module is imported in a fresh interpreter under ``python -X importtime``
+and the cumulative time of its top-level import is reported, with the three
+slowest dependencies it pulled in. Then ``server.py --multi-session`` is
+launched and polled until ``/api/health`` (process answers) and ``/api/ready``
+(sessions loop up, summarizer warmed) return 200; polling stops early, with the
+reason, if ``/api/ready`` reports a failed component or the server exits.
+
+Usage:
+    python -m benchmarks.startup [--port 8765] [--ready-timeout 300] [--no-server]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Tuple
+
+MODULES = (
+    "daydream_api",
+    "weighted_audio_stream",
+    "async_stream_client",
+    "keyword_engine",
+    "local_summarizer",
+    "summarizer_pool",
+    "slm_daydream_bridge",
+    "session_manager",
+    "server",
+)
+
+
+def import_profile(module: str):
+    """(cumulative microseconds, [(microseconds, dependency), ...]) for ``import module``."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        error = (completed.stderr.strip().splitlines() or ["no output"])[-1]
+        raise RuntimeError(error)
+    total, deps = 0, []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2  # two spaces per nesting level
+        if depth == 0 and name.strip() == module:
+            total = int(cumulative)
+        elif depth == 1:
+            deps.append((int(cumulative), name.strip()))
+    deps.sort(reverse=True)
+    return total, deps[:3]
+
+
+def _status(url: str) -> Tuple[int, Dict]:
+    """(status code, JSON body); 0 when the server does not answer."""
+    try:
+        with urllib.request.urlopen(url, timeout=1.0) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as exc:
+        try:
+            return exc.code, json.loads(exc.read() or b"{}")
+        except ValueError:
+            return exc.code, {}
+    except (OSError, ValueError):
+        return 0, {}
+
+
+def time_to_ready(port: int, timeout: float):
+    """
+    Seconds from launching the server to the first 200 on /api/health and
+    /api/ready, plus why /api/ready never came (None once it did).
+    """
+    base = f"http://127.0.0.1:{port}/api"
+    began = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "--multi-session", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    healthy = ready = None
+    reason = f"not ready after {timeout:g}s"
+    try:
+        while time.perf_counter() - began < timeout:
+            if process.poll() is not None:
+                reason = f"server exited with status {process.returncode}"
+                break
+            if healthy is None and _status(f"{base}/health")[0] == 200:
+                healthy = time.perf_counter() - began
+            if healthy is not None:
+                status, body = _status(f"{base}/ready")
+                if status == 200:
+                    ready, reason = time.perf_counter() - began, None
+                    break
+                if body.get("failed"):
+                    reason = ", ".join(f"{name} {state}" for name, state in body["failed"].items())
+                    break
+            time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return healthy, ready, reason
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--no-server", action="store_true", help="only profile imports")
+    args = parser.parse_args()
+
+    print(f"{'module':<22}  {'import ms':>9}  slowest dependencies")
+    for module in MODULES:
+        try:
+            total, deps = import_profile(module)
+        except RuntimeError as exc:
+            print(f"{module:<22}  {'failed':>9}  {exc}")
+            continue
+        slowest = ", ".join(f"{name} {micros / 1000:.0f}ms" for micros, name in deps)
+        print(f"{module:<22}  {total / 1000:>9.1f}  {slowest}")
+
+    if args.no_server:
+        return
+    healthy, ready, reason = time_to_ready(args.port, args.ready_timeout)
+    fmt = lambda seconds: "n/a" if seconds is None else f"{seconds:.2f}s"  # noqa: E731
+    line = f"server --multi-session: /api/health {fmt(healthy)}  /api/ready {fmt(ready)}"
+    print(line if reason is None else f"{line}  ({reason})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+LocalSummarizer backends on CPU: fp32 PyTorch vs. dynamic int8 vs. ONNX Runtime.
+
+Each backend runs in its own subprocess so its peak RSS is measured in
+isolation. Reports load time, p50/p95 latency over a fixed set of transcript
+chunks, peak RSS, and agreement with the fp32 output (exact matches and mean
+word overlap). Run ``python local_summarizer.py --export`` first to keep the
+one-off conversion out of the load time.
+
+Usage:
+    python -m benchmarks.summarizer_backends [--backends torch int8 onnx] [--samples 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+
+WORDS = (
+    "the neon castle glows over the river while forest mist drifts between lanterns and moss "
+    "a desert storm throws sand against chrome towers and the ocean whale sings under coral"
+).split()
+
+
+def _samples(count: int):
+    rng = random.Random(13)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(40, 160))) + "." for _ in range(count)]
+
+
+def _worker(backend: str, samples: int) -> None:
+    from local_summarizer import LocalSummarizer
+
+    began = time.perf_counter()
+    summarizer = LocalSummarizer(backend=backend, device="cpu")
+    load_seconds = time.perf_counter() - began
+    summarizer.summarize("warm up the model before timing")
+
+    outputs, latencies = [], []
+    for text in _samples(samples):
+        started = time.perf_counter()
+        outputs.append(summarizer.summarize(text))
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    print(
+        json.dumps(
+            {
+                "backend": backend,
+                "load_s": load_seconds,
+                "p50_ms": latencies[len(latencies) // 2] * 1000.0,
+                "p95_ms": latencies[min(len(latencies) - 1, round(0.95 * (len(latencies) - 1)))] * 1000.0,
+                # ru_maxrss is KiB on Linux
+                "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+                "outputs": outputs,
+            }
+        )
+    )
+
+
+def _overlap(left: str, right: str) -> float:
+    a, b = set(left.lower().split()), set(right.lower().split())
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.samples)
+        return
+
+    results = {}
+    for backend in args.backends:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.summarizer_backends", "--worker", backend, "--samples", str(args.samples)],
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            error = (completed.stderr.strip().splitlines() or ["no output"])[-1]
+            print(f"{backend}: failed: {error}")
+            continue
+        results[backend] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    reference = results.get("torch")
+    print(f"{'backend':<8}  {'load s':>7}  {'p50 ms':>7}  {'p95 ms':>7}  {'peak RSS MB':>11}  {'exact':>6}  {'overlap':>7}")
+    for backend, result in results.items():
+        exact = overlap = float("nan")
+        if reference:
+            pairs = list(zip(reference["outputs"], result["outputs"]))
+            exact = sum(want == got for want, got in pairs) / len(pairs)
+            overlap = sum(_overlap(want, got) for want, got in pairs) / len(pairs)
+        print(
+            f"{backend:<8}  {result['load_s']:>7.1f}  {result['p50_ms']:>7.0f}  {result['p95_ms']:>7.0f}"
+            f"  {result['peak_rss_mb']:>11.0f}  {exact:>6.0%}  {overlap:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
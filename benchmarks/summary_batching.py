@@ -0,0 +1,75 @@
+"""
+Throughput and latency of the micro-batched summarization service on CPU.
+
+For each batch size, that many caller threads (one per concurrent session)
+submit transcript chunks back to back through one ``BatchingSummarizer``
+wrapping a single ``LocalSummarizer``. Batch size 1 is the old behaviour of
+callers queueing on one model. Needs torch, transformers and the model weights.
+
+Usage:
+    python -m benchmarks.summary_batching [--requests 64] [--max-wait-ms 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+
+from local_summarizer import BatchingSummarizer, LocalSummarizer, _percentile
+
+BATCH_SIZES = (1, 4, 8, 16)
+WORDS = (
+    "the neon castle glows over the river while forest mist drifts between lanterns and moss "
+    "a desert storm throws sand against chrome towers and the ocean whale sings under coral"
+).split()
+
+
+def _chunk(rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(60, 200))) + "."
+
+
+def run(summarizer: LocalSummarizer, batch_size: int, requests: int, max_wait_ms: float):
+    service = BatchingSummarizer(summarizer, max_batch_size=batch_size, max_wait_ms=max_wait_ms)
+    latencies = []
+    lock = threading.Lock()
+    per_caller = max(1, requests // batch_size)
+
+    def caller(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(per_caller):
+            started = time.perf_counter()
+            service.summarize(_chunk(rng))
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=caller, args=(seed,)) for seed in range(batch_size)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    stats = service.stats()
+    service.close()
+    latencies.sort()
+    return len(latencies) / elapsed, _percentile(latencies, 0.95), stats["mean_batch_size"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=64, help="requests per batch size")
+    parser.add_argument("--max-wait-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    summarizer = LocalSummarizer()
+    summarizer.summarize_batch([_chunk(random.Random(0))] * 2)  # warm up
+    print(f"{'batch':>5}  {'req/s':>7}  {'p95 ms':>8}  {'mean batch':>10}")
+    for batch_size in BATCH_SIZES:
+        throughput, p95, mean_batch = run(summarizer, batch_size, args.requests, args.max_wait_ms)
+        print(f"{batch_size:>5}  {throughput:>7.2f}  {p95 * 1000:>8.0f}  {mean_batch:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
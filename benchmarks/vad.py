@@ -0,0 +1,149 @@
+"""
+Energy VAD on replayed WAVs: how much audio it keeps off the uplink.
+
+Runs ``audio_dsp.EnergyVAD`` over each ``--wav`` file (16 kHz mono PCM16, e.g.
+what ``testaudio.py`` records) in 50ms chunks and reports the fraction of
+audio suppressed, uplink bytes vs. raw PCM (keep-alives included) and CPU per
+chunk. Without ``--wav`` it uses a synthetic fixture: syllable-rate bursts of
+noise-like "speech" between pauses over a drifting background hiss. Because
+the fixture's speech is known, the report also shows the share of speech
+chunks that went out (should be 100%), and end-of-turn latency with and without
+the VAD: a simulated recognizer ends a turn once it has received
+``--turn-silence`` seconds of non-speech audio after speech (AssemblyAI's
+``max_turn_silence``), and the latency is from the end of each utterance to
+that point. A turn the recognizer never ended before the next utterance counts
+as merged.
+
+Usage:
+    python -m benchmarks.vad [--wav recorded_audio.wav ...] [--threshold-db 10] [--hangover 0.6] [--turn-silence 2.4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import wave
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from audio_dsp import EnergyVAD
+from weighted_audio_stream import FRAMES_PER_BUFFER, SAMPLE_RATE
+
+
+def synthetic_speech(seconds: float = 120.0, seed: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """PCM16 samples and a per-chunk speech mask: ~2-6s utterances between ~1-8s pauses."""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    t = np.arange(total) / SAMPLE_RATE
+    hiss = rng.normal(0.0, 1.0, total) * 10 ** (-58 / 20) * (1.0 + 0.5 * np.sin(2 * np.pi * t / 40.0))
+    speech = np.zeros(total, dtype=bool)
+    position = int(rng.uniform(1, 3) * SAMPLE_RATE)
+    while position < total:
+        length = int(rng.uniform(2, 6) * SAMPLE_RATE)
+        speech[position : position + length] = True
+        position += length + int(rng.uniform(1, 8) * SAMPLE_RATE)
+    syllables = 0.5 * (1.0 + np.sin(2 * np.pi * 4.0 * t)) ** 2  # ~4 syllables per second
+    voice = rng.normal(0.0, 1.0, total) * 10 ** (-24 / 20) * syllables * speech
+    samples = np.clip((hiss + voice) * 32768.0, -32768, 32767).astype(np.int16)
+    chunks = len(samples) // FRAMES_PER_BUFFER
+    mask = speech[: chunks * FRAMES_PER_BUFFER].reshape(chunks, -1).any(axis=1)
+    return samples, mask
+
+
+def read_wav(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as wav:
+        if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) != (SAMPLE_RATE, 1, 2):
+            raise ValueError(f"{path}: expected {SAMPLE_RATE} Hz mono 16-bit PCM")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+
+def run(vad: EnergyVAD, samples: np.ndarray, mask: Optional[np.ndarray]):
+    raw = samples.tobytes()
+    step = FRAMES_PER_BUFFER * 2
+    chunks = [raw[offset : offset + step] for offset in range(0, len(raw), step)]
+    sent_bytes = 0
+    sent = set()  # ids of captured chunks that went out, directly or as pre-roll
+    started = time.process_time()
+    for chunk in chunks:
+        payloads: List[bytes] = vad.feed(chunk)
+        sent_bytes += sum(len(payload) for payload in payloads)
+        sent.update(id(payload) for payload in payloads)
+    cpu = time.process_time() - started
+    recall = None
+    if mask is not None and mask.any():
+        recall = sum(id(chunks[index]) in sent for index in np.flatnonzero(mask)) / int(mask.sum())
+    return vad.suppressed_fraction, sent_bytes / len(raw), cpu / len(chunks) * 1e6, vad.keepalives, recall
+
+
+def end_of_turn_latency(vad: Optional[EnergyVAD], samples: np.ndarray, mask: np.ndarray, turn_silence: float):
+    """Seconds from each utterance's end to the simulated end of turn, and how many turns merged."""
+    raw = samples.tobytes()
+    step = FRAMES_PER_BUFFER * 2
+    chunks = [raw[offset : offset + step] for offset in range(0, len(raw), step)][: len(mask)]
+    speech = {id(chunks[index]) for index in np.flatnonzero(mask)}
+    chunk_seconds = FRAMES_PER_BUFFER / SAMPLE_RATE
+    latencies: List[float] = []
+    in_turn, heard, spoke_until = False, 0.0, 0.0
+    for index, chunk in enumerate(chunks):
+        now = (index + 1) * chunk_seconds
+        if mask[index]:
+            spoke_until = now
+        for payload in vad.feed(chunk) if vad is not None else [chunk]:
+            if id(payload) in speech:
+                in_turn, heard = True, 0.0
+            elif in_turn:
+                heard += len(payload) / 2 / SAMPLE_RATE
+                if heard >= turn_silence:
+                    latencies.append(now - spoke_until)
+                    in_turn = False
+    utterances = int(np.count_nonzero(mask[1:] & ~mask[:-1])) + int(mask[0])
+    return latencies, utterances - len(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", nargs="*", default=[], help="16 kHz mono PCM16 WAV files")
+    parser.add_argument("--seconds", type=float, default=120.0, help="length of the synthetic fixture")
+    parser.add_argument("--threshold-db", type=float, default=10.0)
+    parser.add_argument("--hangover", type=float, default=0.6, help="seconds")
+    parser.add_argument("--keepalive", type=float, default=0.5, help="seconds of audio between keep-alives")
+    parser.add_argument("--turn-silence", type=float, default=2.4, help="recognizer's max turn silence, seconds")
+    args = parser.parse_args()
+
+    inputs = [(path, read_wav(path), None) for path in args.wav]
+    if not inputs:
+        samples, mask = synthetic_speech(args.seconds)
+        inputs.append((f"synthetic ({mask.mean():.0%} speech)", samples, mask))
+
+    print(f"{'input':<28}  {'seconds':>7}  {'suppressed':>10}  {'uplink':>7}  {'keep-alives':>11}  {'us/chunk':>8}  {'speech sent':>11}")
+    def make_vad() -> EnergyVAD:
+        return EnergyVAD(
+            threshold_db=args.threshold_db,
+            hangover_seconds=args.hangover,
+            keepalive_seconds=args.keepalive,
+            turn_silence_seconds=args.turn_silence,
+        )
+
+    for name, samples, mask in inputs:
+        suppressed, uplink, micros, keepalives, recall = run(make_vad(), samples, mask)
+        sent = "n/a" if recall is None else f"{recall:.1%}"
+        print(
+            f"{name[-28:]:<28}  {len(samples) / SAMPLE_RATE:>7.1f}  {suppressed:>10.1%}  {uplink:>7.1%}"
+            f"  {keepalives:>11}  {micros:>8.1f}  {sent:>11}"
+        )
+
+    fixtures = [(name, samples, mask) for name, samples, mask in inputs if mask is not None]
+    if fixtures:
+        print(f"\nend of turn after {args.turn_silence:g}s of received silence")
+        print(f"{'input':<28}  {'uplink':<6}  {'p50 s':>6}  {'p95 s':>6}  {'max s':>6}  {'merged turns':>12}")
+    for name, samples, mask in fixtures:
+        for label, vad in (("raw", None), ("vad", make_vad())):
+            latencies, merged = end_of_turn_latency(vad, samples, mask, args.turn_silence)
+            ordered = sorted(latencies) or [float("nan")]
+            p50, p95 = ordered[len(ordered) // 2], ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+            print(f"{name[-28:]:<28}  {label:<6}  {p50:>6.2f}  {p95:>6.2f}  {ordered[-1]:>6.2f}  {merged:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Preallocated ring of fixed-size audio frames between capture and the uplink.
+
+PyAudio's callback thread writes each converted 50ms frame into the next slot
+of one ``bytearray`` allocated up front; the sender takes the oldest frame as a
+``memoryview`` of its slot (no copy), sends it and releases it. Capture never
+waits on the network: when the sender stalls and the ring fills, the oldest
+unsent frame is overwritten (or, if the sender holds it, the new frame is
+dropped) and counted. ``stats()`` reports what was captured, dropped and
+overflowed, the send-queue depth, and capture-to-send delay.
+
+Usage:
+    ring = CaptureRing()
+    ring.write(frame)              # capture thread
+    frame = ring.get(timeout=0.5)  # sender: memoryview, valid until release()
+    ws.send(frame)
+    ring.release()
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class CaptureRing:
+    """
+    Single-producer, single-consumer frame ring. ``capacity`` frames of
+    ``frame_bytes`` each (40 x 50ms = 2 s by default); ``delay_window`` recent
+    capture-to-release delays feed the percentiles in ``stats()``.
+    """
+
+    def __init__(self, frame_bytes: int = 1600, capacity: int = 40, delay_window: int = 1200):
+        if capacity < 2:
+            raise ValueError(f"capacity must be at least 2 frames, got {capacity}")
+        self.frame_bytes = frame_bytes
+        self.capacity = capacity
+        self.captured_frames = 0
+        self.sent_frames = 0
+        self.dropped_frames = 0
+        self.overflows = 0
+        self.max_depth = 0
+        self._buffer = bytearray(frame_bytes * capacity)
+        self._view = memoryview(self._buffer)
+        self._stamps = [0.0] * capacity
+        self._head = 0  # frames ever written; the next one goes to slot head % capacity
+        self._tail = 0  # oldest frame not yet released
+        self._held = False
+        self._delays: deque = deque(maxlen=delay_window)
+        self._ready = threading.Condition(threading.Lock())
+
+    @property
+    def depth(self) -> int:
+        """Frames captured but not yet sent."""
+        return self._head - self._tail
+
+    def write(self, frame: bytes) -> None:
+        """Copy one frame into the next slot; never blocks on the sender."""
+        with self._ready:
+            self.captured_frames += 1
+            if self._head - self._tail == self.capacity:
+                if self._held:
+                    self.dropped_frames += 1
+                    return
+                self._tail += 1
+                self.dropped_frames += 1
+            slot = self._head % self.capacity
+            start = slot * self.frame_bytes
+            self._view[start : start + self.frame_bytes] = frame
+            self._stamps[slot] = time.monotonic()
+            self._head += 1
+            self.max_depth = max(self.max_depth, self._head - self._tail)
+            self._ready.notify()
+
+    def note_overflow(self) -> None:
+        """Count an input overflow reported by PortAudio."""
+        self.overflows += 1
+
+    def get(self, timeout: Optional[float] = None) -> Optional[memoryview]:
+        """
+        The oldest unsent frame as a view of its slot, or ``None`` after
+        ``timeout``. The slot is not reused until ``release()``.
+        """
+        with self._ready:
+            if self._head == self._tail and not self._ready.wait_for(lambda: self._head != self._tail, timeout):
+                return None
+            self._held = True
+            start = (self._tail % self.capacity) * self.frame_bytes
+            return self._view[start : start + self.frame_bytes]
+
+    def release(self) -> None:
+        """Mark the frame from ``get()`` as sent and free its slot."""
+        with self._ready:
+            if not self._held:
+                return
+            self._held = False
+            self._delays.append(time.monotonic() - self._stamps[self._tail % self.capacity])
+            self._tail += 1
+            self.sent_frames += 1
+
+    def stats(self) -> Dict:
+        with self._ready:
+            delays = sorted(self._delays)
+            depth = self._head - self._tail
+
+        def percentile(fraction: float) -> Optional[float]:
+            return delays[min(len(delays) - 1, int(fraction * len(delays)))] * 1000.0 if delays else None
+
+        return {
+            "captured_frames": self.captured_frames,
+            "sent_frames": self.sent_frames,
+            "dropped_frames": self.dropped_frames,
+            "overflows": self.overflows,
+            "queue_depth": depth,
+            "max_queue_depth": self.max_depth,
+            "delay_p50_ms": percentile(0.5),
+            "delay_p95_ms": percentile(0.95),
+            "delay_max_ms": delays[-1] * 1000.0 if delays else None,
+        }
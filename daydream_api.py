@@ -3,14 +3,29 @@
 from __future__ import annotations
 
 import os
-from typing import Mapping, Optional
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Mapping, Optional, Set, Tuple
 
 import requests
 from dotenv import find_dotenv, load_dotenv
+from requests.adapters import HTTPAdapter
 
-load_dotenv(find_dotenv())
+API_BASE = "https://api.daydream.live/v1/streams"  # override with DAYDREAM_API_BASE
+REQUEST_TIMEOUT = 10.0
 
-API_BASE = "https://api.daydream.live/v1/streams"
+_env_loaded = False
+
+DoneCallback = Callable[[Optional[Exception]], None]
+
+
+def load_env() -> None:
+    """Load ``.env`` into the environment once; called on first use rather than at import."""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv(find_dotenv())
+        _env_loaded = True
 
 
 def update_prompt(
@@ -23,6 +38,7 @@ def update_prompt(
     Patch the Daydream stream with a weighted keyword list. Formats it as "(word, weight)" pairs.
     """
 
+    load_env()
     stream_id = stream_id or os.getenv("DAYDREAM_STREAM_ID")
     api_key = api_key or os.getenv("DAYDREAM_API_KEY")
     if not stream_id or not api_key:
@@ -42,6 +58,7 @@ def update_prompt_text(
     Patch the Daydream stream with a free-form prompt string (already summarized sentence, etc.).
     """
 
+    load_env()
     stream_id = stream_id or os.getenv("DAYDREAM_STREAM_ID")
     api_key = api_key or os.getenv("DAYDREAM_API_KEY")
     if not stream_id or not api_key:
@@ -51,12 +68,183 @@ def update_prompt_text(
 
 
 def _patch_stream(stream_id: str, api_key: str, prompt_value: str) -> None:
-    url = f"{API_BASE}/{stream_id}"
-    payload = {"params": {"prompt": prompt_value}}
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-
-    response = requests.patch(url, json=payload, headers=headers, timeout=10)
-    response.raise_for_status()
+    get_dispatcher().send(stream_id, api_key, prompt_value)
+
+
+class PromptDispatcher:
+    """
+    Sends Daydream prompt PATCHes from background workers over a keep-alive pool.
+
+    ``submit`` never blocks on the network. Only the newest pending prompt per
+    stream is kept: a prompt replaced before it was sent is counted as dropped,
+    and each stream has at most one PATCH in flight so updates land in order.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = 2,
+        pool_size: int = 8,
+        timeout: float = REQUEST_TIMEOUT,
+        api_base: Optional[str] = None,
+        latency_window: int = 1024,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        load_env()
+        self.api_base = api_base or os.getenv("DAYDREAM_API_BASE", API_BASE)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._pending: "OrderedDict[str, Tuple[str, str, float, Optional[DoneCallback]]]" = OrderedDict()
+        self._inflight: Set[str] = set()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._queue_delays: Deque[float] = deque(maxlen=latency_window)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def send(self, stream_id: str, api_key: str, prompt: str) -> None:
+        """Synchronously PATCH one prompt on the pooled session (raises on HTTP errors)."""
+        started = time.perf_counter()
+        try:
+            response = self.session.patch(
+                f"{self.api_base}/{stream_id}",
+                json={"params": {"prompt": prompt}},
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except Exception:
+            self._record(started, ok=False)
+            raise
+        self._record(started, ok=True)
+
+    def submit(
+        self,
+        stream_id: str,
+        api_key: str,
+        prompt: str,
+        on_done: Optional[DoneCallback] = None,
+    ) -> None:
+        """Queue ``prompt`` for ``stream_id``, replacing any prompt for it that is not yet sent."""
+        if not stream_id:
+            raise ValueError("stream_id is required to update Daydream")
+        if not api_key:
+            raise ValueError("Daydream API key missing")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("PromptDispatcher is closed")
+            replaced = self._pending.pop(stream_id, None)
+            if replaced is not None:
+                self.dropped += 1
+            self._pending[stream_id] = (api_key, prompt, time.perf_counter(), on_done)
+            self._ensure_workers()
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            latencies = sorted(self._latencies)
+            delays = sorted(self._queue_delays)
+            return {
+                "sent": self.sent,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "pending": len(self._pending),
+                "inflight": len(self._inflight),
+                "latency_p50_ms": _percentile(latencies, 0.50) * 1000.0,
+                "latency_p95_ms": _percentile(latencies, 0.95) * 1000.0,
+                "latency_max_ms": (latencies[-1] if latencies else 0.0) * 1000.0,
+                "queue_delay_p95_ms": _percentile(delays, 0.95) * 1000.0,
+            }
+
+    def close(self, timeout: float = 2.0) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self.session.close()
+
+    def _record(self, started: float, *, ok: bool) -> None:
+        with self._cond:
+            self._latencies.append(time.perf_counter() - started)
+            if ok:
+                self.sent += 1
+            else:
+                self.failed += 1
+
+    def _ensure_workers(self) -> None:
+        # replace workers that died (e.g. in a BaseException) so PATCHes never stop silently
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._worker, name=f"daydream-dispatch-{len(self._threads)}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_job(self) -> Optional[Tuple[str, str, str, Optional[DoneCallback]]]:
+        with self._cond:
+            while True:
+                for stream_id in self._pending:
+                    if stream_id not in self._inflight:
+                        api_key, prompt, queued_at, on_done = self._pending.pop(stream_id)
+                        self._inflight.add(stream_id)
+                        self._queue_delays.append(time.perf_counter() - queued_at)
+                        return stream_id, api_key, prompt, on_done
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _worker(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            stream_id, api_key, prompt, on_done = job
+            error: Optional[Exception] = None
+            try:
+                self.send(stream_id, api_key, prompt)
+            except Exception as exc:  # noqa: BLE001  # anything uncaught would kill the worker
+                error = exc
+                if on_done is None:
+                    print(f"[daydream] failed to update stream {stream_id}: {exc}")
+            finally:
+                with self._cond:
+                    self._inflight.discard(stream_id)
+                    self._cond.notify_all()
+            if on_done:
+                try:
+                    on_done(error)
+                except Exception as exc:  # noqa: BLE001
+                    print(f"[daydream] dispatch callback error: {exc}")
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+_dispatcher: Optional[PromptDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> PromptDispatcher:
+    """Process-wide dispatcher shared by every stream client and bridge."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = PromptDispatcher()
+        return _dispatcher
@@ -0,0 +1,181 @@
+"""
+Ordered worker stages and a timed callback executor for websocket messages.
+
+The websocket-client receive thread should only read the socket. It hands each
+raw frame to a ``Stage``: a bounded FIFO drained in order by one worker thread,
+which may feed the next stage. User callbacks go to a ``CallbackExecutor``, a
+stage of its own, so a slow callback delays neither parsing nor the socket;
+every callback is timed per name.
+
+Lag policy: a full stage first sheds its oldest *sheddable* item (for ASR,
+partial transcripts, which the next partial or final supersedes) and counts it;
+if nothing queued is sheddable, ``submit`` blocks, so a stuck consumer
+back-pressures the stage before it and finally the socket instead of losing
+finals or growing without bound.
+
+Usage:
+    stage = Stage("parse", handle, maxsize=1024)
+    stage.submit(frame)  # receive thread
+    stage.close()
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+_CLOSE = object()
+
+
+def _percentiles(samples: Deque[float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+    return {
+        "p50_ms": ordered[len(ordered) // 2] * 1000.0,
+        "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000.0,
+        "max_ms": ordered[-1] * 1000.0,
+    }
+
+
+class Stage:
+    """
+    One worker thread running ``handler(item)`` for each submitted item, in
+    submission order. ``sheddable(item)`` marks items that may be dropped when
+    the queue is full. Handler errors are printed and counted, never raised.
+    ``stats()`` reports depth, shed items and queueing lag (submit to start).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], None],
+        *,
+        maxsize: int = 256,
+        sheddable: Optional[Callable[[Any], bool]] = None,
+        window: int = 1000,
+    ):
+        self.name = name
+        self.handler = handler
+        self.maxsize = maxsize
+        self.sheddable = sheddable
+        self.submitted = 0
+        self.processed = 0
+        self.shed = 0
+        self.errors = 0
+        self.max_depth = 0
+        self._closed = False
+        self._items: Deque[Tuple[float, Any]] = deque()
+        self._lags: Deque[float] = deque(maxlen=window)
+        self._changed = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def submit(self, item: Any) -> None:
+        with self._changed:
+            if self._closed:
+                return
+            while len(self._items) >= self.maxsize and not self._shed_one():
+                self._changed.wait()
+            self._items.append((time.monotonic(), item))
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._changed.notify_all()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Process what is queued, then stop the worker; later submissions are ignored."""
+        with self._changed:
+            if self._closed:
+                return
+            self._closed = True
+            self._items.append((time.monotonic(), _CLOSE))
+            self._changed.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def stats(self) -> Dict:
+        with self._changed:
+            lags = deque(self._lags)
+            depth = len(self._items)
+        return {
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "shed": self.shed,
+            "errors": self.errors,
+            "queue_depth": depth,
+            "max_queue_depth": self.max_depth,
+            "lag": _percentiles(lags),
+        }
+
+    def _shed_one(self) -> bool:
+        if self.sheddable is None:
+            return False
+        for index, (_, item) in enumerate(self._items):
+            if item is not _CLOSE and self.sheddable(item):
+                del self._items[index]
+                self.shed += 1
+                return True
+        return False
+
+    def _run(self) -> None:
+        while True:
+            with self._changed:
+                while not self._items:
+                    self._changed.wait()
+                submitted_at, item = self._items.popleft()
+                self._lags.append(time.monotonic() - submitted_at)
+                self._changed.notify_all()
+            if item is _CLOSE:
+                return
+            try:
+                self.handler(item)
+            except Exception as exc:  # noqa: BLE001
+                self.errors += 1
+                print(f"[{self.name}] error: {exc}")
+            self.processed += 1
+
+
+class CallbackExecutor(Stage):
+    """
+    Runs callbacks in submission order on their own thread and times each one
+    by name; calls longer than ``slow_seconds`` are reported.
+    """
+
+    def __init__(self, name: str = "callbacks", *, maxsize: int = 256, slow_seconds: float = 0.25):
+        super().__init__(name, self._invoke, maxsize=maxsize, sheddable=lambda call: call[3])
+        self.slow_seconds = slow_seconds
+        self._timings: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def call(self, name: str, callback: Callable, *args, sheddable: bool = False) -> None:
+        self.submit((name, callback, args, sheddable))
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        with self._changed:
+            timings = {name: deque(samples) for name, samples in self._timings.items()}
+        stats["callbacks"] = {
+            name: {"calls": self._counts[name], **_percentiles(samples)} for name, samples in timings.items()
+        }
+        return stats
+
+    def _invoke(self, call: Tuple[str, Callable, tuple, bool]) -> None:
+        name, callback, args, _ = call
+        started = time.perf_counter()
+        try:
+            callback(*args)
+        except Exception as exc:  # noqa: BLE001
+            self.errors += 1
+            print(f"[{name} callback] error: {exc}")
+        elapsed = time.perf_counter() - started
+        with self._changed:
+            self._timings.setdefault(name, deque(maxlen=1000)).append(elapsed)
+            self._counts[name] = self._counts.get(name, 0) + 1
+        if elapsed > self.slow_seconds:
+            print(f"[{name} callback] slow: {elapsed * 1000.0:.0f}ms")
@@ -0,0 +1,313 @@
+"""
+Vectorized keyword momentum for many sessions at once.
+
+All sessions share one vocabulary index and one weight matrix (a dense row per
+session). Decay is a single in-place multiply across every session per tick,
+ingest for many sessions is one scatter-add, and per-session top-k comes from
+``argpartition`` instead of sorting a dict.
+``KeywordEngine.session()`` returns a tracker-compatible handle, so a session
+can be passed to ``WeightedStreamClient(tracker=...)``.
+
+Usage:
+    engine = KeywordEngine()
+    session = engine.session()
+    session.ingest("neon castles over the river")
+    session.current_keywords()
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from weighted_audio_stream import STOPWORDS, KeywordMomentumTracker, Keywords
+
+
+class KeywordEngine:
+    """
+    Shared weight matrix for many keyword sessions.
+
+    Weights are decayed at ``tick`` granularity: ingest adds counts to a row, and
+    ``tick`` (called automatically once ``tick_interval`` has elapsed) multiplies
+    the whole matrix by the decay factor and zeroes entries under ``decay_floor``.
+    Because decay is uniform, a row's top-k can only change through columns it
+    touched since its last ranking, so ranking runs ``argpartition`` over those
+    candidates plus the previous top-k rather than over the whole vocabulary.
+    Columns no session uses any more are recycled every ``compact_every`` ticks.
+    """
+
+    PAD = 0  # column 0 is never assigned a word and stays zero; it pads candidate rows
+
+    def __init__(
+        self,
+        *,
+        max_keywords: int = 8,
+        halflife_seconds: float = 20.0,
+        decay_floor: float = 0.05,
+        tick_interval: float = 0.25,
+        compact_every: int = 240,
+        initial_sessions: int = 16,
+        initial_vocabulary: int = 1024,
+        dtype=np.float32,
+    ):
+        self.max_keywords = max_keywords
+        self.halflife = halflife_seconds
+        self.decay_floor = decay_floor
+        self.tick_interval = tick_interval
+        self.compact_every = compact_every
+        self.weights = np.zeros((initial_sessions, max(2, initial_vocabulary)), dtype=dtype)
+        self.vocabulary: Dict[str, int] = {}
+        self.words: List[Optional[str]] = [None]
+        self.last_tick = time.time()
+        self._free_rows: List[int] = []
+        self._free_columns: List[int] = []
+        self._rows_used = 0
+        self._ticks = 0
+        self._touched: Dict[int, Set[int]] = {}
+        self._ranked: Dict[int, List[int]] = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    def session(self, max_keywords: Optional[int] = None) -> "EngineSession":
+        with self._lock:
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row = self._rows_used
+                self._rows_used += 1
+                if row >= self.weights.shape[0]:
+                    self._grow(rows=2 * self.weights.shape[0])
+        return EngineSession(self, row, min(max_keywords or self.max_keywords, self.max_keywords))
+
+    def release(self, session: "EngineSession") -> None:
+        with self._lock:
+            self.weights[session.row, :] = 0.0
+            self._touched.pop(session.row, None)
+            self._ranked.pop(session.row, None)
+            self._free_rows.append(session.row)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def add(self, row: int, tokens: List[str], now: Optional[float] = None) -> None:
+        self.add_batch([(row, tokens)], now)
+
+    def add_batch(self, updates: Iterable[Tuple[int, List[str]]], now: Optional[float] = None) -> None:
+        """Count tokens for many rows with a single scatter-add."""
+        with self._lock:
+            self.maybe_tick(now)
+            rows: List[int] = []
+            columns: List[int] = []
+            for row, tokens in updates:
+                touched = self._touched.setdefault(row, set())
+                for token in tokens:
+                    column = self._column(token)
+                    rows.append(row)
+                    columns.append(column)
+                    touched.add(column)
+            if columns:
+                np.add.at(self.weights, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), 1.0)
+
+    def maybe_tick(self, now: Optional[float] = None) -> bool:
+        current_time = now or time.time()
+        if current_time - self.last_tick < self.tick_interval:
+            return False
+        self.tick(current_time)
+        return True
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """Decay every session in one vectorized pass."""
+        current_time = now or time.time()
+        with self._lock:
+            elapsed = current_time - self.last_tick
+            if elapsed <= 0:
+                return
+            active = self.weights[: self._rows_used, : len(self.words)]
+            np.multiply(active, 0.1 ** (elapsed / self.halflife), out=active)
+            np.putmask(active, active <= self.decay_floor, 0.0)
+            self._drop_zeroed()
+            self.last_tick = current_time
+            self._ticks += 1
+            if self.compact_every and self._ticks % self.compact_every == 0:
+                self._recycle_columns()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def top_keywords(self, row: int, k: Optional[int] = None) -> Keywords:
+        return self.top_keywords_all(k, rows=[row])[row]
+
+    def top_keywords_all(self, k: Optional[int] = None, rows: Optional[List[int]] = None) -> Dict[int, Keywords]:
+        """Top-k for every (or each listed) row, ranked by one ``argpartition`` over all rows."""
+        k = min(k or self.max_keywords, self.max_keywords)
+        with self._lock:
+            if rows is None:
+                free = set(self._free_rows)
+                rows = [row for row in range(self._rows_used) if row not in free]
+            self._rank(rows)
+            words = self.words
+            weights = self.weights
+            result: Dict[int, Keywords] = {}
+            for row in rows:
+                columns = self._ranked.get(row, [])[:k]
+                values = weights[row, columns].tolist() if columns else []
+                result[row] = tuple(
+                    (words[column], weight)
+                    for column, weight in zip(columns, values)
+                    if weight > 0.0 and words[column] is not None
+                )
+            return result
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _rank(self, rows: List[int]) -> None:
+        stale = [row for row in rows if self._touched.get(row)]
+        if not stale:
+            return
+        candidates = []
+        for row in stale:
+            columns = self._touched.pop(row)
+            columns.update(self._ranked.get(row, ()))
+            candidates.append(list(columns))
+        width = max(len(columns) for columns in candidates)
+        padded = np.full((len(stale), width), self.PAD, dtype=np.intp)
+        for index, columns in enumerate(candidates):
+            padded[index, : len(columns)] = columns
+        # rank on negated weights: introselect degrades when picking the largest k
+        # out of rows that are mostly tied zeros
+        negated = np.negative(self.weights[np.array(stale, dtype=np.intp)[:, None], padded])
+        k = self.max_keywords
+        if k < width:
+            keep = np.argpartition(negated, k - 1, axis=1)[:, :k]
+            padded = np.take_along_axis(padded, keep, axis=1)
+            negated = np.take_along_axis(negated, keep, axis=1)
+        order = np.argsort(negated, axis=1, kind="stable")
+        ranked_columns = np.take_along_axis(padded, order, axis=1).tolist()
+        ranked_values = np.take_along_axis(negated, order, axis=1).tolist()
+        for row, columns, values in zip(stale, ranked_columns, ranked_values):
+            self._ranked[row] = [column for column, value in zip(columns, values) if value < 0]
+
+    def _drop_zeroed(self) -> None:
+        # a ranked column that decayed to zero is no longer a keyword; words ranked
+        # below it decayed too, so the rest of the ranking stays exact
+        weights = self.weights
+        for row, columns in self._ranked.items():
+            if columns:
+                values = weights[row, columns].tolist()
+                if not all(values):
+                    self._ranked[row] = [column for column, value in zip(columns, values) if value]
+
+    def _column(self, token: str) -> int:
+        column = self.vocabulary.get(token)
+        if column is not None:
+            return column
+        if self._free_columns:
+            column = self._free_columns.pop()
+            self.words[column] = token
+        else:
+            column = len(self.words)
+            self.words.append(token)
+            if column >= self.weights.shape[1]:
+                self._grow(columns=2 * self.weights.shape[1])
+        self.vocabulary[token] = column
+        return column
+
+    def _recycle_columns(self) -> None:
+        active = self.weights[: self._rows_used, : len(self.words)]
+        dead = np.flatnonzero(~active.any(axis=0))
+        recycled: Set[int] = set()
+        for column in dead.tolist():
+            word = self.words[column]
+            if word is not None:
+                del self.vocabulary[word]
+                self.words[column] = None
+                self._free_columns.append(column)
+                recycled.add(column)
+        if not recycled:
+            return
+        # a recycled column may be reassigned to another session's word
+        for row, columns in self._ranked.items():
+            self._ranked[row] = [column for column in columns if column not in recycled]
+        for columns in self._touched.values():
+            columns -= recycled
+
+    def _grow(self, *, rows: Optional[int] = None, columns: Optional[int] = None) -> None:
+        shape = (rows or self.weights.shape[0], columns or self.weights.shape[1])
+        grown = np.zeros(shape, dtype=self.weights.dtype)
+        grown[: self.weights.shape[0], : self.weights.shape[1]] = self.weights
+        self.weights = grown
+
+
+class EngineSession:
+    """
+    One session's view of a ``KeywordEngine``, with the tracker interface used by
+    ``WeightedStreamClient`` (``tokenize``, ``ingest``, ``ingest_tokens``,
+    ``current_keywords``, ``snapshot_version`` and listeners).
+    """
+
+    WORD_PATTERN = KeywordMomentumTracker.WORD_PATTERN
+
+    def __init__(self, engine: KeywordEngine, row: int, max_keywords: int):
+        self.engine = engine
+        self.row = row
+        self.max_keywords = max_keywords
+        self.last_emitted: Keywords = ()
+        self._version = 0
+        self._dirty = False
+        self._listeners: List[Callable[[Keywords], None]] = []
+
+    def tokenize(self, text: str) -> List[str]:
+        return [match for match in self.WORD_PATTERN.findall(text.lower()) if len(match) > 2 and match not in STOPWORDS]
+
+    def ingest(self, text: str, now: Optional[float] = None) -> Keywords:
+        if not text:
+            return self.last_emitted
+        return self.ingest_tokens(self.tokenize(text), now)
+
+    def ingest_tokens(self, tokens: List[str], now: Optional[float] = None) -> Keywords:
+        self.engine.add(self.row, tokens, now)
+        self._dirty = True
+        if self._listeners:
+            self._refresh_snapshot()
+        return self.last_emitted
+
+    def current_keywords(self) -> Keywords:
+        if self._dirty:
+            self._refresh_snapshot()
+        return self.last_emitted
+
+    @property
+    def snapshot_version(self) -> int:
+        if self._dirty:
+            self._refresh_snapshot()
+        return self._version
+
+    def add_listener(self, callback: Callable[[Keywords], None]) -> None:
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Keywords], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def close(self) -> None:
+        self.engine.release(self)
+
+    def _refresh_snapshot(self) -> None:
+        self._dirty = False
+        ranked = self.engine.top_keywords(self.row, self.max_keywords)
+        if [word for word, _ in ranked] == [word for word, _ in self.last_emitted]:
+            return
+        self.last_emitted = ranked
+        self._version += 1
+        for listener in self._listeners:
+            listener(self.last_emitted)
@@ -1,79 +1,224 @@
 """
 Local SLM-based summarizer built on Hugging Face transformers.
 
+Backends (``backend=`` or ``SLM_BACKEND``): ``torch`` (fp32, default), ``int8``
+(PyTorch dynamic int8 quantization of the Linear layers, CPU) and ``onnx``
+(ONNX Runtime via ``optimum[onnxruntime]``, CPU). Converted models are cached
+under ``SLM_CACHE_DIR`` (default ``~/.cache/mindstream/slm``); build the cache
+ahead of time with ``python local_summarizer.py --export int8|onnx``.
+
 Usage:
     from local_summarizer import LocalSummarizer
     summarizer = LocalSummarizer()
     summary = summarizer.summarize("long transcript text ...")
+
+    # many callers sharing one model
+    service = BatchingSummarizer(summarizer, max_batch_size=8, max_wait_ms=20)
+    future = service.submit("long transcript text ...")
 """
 
 from __future__ import annotations
 
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
 from functools import lru_cache
-from typing import Optional
+from typing import Deque, Dict, List, Optional, Tuple
+
+# torch and transformers are imported where they are used: importing this module
+# stays cheap, and the cost is paid when a model actually loads
+
+DEFAULT_PREFIX = "Summarize in 2 short phrases: "
+BACKENDS = ("torch", "int8", "onnx")
+WARMUP_TEXT = "Mindstream listens to speech and turns it into visuals."
+CACHE_DIR = os.path.expanduser(os.getenv("SLM_CACHE_DIR", "~/.cache/mindstream/slm"))
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a summary could not be produced within its latency budget."""
+
 
-import torch
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+@lru_cache(maxsize=1)
+def _deadline_criteria():
+    import torch
+    from transformers import StoppingCriteria
+
+    class Deadline(StoppingCriteria):
+        """Stops ``generate`` once the wall-clock deadline has passed."""
+
+        def __init__(self, deadline: float):
+            self.deadline = deadline
+            self.hit = False
+
+        def __call__(self, input_ids, scores, **kwargs):
+            self.hit = time.perf_counter() >= self.deadline
+            return torch.full((input_ids.shape[0],), self.hit, dtype=torch.bool, device=input_ids.device)
+
+    return Deadline
 
 
 @lru_cache(maxsize=1)
 def _load_tokenizer(model_id: str):
+    from transformers import AutoTokenizer
+
     return AutoTokenizer.from_pretrained(model_id)
 
 
-@lru_cache(maxsize=1)
-def _load_model(model_id: str):
-    return AutoModelForSeq2SeqLM.from_pretrained(model_id)
+@lru_cache(maxsize=len(BACKENDS))
+def _load_model(model_id: str, backend: str = "torch"):
+    import torch
+    from transformers import AutoModelForSeq2SeqLM
+
+    if backend == "torch":
+        return AutoModelForSeq2SeqLM.from_pretrained(model_id)
+    path = export_model(model_id, backend)
+    if backend == "int8":
+        return torch.load(path, weights_only=False)
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    return ORTModelForSeq2SeqLM.from_pretrained(path)
+
+
+def _cache_path(model_id: str, backend: str) -> str:
+    slug = model_id.replace("/", "--")
+    return os.path.join(CACHE_DIR, f"{slug}-int8.pt" if backend == "int8" else f"{slug}-onnx")
+
+
+def export_model(model_id: str, backend: str) -> str:
+    """Convert ``model_id`` for ``backend`` once and return the cached path."""
+    if backend not in ("int8", "onnx"):
+        raise ValueError(f"nothing to export for backend {backend!r}")
+    path = _cache_path(model_id, backend)
+    if os.path.exists(path):
+        return path
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    if backend == "int8":
+        import torch
+        from transformers import AutoModelForSeq2SeqLM
+
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_id).eval()
+        quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        # write then rename so an interrupted export never leaves a half-written cache
+        torch.save(quantized, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        return path
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as exc:
+        raise RuntimeError("the onnx backend needs `pip install optimum[onnxruntime]`") from exc
+    ORTModelForSeq2SeqLM.from_pretrained(model_id, export=True).save_pretrained(f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+    return path
 
 
 class LocalSummarizer:
     """
     Thin wrapper over a seq2seq model (default: DistilBART CNN) for fast local summaries.
+
+    ``backend`` picks the inference path (see module docstring); the ``int8`` and
+    ``onnx`` backends always run on CPU.
+
+    ``summarize(..., budget=seconds)`` plans beams and ``max_new_tokens`` from the
+    recently measured cost of a decoding step so the call fits the budget, stops
+    generation at the deadline, and raises ``DeadlineExceeded`` if it got there.
     """
 
+    BEAM_CHOICES = (4, 2, 1)
+    MIN_NEW_TOKENS = 12
+
     def __init__(
         self,
         model_id: Optional[str] = None,
         max_input_tokens: int = 768,
         max_new_tokens: int = 80,
         device: Optional[str] = None,
+        backend: Optional[str] = None,
     ):
         self.model_id = model_id or os.getenv("SLM_MODEL_ID", "sshleifer/distilbart-cnn-12-6")
+        self.backend = backend or os.getenv("SLM_BACKEND", "torch")
+        if self.backend not in BACKENDS:
+            raise ValueError(f"unknown SLM backend {self.backend!r}; expected one of {BACKENDS}")
         self.max_input_tokens = max_input_tokens
         self.max_new_tokens = max_new_tokens
+        # moving average of seconds per decoding step per sequence (batch x beams)
+        self.step_seconds: Optional[float] = None
 
         self.tokenizer = _load_tokenizer(self.model_id)
-        self.model = _load_model(self.model_id)
+        self.model = _load_model(self.model_id, self.backend)
 
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
-        self.model.to(self.device)
-        self.model.eval()
+        if self.backend == "torch":
+            import torch
 
-    def summarize(self, text: str, prefix: str = "Summarize in 2 short phrases: ") -> str:
-        if not text.strip():
-            return ""
+            self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+            self.model.to(self.device)
+            self.model.eval()
+        else:
+            self.device = "cpu"
+
+    def summarize(self, text: str, prefix: str = DEFAULT_PREFIX, budget: Optional[float] = None) -> str:
+        return self.summarize_batch([text], prefix, budget)[0]
+
+    def summarize_batch(self, texts: List[str], prefix: str = DEFAULT_PREFIX, budget: Optional[float] = None) -> List[str]:
+        """Summarize several texts with one padded ``generate`` call; blank texts map to ""."""
+        started = time.perf_counter()
+        summaries = [""] * len(texts)
+        positions = [index for index, text in enumerate(texts) if text.strip()]
+        if not positions:
+            return summaries
+
+        import torch
+        from transformers import StoppingCriteriaList
 
-        prompt = f"{prefix}{text.strip()}"
+        prompts = [f"{prefix}{texts[index].strip()}" for index in positions]
         encoded = self.tokenizer(
-            prompt,
+            prompts,
+            padding=True,
             truncation=True,
             max_length=self.max_input_tokens,
             return_tensors="pt",
         )
         encoded = {k: v.to(self.device) for k, v in encoded.items()}
 
+        beams, max_new_tokens = self._plan(budget, len(prompts))
+        deadline = _deadline_criteria()(started + budget) if budget is not None else None
         with torch.no_grad():
             output_ids = self.model.generate(
                 **encoded,
                 do_sample=False,
-                num_beams=4,
-                max_new_tokens=self.max_new_tokens,
+                num_beams=beams,
+                max_new_tokens=max_new_tokens,
                 length_penalty=1.0,
+                stopping_criteria=StoppingCriteriaList([deadline] if deadline else []),
             )
+        self._observe(time.perf_counter() - started, output_ids.shape[-1], beams * len(prompts))
+        if deadline is not None and deadline.hit:
+            raise DeadlineExceeded(f"summary exceeded its {budget:.2f}s budget")
 
-        summary = self.tokenizer.decode(output_ids[0], skip_special_tokens=True)
-        return self._condense(summary)
+        decoded = self.tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+        for index, summary in zip(positions, decoded):
+            summaries[index] = self._condense(summary)
+        return summaries
+
+    def warm_up(self) -> None:
+        """Run one short generate so the first real summary does not pay for lazy initialization."""
+        self.summarize(WARMUP_TEXT)
+
+    def _plan(self, budget: Optional[float], batch: int) -> Tuple[int, int]:
+        """Most beams (then most tokens) that fit ``budget`` at the measured step cost."""
+        if budget is None or self.step_seconds is None:
+            return self.BEAM_CHOICES[0], self.max_new_tokens
+        for beams in self.BEAM_CHOICES:
+            if self.step_seconds * beams * batch * self.max_new_tokens <= budget:
+                return beams, self.max_new_tokens
+        tokens = int(budget / (self.step_seconds * batch))
+        return 1, max(self.MIN_NEW_TOKENS, min(self.max_new_tokens, tokens))
+
+    def _observe(self, seconds: float, steps: int, sequences: int) -> None:
+        # encoder time is folded into the per-step cost, which keeps the plan conservative
+        sample = seconds / max(1, steps * sequences)
+        self.step_seconds = sample if self.step_seconds is None else 0.7 * self.step_seconds + 0.3 * sample
 
     @staticmethod
     def _condense(summary: str) -> str:
@@ -96,9 +241,174 @@ class LocalSummarizer:
         return ". ".join(trimmed).strip() + "."
 
 
+class BatchingSummarizer:
+    """
+    Shares one ``LocalSummarizer`` between many callers by micro-batching requests.
+
+    Requests wait until ``max_batch_size`` of them are queued or the oldest has
+    waited ``max_wait_ms``; then one ``summarize_batch`` call (one ``generate``)
+    serves the whole batch. ``workers`` threads each run one batch at a time (use
+    one per process of a ``ProcessSummarizer``). Only requests with the same
+    prefix share a batch. ``submit`` returns a ``Future``; ``summarize`` blocks on
+    it, so the service can stand in for a ``LocalSummarizer``. A request's
+    ``budget`` counts from submission: queueing eats into it, a batch runs with the
+    tightest remaining budget of its members, and requests already past their
+    deadline fail with ``DeadlineExceeded`` without reaching the model.
+    """
+
+    def __init__(
+        self,
+        summarizer: Optional[LocalSummarizer] = None,
+        *,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+        workers: int = 1,
+        latency_window: int = 1024,
+    ):
+        self.summarizer = summarizer or LocalSummarizer()
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        # (text, prefix, future, queued_at, deadline or None)
+        self._pending: Deque[Tuple[str, str, Future, float, Optional[float]]] = deque()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._batch_sizes: Deque[int] = deque(maxlen=latency_window)
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, text: str, prefix: str = DEFAULT_PREFIX, budget: Optional[float] = None) -> Future:
+        future: Future = Future()
+        queued_at = time.perf_counter()
+        deadline = queued_at + budget if budget is not None else None
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("summarizer service is closed")
+            self._pending.append((text, prefix, future, queued_at, deadline))
+            self._ensure_worker()
+            self._cond.notify()
+        return future
+
+    def summarize(
+        self,
+        text: str,
+        prefix: str = DEFAULT_PREFIX,
+        budget: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        return self.submit(text, prefix, budget).result(timeout)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            latencies = sorted(self._latencies)
+            sizes = list(self._batch_sizes)
+            return {
+                "completed": self.completed,
+                "failed": self.failed,
+                "pending": len(self._pending),
+                "mean_batch_size": sum(sizes) / len(sizes) if sizes else 0.0,
+                "latency_p50_ms": _percentile(latencies, 0.50) * 1000.0,
+                "latency_p95_ms": _percentile(latencies, 0.95) * 1000.0,
+            }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the worker after it drains the queued requests."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def _ensure_worker(self) -> None:
+        if len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f"slm-batch-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_batch(self) -> Optional[List[Tuple[str, str, Future, float, Optional[float]]]]:
+        with self._cond:
+            while not self._pending:
+                if self._closed:
+                    return None
+                self._cond.wait()
+            prefix, queued_at = self._pending[0][1], self._pending[0][3]
+            while not self._closed:
+                matching = sum(1 for request in self._pending if request[1] == prefix)
+                remaining = queued_at + self.max_wait - time.perf_counter()
+                if matching >= self.max_batch_size or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, rest = [], deque()
+            for request in self._pending:
+                if request[1] == prefix and len(batch) < self.max_batch_size:
+                    batch.append(request)
+                else:
+                    rest.append(request)
+            self._pending = rest
+            return batch
+
+    def _worker(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            now = time.perf_counter()
+            live = []
+            for request in batch:
+                if not request[2].set_running_or_notify_cancel():
+                    continue
+                if request[4] is not None and request[4] <= now:
+                    request[2].set_exception(DeadlineExceeded("summary budget spent while queued"))
+                    with self._cond:
+                        self.failed += 1
+                    continue
+                live.append(request)
+            if not live:
+                continue
+            deadlines = [request[4] for request in live if request[4] is not None]
+            budget = min(deadlines) - now if deadlines else None
+            try:
+                summaries = self.summarizer.summarize_batch([request[0] for request in live], live[0][1], budget)
+            except Exception as exc:  # noqa: BLE001
+                for request in live:
+                    request[2].set_exception(exc)
+                self._record(live, ok=False)
+                continue
+            for request, summary in zip(live, summaries):
+                request[2].set_result(summary)
+            self._record(live, ok=True)
+
+    def _record(self, batch: List[Tuple[str, str, Future, float, Optional[float]]], *, ok: bool) -> None:
+        finished = time.perf_counter()
+        with self._cond:
+            self._batch_sizes.append(len(batch))
+            for request in batch:
+                self._latencies.append(finished - request[3])
+            if ok:
+                self.completed += len(batch)
+            else:
+                self.failed += len(batch)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
 if __name__ == "__main__":
     import sys
 
+    if sys.argv[1:2] == ["--export"]:
+        model_id = os.getenv("SLM_MODEL_ID", "sshleifer/distilbart-cnn-12-6")
+        for name in sys.argv[2:] or ["int8", "onnx"]:
+            print(f"{name}: {export_model(model_id, name)}")
+        sys.exit(0)
+
     sample_text = (
         " ".join(sys.argv[1:]) or "Mindstream listens to speech, finds the dominant theme, and steers Livepeer Daydream visuals accordingly."
     )
@@ -0,0 +1,327 @@
+"""
+Local stand-in for the AssemblyAI v3 realtime websocket (``/v3/ws``).
+
+Speaks the ``Begin`` / ``Turn`` / ``Termination`` protocol and replays a script
+of transcripts against the audio it receives: each scripted turn ends once the
+connection has streamed ``at`` seconds of audio (PCM16, or μ-law when the
+client asks for ``encoding=pcm_mulaw``), its words are revealed
+as partial ``Turn`` messages in between, and the final is sent unformatted and
+then formatted, as with ``format_turns=true``. Timing follows received audio, so
+a file replayed at any speed yields the same messages in the same order.
+``delay`` adds processing latency to every message, and ``repeat`` restarts
+the script when it runs out (for long load runs on a looping WAV). Every
+connection plays the script from its own start.
+
+For reconnect testing, sessions close with code 3008 at the ``expires_at``
+announced in ``Begin`` (``expires_in`` seconds after connecting), as the real
+service does; ``drop_after`` aborts every connection's TCP stream once it has
+received that many seconds of audio, and ``drop_connections()`` aborts all live
+connections at once.
+
+Script files hold one turn per line, ``<seconds> <transcript>``; blank lines
+and ``#`` comments are ignored.
+
+Usage:
+    python mock_assemblyai.py --port 8091 --script turns.txt --delay 0.3
+    ASSEMBLYAI_ENDPOINT=ws://127.0.0.1:8091/v3/ws ASSEMBLYAI_API_KEY=local \\
+        python weighted_audio_stream.py --wav recorded_audio.wav
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+Script = Sequence[Tuple[float, str]]  # (audio seconds at which the turn ends, transcript)
+
+
+def load_script(path: str) -> List[Tuple[float, str]]:
+    turns = []
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            at, _, text = line.partition(" ")
+            try:
+                turns.append((float(at), text.strip()))
+            except ValueError as exc:
+                raise ValueError(f"{path}:{number}: expected '<seconds> <transcript>'") from exc
+    return sorted(turns)
+
+
+def _unformatted(text: str) -> str:
+    return " ".join(word.strip(".,!?;:").lower() for word in text.split())
+
+
+class _Connection:
+    """Script playback for one websocket; messages go out in order through one sender task."""
+
+    def __init__(self, server: "MockAssemblyAIServer", ws: ServerConnection, number: int):
+        self.server = server
+        self.ws = ws
+        self.number = number
+        # the client picks sample_rate/encoding in the query string, as with the real service
+        query = dict(parse_qsl(urlsplit(ws.request.path).query))
+        self.encoding = query.get("encoding", "pcm_s16le")
+        bytes_per_sample = 1 if self.encoding == "pcm_mulaw" else 2
+        self.bytes_per_second = int(query.get("sample_rate", 16000)) * bytes_per_sample
+        self.received = 0  # audio bytes
+        self.turn = 0
+        self.revealed = 0  # words of the current turn already sent as partials
+        self.outbox: "asyncio.Queue[Optional[Tuple[float, dict]]]" = asyncio.Queue()
+        self.started = time.monotonic()
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.received / self.bytes_per_second
+
+    def queue(self, message: dict) -> None:
+        self.outbox.put_nowait((time.monotonic() + self.server.delay, message))
+
+    def scripted(self, turn: int) -> Optional[Tuple[float, float, str]]:
+        """``(begin, end, text)`` of ``turn`` in audio seconds, or None past the end of the script."""
+        script = self.server.script
+        if not script or (turn >= len(script) and not self.server.repeat):
+            return None
+        cycle, index = divmod(turn, len(script))
+        offset = cycle * script[-1][0]
+        begin = offset + (script[index - 1][0] if index else 0.0)
+        end, text = script[index]
+        return begin, offset + end, text
+
+    def advance(self) -> None:
+        while True:
+            current = self.scripted(self.turn)
+            if current is None:
+                return
+            begin, end, text = current
+            words = _unformatted(text).split()
+            if self.audio_seconds >= end:
+                self.finish(text)
+                continue
+            span = max(end - begin, 1e-9)
+            due = int(len(words) * max(0.0, self.audio_seconds - begin) / span)
+            if due > self.revealed:
+                self.revealed = due
+                self.queue(self._turn(" ".join(words[:due]), end_of_turn=False))
+            return
+
+    def finish(self, text: str) -> None:
+        """Final messages for the current turn; moves on to the next one."""
+        self.queue(self._turn(_unformatted(text), end_of_turn=True))
+        if self.server.format_turns:
+            self.queue(self._turn(text, end_of_turn=True, formatted=True))
+        self.turn += 1
+        self.revealed = 0
+
+    def _turn(self, transcript: str, *, end_of_turn: bool, formatted: bool = False) -> dict:
+        words = transcript.split()
+        return {
+            "type": "Turn",
+            "turn_order": self.turn,
+            "turn_is_formatted": formatted,
+            "end_of_turn": end_of_turn,
+            "transcript": transcript,
+            "end_of_turn_confidence": 1.0 if end_of_turn else 0.0,
+            "words": [{"text": word, "word_is_final": end_of_turn} for word in words],
+        }
+
+    async def send_loop(self) -> None:
+        while True:
+            item = await self.outbox.get()
+            if item is None:
+                return
+            due, message = item
+            wait = due - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.server._record(self.number, message)
+            await self.ws.send(json.dumps(message))
+
+
+class MockAssemblyAIServer:
+    """Websocket server on a local port, run on its own event loop thread."""
+
+    def __init__(
+        self,
+        script: Script = (),
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        delay: float = 0.0,
+        format_turns: bool = True,
+        expires_in: float = 3600.0,
+        repeat: bool = False,
+        drop_after: Optional[float] = None,
+    ):
+        self.script = list(script)
+        self.repeat = repeat
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.format_turns = format_turns
+        self.expires_in = expires_in
+        self.drop_after = drop_after
+        self.connections = 0
+        self.dropped = 0
+        self.audio_bytes = 0
+        self.sent: List[Tuple[float, int, dict]] = []  # (wall time sent, connection number, message)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._live: Dict[int, ServerConnection] = {}
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v3/ws"
+
+    def start(self) -> "MockAssemblyAIServer":
+        self._loop = asyncio.new_event_loop()
+
+        async def listen() -> None:
+            self._server = await serve(self._handle, self.host, self.port, close_timeout=1.0)
+            self.port = self._server.sockets[0].getsockname()[1]
+
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mock-assemblyai", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(listen(), self._loop).result(timeout=5.0)
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+
+        async def shutdown() -> None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5.0)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2.0)
+        self._loop.close()
+        self._loop = None
+
+    def drop_connections(self) -> int:
+        """Abort every open connection without a close frame; returns how many."""
+
+        async def drop() -> int:
+            live = list(self._live.values())
+            for ws in live:
+                self._abort(ws)
+            return len(live)
+
+        return asyncio.run_coroutine_threadsafe(drop(), self._loop).result(timeout=5.0)
+
+    def _abort(self, ws: ServerConnection) -> None:
+        with self._lock:
+            self.dropped += 1
+        ws.transport.abort()
+
+    def turns_sent(self) -> List[Tuple[float, int, dict]]:
+        """
+        Final (formatted, when enabled) ``Turn`` messages as ``(wall time sent,
+        connection number, message)``; connections are numbered from 0 in accept order.
+        """
+        with self._lock:
+            return [
+                (sent_at, number, message)
+                for sent_at, number, message in self.sent
+                if message.get("type") == "Turn"
+                and message["end_of_turn"]
+                and (message["turn_is_formatted"] or not self.format_turns)
+            ]
+
+    def _record(self, number: int, message: dict) -> None:
+        with self._lock:
+            self.sent.append((time.time(), number, message))
+
+    async def _handle(self, ws: ServerConnection) -> None:
+        with self._lock:
+            number = self.connections
+            self.connections += 1
+        connection = _Connection(self, ws, number)
+        sender = asyncio.create_task(connection.send_loop())
+        connection.queue({"type": "Begin", "id": uuid.uuid4().hex, "expires_at": time.time() + self.expires_in})
+        expiry = asyncio.get_running_loop().call_later(
+            self.expires_in, lambda: asyncio.ensure_future(ws.close(3008, "Session expired"))
+        )
+        self._live[number] = ws
+        try:
+            async for message in ws:
+                if isinstance(message, bytes):
+                    connection.received += len(message)
+                    with self._lock:
+                        self.audio_bytes += len(message)
+                    if self.drop_after is not None and connection.audio_seconds >= self.drop_after:
+                        self._abort(ws)
+                        break
+                    connection.advance()
+                    continue
+                if json.loads(message).get("type") == "Terminate":
+                    # the real service finalizes the turn in progress before terminating
+                    current = connection.scripted(connection.turn)
+                    if connection.revealed and current is not None:
+                        connection.finish(current[2])
+                    connection.queue(
+                        {
+                            "type": "Termination",
+                            "audio_duration_seconds": round(connection.audio_seconds, 3),
+                            "session_duration_seconds": round(time.monotonic() - connection.started, 3),
+                        }
+                    )
+                    break
+        except ConnectionClosed:
+            pass
+        finally:
+            expiry.cancel()
+            self._live.pop(number, None)
+        connection.outbox.put_nowait(None)
+        try:
+            await sender
+            await ws.close()
+        except ConnectionClosed:
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local AssemblyAI v3 realtime stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--script", help="turn script: one '<seconds> <transcript>' per line")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds added before every message")
+    parser.add_argument("--repeat", action="store_true", help="restart the script when it runs out")
+    parser.add_argument("--expires-in", type=float, default=3600.0, help="session lifetime in seconds")
+    parser.add_argument("--drop-after", type=float, help="abort each connection after this many seconds of audio")
+    args = parser.parse_args()
+
+    script = load_script(args.script) if args.script else []
+    server = MockAssemblyAIServer(
+        script,
+        host=args.host,
+        port=args.port,
+        delay=args.delay,
+        repeat=args.repeat,
+        expires_in=args.expires_in,
+        drop_after=args.drop_after,
+    ).start()
+    print(f"Mock AssemblyAI listening on {server.url} ({len(script)} scripted turns)")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
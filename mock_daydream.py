@@ -0,0 +1,103 @@
+"""
+Local stand-in for the Daydream streams API (``PATCH /v1/streams/<id>``).
+
+Records every prompt it receives and can add an artificial delay, so the prompt
+dispatcher and load tools can run without api.daydream.live.
+
+Usage:
+    python mock_daydream.py --port 8090 --delay 0.2
+    DAYDREAM_API_BASE=http://127.0.0.1:8090/v1/streams python weighted_audio_stream.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+
+class MockDaydreamServer:
+    """Threaded HTTP server that accepts Daydream prompt PATCHes on a local port."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0, status: int = 200):
+        self.delay = delay
+        self.status = status
+        self.received: List[Tuple[float, str, str]] = []  # (arrival time, stream id, prompt)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_base(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/streams"
+
+    def start(self) -> "MockDaydreamServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-daydream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def prompts(self) -> Dict[str, List[str]]:
+        with self._lock:
+            grouped: Dict[str, List[str]] = {}
+            for _, stream_id, prompt in self.received:
+                grouped.setdefault(stream_id, []).append(prompt)
+            return grouped
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def do_PATCH(self):  # noqa: N802
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if server.delay:
+                    time.sleep(server.delay)
+                stream_id = self.path.rstrip("/").rsplit("/", 1)[-1]
+                try:
+                    prompt = json.loads(body or b"{}").get("params", {}).get("prompt", "")
+                except json.JSONDecodeError:
+                    prompt = ""
+                with server._lock:
+                    server.received.append((time.time(), stream_id, prompt))
+                payload = json.dumps({"id": stream_id, "params": {"prompt": prompt}}).encode()
+                self.send_response(server.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *_args):
+                return
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Daydream API stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to stall each PATCH")
+    args = parser.parse_args()
+
+    server = MockDaydreamServer(args.host, args.port, delay=args.delay).start()
+    print(f"Mock Daydream listening on {server.api_base}")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Building blocks for keeping a realtime ASR session alive across reconnects.
+
+``Backoff`` spaces reconnect attempts with capped exponential backoff and full
+jitter, so many clients cut off together do not reconnect in lockstep.
+``ReplayBuffer`` keeps the most recent uplink audio, already VAD-gated and
+encoded, in one preallocated byte ring; audio the recognizer may not have
+transcribed yet (everything since the last final turn, up to its capacity) is
+replayed into the next session.
+
+Usage:
+    backoff = Backoff()
+    replay = ReplayBuffer(seconds=5.0, bytes_per_second=32000)
+    replay.append(payload)      # every payload sent
+    replay.commit()             # a final turn arrived
+    for payload in replay.payloads():
+        new_ws.send(payload)
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+from typing import List, Optional
+
+
+class Backoff:
+    """Delay before reconnect attempt ``n``: uniform in ``[0, min(cap, base * 2**n)]``, at least ``floor``."""
+
+    def __init__(self, base: float = 0.5, cap: float = 30.0, floor: float = 0.1, rng: Optional[random.Random] = None):
+        self.base = base
+        self.cap = cap
+        self.floor = floor
+        self.attempts = 0
+        self._rng = rng or random.Random()
+
+    def next(self) -> float:
+        ceiling = min(self.cap, self.base * 2 ** min(self.attempts, 30))
+        self.attempts += 1
+        return max(self.floor, self._rng.uniform(0.0, ceiling))
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+
+class ReplayBuffer:
+    """
+    The last ``seconds`` of sent audio. ``commit`` forgets what a final turn
+    already covered, keeping ``keep_seconds`` in case the turn ended inside the
+    newest audio. ``payloads`` splits the rest into ``chunk_seconds`` pieces.
+    Safe to use from the sending and the receiving thread.
+    """
+
+    def __init__(
+        self,
+        seconds: float = 5.0,
+        *,
+        bytes_per_second: int = 32000,
+        keep_seconds: float = 0.5,
+        chunk_seconds: float = 0.05,
+    ):
+        self.bytes_per_second = bytes_per_second
+        self.capacity = max(1, int(seconds * bytes_per_second))
+        self.keep_bytes = int(keep_seconds * bytes_per_second)
+        self.chunk_bytes = max(1, int(chunk_seconds * bytes_per_second))
+        self.overwritten_bytes = 0
+        self._buffer = bytearray(self.capacity)
+        self._end = 0  # bytes ever appended
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def seconds(self) -> float:
+        return self._size / self.bytes_per_second
+
+    def append(self, payload) -> None:
+        data = memoryview(payload).cast("B")
+        if len(data) > self.capacity:
+            data = data[-self.capacity :]
+        with self._lock:
+            self._write(data)
+
+    def _write(self, data: memoryview) -> None:
+        start = self._end % self.capacity
+        first = min(len(data), self.capacity - start)
+        self._buffer[start : start + first] = data[:first]
+        self._buffer[: len(data) - first] = data[first:]
+        self._end += len(data)
+        overflow = self._size + len(data) - self.capacity
+        if overflow > 0:
+            self.overwritten_bytes += overflow
+        self._size = min(self.capacity, self._size + len(data))
+
+    def commit(self) -> None:
+        with self._lock:
+            self._size = min(self._size, self.keep_bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._size = 0
+
+    def payloads(self) -> List[bytes]:
+        with self._lock:
+            start = (self._end - self._size) % self.capacity
+            if start + self._size <= self.capacity:
+                data = bytes(self._buffer[start : start + self._size])
+            else:
+                data = bytes(self._buffer[start:]) + bytes(self._buffer[: self._size - (self.capacity - start)])
+        return [data[offset : offset + self.chunk_bytes] for offset in range(0, len(data), self.chunk_bytes)]
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import argparse
 import logging
 from threading import Lock, Thread
-from typing import Optional
+from typing import Callable, Dict, Optional
 
 from flask import Flask, jsonify, request, send_from_directory
 
+from session_manager import SessionLimitError, SessionManager
 from weighted_audio_stream import WeightedStreamClient
 
 
@@ -25,7 +27,17 @@ class StreamRegistry:
             return self._stream_id
 
 
-def create_app(registry: StreamRegistry) -> Flask:
+def create_app(
+    registry: StreamRegistry,
+    sessions: Optional[SessionManager] = None,
+    readiness: Optional[Callable[[], Dict[str, str]]] = None,
+) -> Flask:
+    """
+    ``/api/health`` is liveness (the process answers); ``/api/ready`` reports the
+    ``readiness()`` components and returns 503 until every one of them is "ready".
+    Components whose state starts with "failed" are also listed under ``failed``:
+    they will not become ready without a restart.
+    """
     app = Flask(__name__, static_folder="frontend", static_url_path="")
 
     @app.route("/")
@@ -40,6 +52,16 @@ def create_app(registry: StreamRegistry) -> Flask:
     def health():
         return jsonify({"status": "ok"})
 
+    @app.route("/api/ready")
+    def ready():
+        components = readiness() if readiness else {}
+        is_ready = all(state == "ready" for state in components.values())
+        body = {"ready": is_ready, "components": components}
+        failed = {name: state for name, state in components.items() if state.startswith("failed")}
+        if failed:
+            body["failed"] = failed
+        return jsonify(body), 200 if is_ready else 503
+
     @app.route("/api/stream-id", methods=["GET", "POST"])
     def stream_id():
         if request.method == "GET":
@@ -69,23 +91,143 @@ def create_app(registry: StreamRegistry) -> Flask:
         registry.set(stream_id_value)
         return jsonify({"stream_id": stream_id_value})
 
+    if sessions is not None:
+        _add_session_routes(app, sessions)
+
     return app
 
 
-def run_server(app: Flask) -> None:
-    app.run(host="0.0.0.0", port=8000, debug=False, use_reloader=False)
+def _add_session_routes(app: Flask, sessions: SessionManager) -> None:
+    @app.route("/api/sessions", methods=["GET", "POST"])
+    def session_collection():
+        if request.method == "GET":
+            return jsonify({"sessions": [session.describe() for session in sessions.list()]})
+
+        payload = request.get_json(silent=True) or {}
+        try:
+            session = sessions.create(
+                stream_id=payload.get("stream_id"),
+                source=payload.get("source"),
+                summarize=bool(payload.get("summarize")),
+                max_keywords=payload.get("max_keywords"),
+            )
+        except SessionLimitError as exc:
+            return jsonify({"error": str(exc)}), 429
+        except (ValueError, RuntimeError) as exc:
+            return jsonify({"error": str(exc)}), 400
+        return jsonify(session.describe()), 201
+
+    @app.route("/api/sessions/<session_id>", methods=["GET", "DELETE"])
+    def session_item(session_id: str):
+        try:
+            session = sessions.delete(session_id) if request.method == "DELETE" else sessions.get(session_id)
+        except KeyError:
+            return jsonify({"error": "unknown session"}), 404
+        return jsonify(session.describe())
+
+    @app.route("/api/sessions/<session_id>/stream-id", methods=["POST"])
+    def session_stream_id(session_id: str):
+        payload = request.get_json(silent=True) or {}
+        stream_id_value = payload.get("stream_id")
+        if not stream_id_value:
+            return jsonify({"error": "stream_id is required"}), 400
+        try:
+            session = sessions.set_stream_id(session_id, stream_id_value)
+        except KeyError:
+            return jsonify({"error": "unknown session"}), 404
+        return jsonify(session.describe())
+
+    @app.route("/api/sessions/<session_id>/keywords")
+    def session_keywords(session_id: str):
+        try:
+            session = sessions.get(session_id)
+        except KeyError:
+            return jsonify({"error": "unknown session"}), 404
+        return jsonify({"id": session.id, **session.keywords()})
+
+
+def run_server(app: Flask, port: int = 8000) -> None:
+    app.run(host="0.0.0.0", port=port, debug=False, use_reloader=False)
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Mindstream control server.")
+    parser.add_argument(
+        "--multi-session",
+        action="store_true",
+        help="serve /api/sessions only, without the default local-microphone session",
+    )
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-sessions", type=int, default=256)
+    parser.add_argument(
+        "--keyword-engine",
+        action="store_true",
+        help="keep every session's keyword weights in one shared NumPy matrix",
+    )
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="gate silence out of every session's audio uplink",
+    )
+    parser.add_argument(
+        "--encoding",
+        choices=("pcm_s16le", "pcm_mulaw"),
+        default="pcm_s16le",
+        help="uplink audio encoding; pcm_mulaw halves the bytes per session",
+    )
+    parser.add_argument(
+        "--no-summaries",
+        action="store_true",
+        help="disable session summaries (and the summarizer warm-up) under --multi-session",
+    )
+    args = parser.parse_args()
+
     logging.basicConfig(level=logging.INFO)
     registry = StreamRegistry()
-    app = create_app(registry)
-
-    flask_thread = Thread(target=run_server, args=(app,), daemon=True)
+    keyword_engine = None
+    if args.keyword_engine:
+        from keyword_engine import KeywordEngine  # numpy is only needed with this flag
+
+        keyword_engine = KeywordEngine()
+    # summaries (and their model) are a multi-session feature; the default
+    # microphone mode stays as light as before
+    summaries = args.multi_session and not args.no_summaries
+    sessions = SessionManager(
+        max_sessions=args.max_sessions,
+        allow_summaries=summaries,
+        keyword_engine=keyword_engine,
+        vad=args.vad,
+        encoding=args.encoding,
+    )
+    sessions.start()
+    if summaries:
+        # the model loads in the background; /api/ready turns 200 once it has generated
+        # once, or lists the load error under "failed"
+        sessions.warm_up()
+
+    if args.multi_session:
+        app = create_app(registry, sessions, readiness=sessions.readiness)
+        try:
+            run_server(app, args.port)
+        finally:
+            sessions.shutdown()
+        return
+
+    vad = None
+    if args.vad:
+        from audio_dsp import EnergyVAD
+
+        vad = EnergyVAD()
+    client = WeightedStreamClient(stream_id_provider=registry.get, vad=vad, encoding=args.encoding)
+    # in microphone mode "ready" also means the uplink has a live AssemblyAI session
+    app = create_app(registry, sessions, readiness=lambda: dict(sessions.readiness(), microphone=client.uplink_state()))
+    flask_thread = Thread(target=run_server, args=(app, args.port), daemon=True)
     flask_thread.start()
 
-    client = WeightedStreamClient(stream_id_provider=registry.get)
-    client.start()
+    try:
+        client.start()
+    finally:
+        sessions.shutdown()
 
 
 if __name__ == "__main__":
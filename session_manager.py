@@ -0,0 +1,379 @@
+"""
+Run many streaming sessions in one process.
+
+Every session owns its audio source, keyword tracker and Daydream stream id and
+runs as coroutines on a single shared event-loop thread, so hundreds of
+sessions do not need a thread trio each. Sessions share one Daydream prompt
+dispatcher (keep-alive pool) and, when summaries are enabled, one
+``BatchingSummarizer`` that batches concurrent sessions' summaries into one
+``generate`` call, run in ``summary_processes`` worker processes (or in-process
+when 0) so inference does not compete with the audio path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from async_stream_client import AsyncWeightedStreamClient, MicrophoneSource
+from daydream_api import PromptDispatcher, get_dispatcher
+from weighted_audio_stream import LazyKeywordMomentumTracker, TranscriptBuffer
+
+if TYPE_CHECKING:
+    from keyword_engine import KeywordEngine
+
+SourceFactory = Callable[[Dict, "SessionManager"], object]
+
+
+class SessionLimitError(RuntimeError):
+    """Raised when a session request exceeds the manager's resource limits."""
+
+
+class Session:
+    """One performer: an audio source, its keyword tracker and a Daydream stream id."""
+
+    def __init__(self, session_id: str, *, stream_id: Optional[str], source: Dict, summarize: bool):
+        self.id = session_id
+        self.stream_id = stream_id
+        self.source = source
+        self.summarize = summarize
+        self.created_at = time.time()
+        self.client: Optional[AsyncWeightedStreamClient] = None
+        self.task: Optional[asyncio.Task] = None
+        self.summary_task: Optional[asyncio.Task] = None
+        self.bridge = None
+        self.error: Optional[str] = None
+        self.transcripts = TranscriptBuffer(maxlen=64)
+
+    @property
+    def status(self) -> str:
+        if self.task is None:
+            return "starting"
+        if not self.task.done():
+            return "running"
+        return "failed" if self.error else "stopped"
+
+    def keywords(self) -> Dict:
+        tracker = self.client.tracker
+        return {
+            "keywords": [[word, round(weight, 4)] for word, weight in tracker.current_keywords()],
+            "version": tracker.snapshot_version,
+        }
+
+    def describe(self) -> Dict:
+        description = {
+            "id": self.id,
+            "status": self.status,
+            "stream_id": self.stream_id,
+            "source": self.source,
+            "summarize": self.summarize,
+            "created_at": self.created_at,
+            "error": self.error,
+        }
+        if self.client is not None and self.client.vad is not None:
+            description["vad"] = self.client.vad.stats()
+        if self.client is not None:
+            description["asr"] = {"reconnects": self.client.reconnects, "rotations": self.client.rotations}
+            capture = self.client.capture_stats()
+            if capture:
+                description["capture"] = capture
+        return description
+
+
+def _microphone_source(spec: Dict, manager: "SessionManager"):
+    return MicrophoneSource(max_frames=manager.max_audio_frames, input_device_index=spec.get("device_index"))
+
+
+def _wav_source(spec: Dict, manager: "SessionManager"):
+    from wav_source import WavFileSource
+
+    if not spec.get("path"):
+        raise ValueError("wav source needs a 'path'")
+    try:
+        return WavFileSource(spec["path"], speed=float(spec.get("speed", 1.0)), loop=bool(spec.get("loop", False)))
+    except (OSError, EOFError, wave.Error) as exc:
+        raise ValueError(f"cannot replay {spec['path']!r}: {exc}") from exc
+
+
+class SessionManager:
+    """
+    Creates, tracks and stops sessions on a shared asyncio loop.
+
+    Limits: ``max_sessions`` concurrently active sessions, ``max_session_seconds``
+    of streaming per session, ``max_audio_frames`` of queued audio per session,
+    at most ``max_keywords`` tracked keywords, and at least ``min_emit_interval``
+    seconds between a session's Daydream PATCHes. With a ``keyword_engine`` all
+    sessions keep their keyword weights in its shared matrix instead of a
+    tracker each. With ``vad`` every session gates silence out of its uplink
+    (``audio_dsp.EnergyVAD``), and ``encoding="pcm_mulaw"`` halves uplink bytes;
+    a source spec can override either with ``"vad"`` / ``"encoding"``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int = 256,
+        max_session_seconds: Optional[float] = None,
+        max_audio_frames: int = 40,
+        max_keywords: int = 8,
+        min_emit_interval: float = 1.0,
+        summary_interval: float = 8.0,
+        summary_batch_size: int = 8,
+        summary_processes: int = 1,
+        allow_summaries: bool = True,
+        dispatcher: Optional[PromptDispatcher] = None,
+        daydream_api_key: Optional[str] = None,
+        keyword_engine: Optional[KeywordEngine] = None,
+        vad: bool = False,
+        encoding: str = "pcm_s16le",
+    ):
+        self.max_sessions = max_sessions
+        self.max_session_seconds = max_session_seconds
+        self.max_audio_frames = max_audio_frames
+        self.max_keywords = max_keywords
+        self.min_emit_interval = min_emit_interval
+        self.summary_interval = summary_interval
+        self.summary_batch_size = summary_batch_size
+        self.summary_processes = summary_processes
+        self.allow_summaries = allow_summaries
+        self.dispatcher = dispatcher or get_dispatcher()
+        self.daydream_api_key = daydream_api_key
+        self.keyword_engine = keyword_engine
+        self.vad = vad
+        self.encoding = encoding
+        self.source_factories: Dict[str, SourceFactory] = {"microphone": _microphone_source, "wav": _wav_source}
+
+        self._sessions: Dict[str, Session] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # one caller thread per batch slot, so concurrent sessions can fill a batch
+        self._summary_pool = ThreadPoolExecutor(max_workers=summary_batch_size, thread_name_prefix="slm")
+        self._summarizer = None
+        self._summarizer_lock = threading.Lock()
+        # cold -> warming -> ready, or "failed: <reason>"
+        self.summarizer_state = "cold"
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "SessionManager":
+        with self._lock:
+            if self._loop is not None:
+                return self
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="session-loop", daemon=True)
+            self._thread.start()
+        if self.keyword_engine is not None:
+            self._loop.call_soon_threadsafe(self._tick_engine)
+        return self
+
+    def warm_up(self) -> None:
+        """Load the shared summarizer and run one dummy generate on a background thread."""
+        if not self.allow_summaries or self.summarizer_state != "cold":
+            return
+        self.summarizer_state = "warming"
+        threading.Thread(target=self._warm_up, name="slm-warmup", daemon=True).start()
+
+    def readiness(self) -> Dict[str, str]:
+        """Per-component state; the manager can take full load when every value is "ready"."""
+        components = {"sessions": "ready" if self._thread and self._thread.is_alive() else "stopped"}
+        if self.allow_summaries:
+            components["summarizer"] = self.summarizer_state
+        return components
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        for session in self.list():
+            self.delete(session.id, timeout=timeout)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=timeout)
+        self._summary_pool.shutdown(wait=False)
+        if self._summarizer is not None:
+            self._summarizer.close()
+            close = getattr(self._summarizer.summarizer, "close", None)
+            if close:
+                close()
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    def create(
+        self,
+        *,
+        stream_id: Optional[str] = None,
+        source: Optional[Dict] = None,
+        summarize: bool = False,
+        max_keywords: Optional[int] = None,
+    ) -> Session:
+        source = dict(source or {"type": "microphone"})
+        factory = self.source_factories.get(source.get("type", ""))
+        if factory is None:
+            raise ValueError(f"unknown source type {source.get('type')!r}; expected one of {sorted(self.source_factories)}")
+        if summarize and not self.allow_summaries:
+            raise SessionLimitError("summaries are disabled on this server")
+        keywords = min(max_keywords or self.max_keywords, self.max_keywords)
+
+        with self._lock:
+            active = sum(1 for session in self._sessions.values() if session.status in ("starting", "running"))
+            if active >= self.max_sessions:
+                raise SessionLimitError(f"session limit reached ({self.max_sessions})")
+            session = Session(uuid.uuid4().hex[:12], stream_id=stream_id, source=source, summarize=summarize)
+            self._sessions[session.id] = session
+
+        if self.keyword_engine is not None:
+            tracker = self.keyword_engine.session(keywords)
+        else:
+            tracker = LazyKeywordMomentumTracker(max_keywords=keywords)
+        try:
+            vad = None
+            if source.get("vad", self.vad):
+                from audio_dsp import EnergyVAD
+
+                vad = EnergyVAD()
+            session.client = AsyncWeightedStreamClient(
+                audio_source=factory(source, self),
+                vad=vad,
+                encoding=source.get("encoding", self.encoding),
+                tracker=tracker,
+                dispatcher=self.dispatcher,
+                stream_id_provider=lambda: session.stream_id,
+                on_final=session.transcripts.append,
+                daydream_api_key=self.daydream_api_key,
+                emit_mode="push",
+                min_emit_interval=self.min_emit_interval,
+            )
+            self.start()
+            asyncio.run_coroutine_threadsafe(self._launch(session), self._loop).result(timeout=5.0)
+        except Exception:
+            with self._lock:
+                self._sessions.pop(session.id, None)
+            self._release_tracker(tracker)
+            raise
+        return session
+
+    def get(self, session_id: str) -> Session:
+        with self._lock:
+            return self._sessions[session_id]
+
+    def list(self) -> List[Session]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def set_stream_id(self, session_id: str, stream_id: Optional[str]) -> Session:
+        session = self.get(session_id)
+        session.stream_id = stream_id
+        if session.bridge is not None:
+            session.bridge.stream_id = stream_id
+        return session
+
+    def delete(self, session_id: str, timeout: float = 5.0) -> Session:
+        session = self.get(session_id)
+        if self._loop is not None and session.task is not None:
+            future = asyncio.run_coroutine_threadsafe(self._stop(session, timeout), self._loop)
+            future.result(timeout=timeout + 1.0)
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        if session.client is not None:
+            self._release_tracker(session.client.tracker)
+        return session
+
+    def _release_tracker(self, tracker) -> None:
+        close = getattr(tracker, "close", None)
+        if close:
+            close()
+
+    # ------------------------------------------------------------------
+    # Loop-side coroutines
+    # ------------------------------------------------------------------
+
+    async def _launch(self, session: Session) -> None:
+        session.task = asyncio.create_task(self._run(session), name=f"session-{session.id}")
+        if self.max_session_seconds:
+            asyncio.get_running_loop().call_later(self.max_session_seconds, session.client.stop)
+        if session.summarize:
+            session.summary_task = asyncio.create_task(self._summaries(session), name=f"summary-{session.id}")
+
+    async def _run(self, session: Session) -> None:
+        try:
+            await session.client.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            session.error = str(exc)
+            print(f"[session {session.id}] failed: {exc}")
+        finally:
+            if session.summary_task:
+                session.summary_task.cancel()
+
+    async def _stop(self, session: Session, timeout: float) -> None:
+        session.client.stop()
+        try:
+            await asyncio.wait_for(asyncio.shield(session.task), timeout)
+        except asyncio.TimeoutError:
+            session.task.cancel()
+
+    async def _summaries(self, session: Session) -> None:
+        loop = asyncio.get_running_loop()
+        summarizer = await loop.run_in_executor(self._summary_pool, self._shared_summarizer)
+        from slm_daydream_bridge import SLMSummaryBridge
+
+        api_key = self.daydream_api_key or session.client.daydream_key
+        if not api_key:
+            print(f"[session {session.id}] summaries disabled: DAYDREAM_API_KEY missing.")
+            return
+        session.bridge = SLMSummaryBridge(
+            stream_id=session.stream_id,
+            api_key=api_key,
+            interval=self.summary_interval,
+            dispatcher=self.dispatcher,
+            summarizer=summarizer,
+            keywords_provider=session.client.tracker.current_keywords,
+        )
+        # share the transcript buffer the client has been filling since launch
+        session.bridge.buffer = session.transcripts
+        while True:
+            await asyncio.sleep(self.summary_interval)
+            await loop.run_in_executor(self._summary_pool, session.bridge.run_once)
+
+    def _tick_engine(self) -> None:
+        # decay idle sessions too, not only when some session ingests
+        self.keyword_engine.maybe_tick()
+        self._loop.call_later(self.keyword_engine.tick_interval, self._tick_engine)
+
+    def _warm_up(self) -> None:
+        try:
+            from local_summarizer import WARMUP_TEXT
+
+            self._shared_summarizer().summarize(WARMUP_TEXT)
+        except Exception as exc:  # noqa: BLE001
+            self.summarizer_state = f"failed: {exc}"
+            print(f"[slm] summarizer warm-up failed: {exc}")
+            return
+        self.summarizer_state = "ready"
+
+    def _shared_summarizer(self):
+        # runs on a summary worker, so the model loads off the loop (and only once)
+        with self._summarizer_lock:
+            if self._summarizer is None:
+                from local_summarizer import BatchingSummarizer, LocalSummarizer
+
+                if self.summary_processes:
+                    from summarizer_pool import ProcessSummarizer
+
+                    backend = ProcessSummarizer(workers=self.summary_processes).start()
+                else:
+                    backend = LocalSummarizer()
+                self._summarizer = BatchingSummarizer(
+                    backend,
+                    max_batch_size=self.summary_batch_size,
+                    workers=max(1, self.summary_processes),
+                )
+            return self._summarizer
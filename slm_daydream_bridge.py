@@ -2,28 +2,83 @@
 
 from __future__ import annotations
 
+import hashlib
 import os
 import threading
-from collections import deque
-from typing import Deque
+import time
+from collections import Counter, OrderedDict, deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional
 
 from dotenv import find_dotenv, load_dotenv
 
-from daydream_api import update_prompt_text
-from local_summarizer import LocalSummarizer
-from weighted_audio_stream import WeightedStreamClient
+from daydream_api import PromptDispatcher, get_dispatcher
+from summarizer_pool import ProcessSummarizer
+from weighted_audio_stream import KeywordMomentumTracker, Keywords, TranscriptBuffer, WeightedStreamClient
+
+if TYPE_CHECKING:
+    from local_summarizer import LocalSummarizer
 
 
 class SLMSummaryBridge:
-    def __init__(self, *, stream_id: str, api_key: str, interval: float = 8.0):
+    """
+    Periodically summarizes recent transcripts and pushes the summary to Daydream.
+
+    In ``incremental`` mode (the default) a run with no new transcripts is skipped,
+    every ``window_size`` transcripts are summarized once into a window summary, and
+    the prompt is folded from the last ``max_windows`` window summaries plus the
+    transcripts of the still-open window. A window whose summary misses the budget
+    keeps its raw text in the fold and is summarized again on the next run.
+    Summaries are cached by a fingerprint of their input. ``incremental=False`` re-summarizes the whole buffer every run.
+    Each run has a latency ``budget`` (default: 75% of ``interval``) that is passed
+    on to the summarizer; when a summary misses it, the bridge falls back to a
+    keyword phrase (from ``keywords_provider`` or the words of the text itself) so a
+    prompt still goes out on time. ``stats`` counts runs, skips, model calls,
+    fallbacks, cache hits and wall-clock seconds spent waiting on the summarizer
+    (a worker pool burns its CPU in other processes, so that is what this side sees).
+    """
+
+    def __init__(
+        self,
+        *,
+        stream_id: Optional[str],
+        api_key: str,
+        interval: float = 8.0,
+        dispatcher: Optional[PromptDispatcher] = None,
+        summarizer: Optional[LocalSummarizer] = None,
+        incremental: bool = True,
+        window_size: int = 8,
+        max_windows: int = 4,
+        cache_size: int = 128,
+        budget: Optional[float] = None,
+        keywords_provider: Optional[Callable[[], Keywords]] = None,
+    ):
         self.stream_id = stream_id
         self.api_key = api_key
         self.interval = interval
-        self.buffer: Deque[str] = deque(maxlen=64)
+        self.incremental = incremental
+        self.window_size = window_size
+        self.cache_size = cache_size
+        self.budget = budget if budget is not None else 0.75 * interval
+        self.keywords_provider = keywords_provider
+        self.buffer: Deque[str] = TranscriptBuffer(maxlen=64)
+        self.stats: Dict[str, float] = {"runs": 0, "skipped": 0, "summaries": 0, "fallbacks": 0, "cache_hits": 0, "summary_seconds": 0.0}
+        self._consumed = 0
+        self._fingerprint: Optional[int] = None
+        self._pending: List[str] = []
+        self._windows: Deque[List[Optional[str]]] = deque(maxlen=max_windows)  # [text, summary]
+        self._cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._deadline: Optional[float] = None
+        self._tokenizer = KeywordMomentumTracker()
         self.stop_event = threading.Event()
         self.thread: threading.Thread | None = None
-        self.summarizer = LocalSummarizer()
+        if summarizer is None:
+            # torch/transformers load only when the bridge owns its summarizer
+            from local_summarizer import LocalSummarizer
+
+            summarizer = LocalSummarizer()
+        self.summarizer = summarizer
         self.last_prompt: str | None = None
+        self.dispatcher = dispatcher or get_dispatcher()
 
     def start(self):
         self.thread = threading.Thread(target=self._loop, name="slm-summary", daemon=True)
@@ -40,18 +95,120 @@ class SLMSummaryBridge:
 
     def _loop(self):
         while not self.stop_event.wait(self.interval):
-            chunk = " ".join(self.buffer).strip()
-            if not chunk:
-                continue
-            summary = self.summarizer.summarize(chunk)
-            if not summary or summary == self.last_prompt:
-                continue
-            try:
-                update_prompt_text(summary, stream_id=self.stream_id, api_key=self.api_key)
-                self.last_prompt = summary
-                print(f"[slm] {summary}")
-            except Exception as exc:  # noqa: BLE001
-                print(f"[slm] failed to update Daydream: {exc}")
+            self.run_once()
+
+    def run_once(self) -> Optional[str]:
+        """Summarize the buffer and submit it if it changed; returns the submitted summary."""
+        if not self.stream_id:
+            return None
+        self.stats["runs"] += 1
+        self._deadline = time.monotonic() + self.budget
+        summary = self._incremental_summary() if self.incremental else self._full_summary()
+        if not summary or summary == self.last_prompt:
+            return None
+        self.last_prompt = summary
+        print(f"[slm] {summary}")
+        self.dispatcher.submit(self.stream_id, self.api_key, summary, on_done=self._on_sent(summary))
+        return summary
+
+    def _full_summary(self) -> Optional[str]:
+        chunk = " ".join(self.buffer).strip()
+        if not chunk:
+            return None
+        try:
+            return self._timed_summary(chunk)
+        except Exception as exc:  # noqa: BLE001
+            return self._fallback_phrase(chunk, exc)
+
+    def _incremental_summary(self) -> Optional[str]:
+        new = self._take_new()
+        unsummarized = [window for window in self._windows if window[1] is None]
+        if not new and not unsummarized:
+            self.stats["skipped"] += 1
+            return None
+        for window in unsummarized:
+            window[1] = self._cached_summary(window[0], fallback=False)
+        self._pending.extend(new)
+        while len(self._pending) >= self.window_size:
+            text = " ".join(self._pending[: self.window_size])
+            del self._pending[: self.window_size]
+            self._windows.append([text, self._cached_summary(text, fallback=False)])
+        parts = [summary if summary is not None else text for text, summary in self._windows]
+        parts = [part for part in parts if part]
+        if self._pending:
+            parts.append(" ".join(self._pending))
+        folded = " ".join(parts).strip()
+        return self._cached_summary(folded) if folded else None
+
+    def _take_new(self) -> List[str]:
+        appended = getattr(self.buffer, "appended", None)
+        if appended is not None:
+            count = min(appended - self._consumed, len(self.buffer))
+            self._consumed = appended
+            return list(self.buffer)[-count:] if count > 0 else []
+        # a plain deque cannot say what is new: re-window the whole buffer when it changes
+        fingerprint = hash(tuple(self.buffer))
+        if fingerprint == self._fingerprint:
+            return []
+        self._fingerprint = fingerprint
+        self._pending.clear()
+        self._windows.clear()
+        return list(self.buffer)
+
+    def _cached_summary(self, text: str, fallback: bool = True) -> Optional[str]:
+        """The model's summary of ``text``; on failure the keyword phrase, or None without ``fallback``."""
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        summary = self._cache.get(key)
+        if summary is not None:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return summary
+        try:
+            summary = self._timed_summary(text)
+        except Exception as exc:  # noqa: BLE001
+            # not cached: the model may well make the budget next time
+            if fallback:
+                return self._fallback_phrase(text, exc)
+            if not isinstance(exc, TimeoutError):
+                print(f"[slm] summarizer failed, retrying next run: {exc}")
+            return None
+        self._cache[key] = summary
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return summary
+
+    def _timed_summary(self, text: str) -> str:
+        remaining = self._deadline - time.monotonic() if self._deadline is not None else None
+        if remaining is not None and remaining <= 0:
+            raise TimeoutError("summary budget already spent")
+        started = time.perf_counter()
+        try:
+            return self.summarizer.summarize(text, budget=remaining)
+        finally:
+            self.stats["summaries"] += 1
+            self.stats["summary_seconds"] += time.perf_counter() - started
+
+    def _fallback_phrase(self, text: str, error: Exception) -> str:
+        self.stats["fallbacks"] += 1
+        if not isinstance(error, TimeoutError):
+            print(f"[slm] summarizer failed, using keywords: {error}")
+        keywords = self.keywords_provider() if self.keywords_provider else ()
+        if not keywords:
+            counts = Counter(self._tokenizer.tokenize(text))
+            keywords = tuple((word, float(count)) for word, count in counts.most_common(8))
+        phrase = WeightedStreamClient._keywords_to_phrase(keywords)
+        return f"{phrase}." if phrase else ""
+
+    def _on_sent(self, summary: str):
+        def on_done(error: Optional[Exception]):
+            if error is None:
+                return
+            print(f"[slm] failed to update Daydream: {error}")
+            if self.last_prompt == summary:
+                # allow the same summary to be retried on the next cycle
+                self.last_prompt = None
+
+        return on_done
 
 
 def main():
@@ -62,14 +219,18 @@ def main():
     if not stream_id or not api_key:
         raise RuntimeError("DAYDREAM_STREAM_ID and DAYDREAM_API_KEY must be set.")
 
-    bridge = SLMSummaryBridge(stream_id=stream_id, api_key=api_key)
+    # inference runs in a worker process so it never competes with the audio threads
+    summarizer = ProcessSummarizer().start()
+    bridge = SLMSummaryBridge(stream_id=stream_id, api_key=api_key, summarizer=summarizer)
     bridge.start()
 
-    client = WeightedStreamClient(on_transcript=bridge.ingest, enable_daydream_updates=False)
+    # finals only: partials would fill the windows with copies of the same growing turn
+    client = WeightedStreamClient(on_final=bridge.ingest, enable_daydream_updates=False)
     try:
         client.start()
     finally:
         bridge.stop()
+        summarizer.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,188 @@
+"""
+Run ``LocalSummarizer`` in worker processes so inference never competes with audio.
+
+Each worker is a spawned process with its own model (warmed up with one dummy
+generate before it takes requests), a pinned torch intra-op thread count and a
+lowered scheduling priority. The parent never imports torch;
+it talks to a worker over a ``multiprocessing`` pipe with small tuples
+(request texts in, summaries out). A worker that crashes or hangs past its
+budget is killed and replaced; the request in flight fails and the next one
+goes to the fresh worker.
+
+Usage:
+    from summarizer_pool import ProcessSummarizer
+    summarizer = ProcessSummarizer(workers=1)
+    summarizer.summarize("long transcript text ...")
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import threading
+from typing import List, Optional
+
+DEFAULT_PREFIX = "Summarize in 2 short phrases: "
+
+
+class WorkerCrashed(RuntimeError):
+    """Raised for the request in flight when its summarizer worker died."""
+
+
+def _serve(conn, model_id: Optional[str], backend: Optional[str], threads: int, niceness: int) -> None:
+    # before torch is imported, so OpenMP/MKL pools are sized once
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    if niceness:
+        os.nice(niceness)
+    import torch
+
+    from local_summarizer import DeadlineExceeded, LocalSummarizer
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    summarizer = LocalSummarizer(model_id=model_id, backend=backend, device="cpu")
+    summarizer.warm_up()
+    conn.send(("ready",))
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        texts, prefix, budget = request
+        try:
+            conn.send(("ok", summarizer.summarize_batch(texts, prefix, budget)))
+        except DeadlineExceeded as exc:
+            conn.send(("deadline", str(exc)))
+        except Exception as exc:  # noqa: BLE001
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+class _Worker:
+    def __init__(self, context, args):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, *args), name="slm-worker", daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1.0)
+        self.conn.close()
+
+
+class ProcessSummarizer:
+    """
+    ``LocalSummarizer``-compatible front end for a pool of summarizer processes.
+
+    ``threads_per_worker`` defaults to the cores left after reserving two for the
+    audio and websocket threads, split across ``workers``. ``load_timeout`` bounds
+    model loading in a fresh worker; with a ``budget``, a worker that has not
+    answered ``grace`` seconds after it is replaced, and a request that finds no
+    free worker within the budget, or only one still loading its model, raises
+    ``TimeoutError`` right away so the caller can fall back.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        model_id: Optional[str] = None,
+        backend: Optional[str] = None,
+        threads_per_worker: Optional[int] = None,
+        niceness: int = 5,
+        load_timeout: float = 300.0,
+        grace: float = 2.0,
+    ):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, ((os.cpu_count() or 1) - 2) // workers)
+        self.load_timeout = load_timeout
+        self.grace = grace
+        self.restarts = 0
+        self._args = (model_id, backend, self.threads_per_worker, niceness)
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._all: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self) -> "ProcessSummarizer":
+        """Spawn the workers now instead of on the first request."""
+        with self._lock:
+            while len(self._all) < self.workers:
+                worker = _Worker(self._context, self._args)
+                self._all.append(worker)
+                self._idle.put(worker)
+        return self
+
+    def summarize(self, text: str, prefix: str = DEFAULT_PREFIX, budget: Optional[float] = None) -> str:
+        return self.summarize_batch([text], prefix, budget)[0]
+
+    def summarize_batch(self, texts: List[str], prefix: str = DEFAULT_PREFIX, budget: Optional[float] = None) -> List[str]:
+        if self._closed:
+            raise RuntimeError("summarizer pool is closed")
+        self.start()
+        try:
+            worker = self._idle.get(timeout=None if budget is None else max(0.0, budget))
+        except queue.Empty:
+            raise TimeoutError(f"no summarizer worker free within {budget:.1f}s") from None
+        if budget is not None and not worker.ready and worker.process.is_alive() and not worker.conn.poll(0):
+            # still loading its model: waiting up to load_timeout would blow the budget
+            self._idle.put(worker)
+            raise TimeoutError("summarizer worker is still loading its model")
+        try:
+            if not worker.ready:
+                self._wait(worker, self.load_timeout)
+                worker.ready = True
+            worker.conn.send((texts, prefix, budget))
+            status, payload = self._wait(worker, budget + self.grace if budget is not None else None)
+        except BaseException:
+            worker = self._replace(worker)
+            raise
+        finally:
+            self._idle.put(worker)
+        if status == "ok":
+            return payload
+        if status == "deadline":
+            raise TimeoutError(payload)
+        raise RuntimeError(f"summarizer worker failed: {payload}")
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            for worker in self._all:
+                try:
+                    worker.conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                worker.process.join(timeout=2.0)
+                worker.kill()
+            self._all.clear()
+
+    def _wait(self, worker: _Worker, timeout: Optional[float]):
+        """Next message from ``worker``, checking twice a second that it is still alive."""
+        waited = 0.0
+        while not worker.conn.poll(0.5):
+            waited += 0.5
+            if not worker.process.is_alive():
+                raise WorkerCrashed(f"summarizer worker exited with code {worker.process.exitcode}")
+            if timeout is not None and waited >= timeout:
+                raise TimeoutError(f"summarizer worker did not answer within {timeout:.1f}s")
+        try:
+            return worker.conn.recv()
+        except EOFError as exc:
+            raise WorkerCrashed("summarizer worker closed its pipe") from exc
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.kill()
+        fresh = _Worker(self._context, self._args)
+        with self._lock:
+            self._all[self._all.index(worker)] = fresh
+            self.restarts += 1
+        print(f"[slm] restarted summarizer worker (restart #{self.restarts})")
+        return fresh
@@ -8,11 +8,12 @@ import websocket
 import json
 import threading
 import time
-import wave
 from urllib.parse import urlencode
 from datetime import datetime
 from dotenv import load_dotenv, find_dotenv
 
+from wav_recorder import WavRecorder
+
 
 # Replace with your chosen API key, this is the "default" account api key
 
@@ -35,9 +36,10 @@ ws_app = None
 audio_thread = None
 stop_event = threading.Event()  # To signal the audio thread to stop
 
-# WAV recording variables
-recorded_frames = []  # Store audio frames for WAV file
-recording_lock = threading.Lock()  # Thread-safe access to recorded_frames
+# WAV recording: frames stream to disk from a writer thread, rotating files
+RECORDING_MAX_SECONDS = 15 * 60  # start a new file every 15 minutes
+RECORDING_MAX_BYTES = None  # or rotate by size, e.g. 100 * 1024 * 1024
+recorder = None
 
 # --- WebSocket Event Handlers ---
 
@@ -50,14 +52,14 @@ def on_open(ws):
     # Start sending audio data in a separate thread
     def stream_audio():
         global stream
+        sink = recorder
         print("Starting audio streaming...")
         while not stop_event.is_set():
             try:
                 audio_data = stream.read(FRAMES_PER_BUFFER, exception_on_overflow=False)
 
-                # Store audio data for WAV recording
-                with recording_lock:
-                    recorded_frames.append(audio_data)
+                # Queue audio data for the WAV writer thread (never blocks)
+                sink.write(audio_data)
 
                 # Send audio data as binary message
                 ws.send(audio_data, websocket.ABNF.OPCODE_BINARY)
@@ -142,37 +144,26 @@ def on_close(ws, close_status_code, close_msg):
 
 
 def save_wav_file():
-    """Save recorded audio frames to a WAV file."""
-    if not recorded_frames:
+    """Flush the recorder and finalize the WAV file(s) it has been writing."""
+    global recorder
+    if recorder is None:
+        return
+    finished, recorder = recorder, None
+    files = finished.close()
+    if not files:
         print("No audio data recorded.")
         return
 
-    # Generate filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"recorded_audio_{timestamp}.wav"
-
-    try:
-        with wave.open(filename, "wb") as wf:
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(2)  # 16-bit = 2 bytes
-            wf.setframerate(SAMPLE_RATE)
-
-            # Write all recorded frames
-            with recording_lock:
-                wf.writeframes(b"".join(recorded_frames))
-
+    for filename in files:
         print(f"Audio saved to: {filename}")
-        print(
-            f"Duration: {len(recorded_frames) * FRAMES_PER_BUFFER / SAMPLE_RATE:.2f} seconds"
-        )
-
-    except Exception as e:
-        print(f"Error saving WAV file: {e}")
+    print(f"Duration: {finished.seconds_written:.2f} seconds")
+    if finished.dropped_chunks:
+        print(f"Dropped {finished.dropped_chunks} chunks while the disk was busy.")
 
 
 # --- Main Execution ---
 def run():
-    global audio, stream, ws_app
+    global audio, stream, ws_app, recorder
 
     # Initialize PyAudio
     audio = pyaudio.PyAudio()
@@ -188,13 +179,21 @@ def run():
         )
         print("Microphone stream opened successfully.")
         print("Speak into your microphone. Press Ctrl+C to stop.")
-        print("Audio will be saved to a WAV file when the session ends.")
+        print("Audio is written to a WAV file as you speak.")
     except Exception as e:
         print(f"Error opening microphone stream: {e}")
         if audio:
             audio.terminate()
         return  # Exit if microphone cannot be opened
 
+    recorder = WavRecorder(
+        "recorded_audio",
+        sample_rate=SAMPLE_RATE,
+        channels=CHANNELS,
+        max_seconds=RECORDING_MAX_SECONDS,
+        max_bytes=RECORDING_MAX_BYTES,
+    )
+
     # Create WebSocketApp
     ws_app = websocket.WebSocketApp(
         API_ENDPOINT,
@@ -251,6 +250,7 @@ def run():
             stream.close()
         if audio:
             audio.terminate()
+        save_wav_file()  # no-op if on_close already finalized the recording
         print("Cleanup complete. Exiting.")
 
 
@@ -0,0 +1,158 @@
+"""
+Stream PCM16 audio to WAV files from a background writer thread.
+
+The capture thread hands each chunk to ``WavRecorder.write``, which only
+enqueues it; a writer thread drains the bounded queue, appends to the current
+file and keeps its RIFF header valid after every batch, so a file is playable
+up to its last write even if the process dies. Files rotate by duration and/or
+size. Memory stays at most ``max_queue`` chunks, and a crash loses at most the
+queued audio (``max_queue`` x 50ms, 3 s by default) plus anything not yet
+fsynced if the machine itself goes down (``fsync_seconds``).
+
+Usage:
+    recorder = WavRecorder("recorded_audio", max_seconds=600)
+    recorder.write(chunk)  # from the audio thread
+    recorder.close()       # -> list of files written
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+import wave
+from datetime import datetime
+from typing import List, Optional
+
+_CLOSE = object()
+
+
+class WavRecorder:
+    """
+    Incremental WAV writer. ``write`` never blocks: when the writer falls behind
+    and the queue is full the chunk is dropped and counted in ``dropped_chunks``.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "recorded_audio",
+        *,
+        directory: str = ".",
+        sample_rate: int = 16000,
+        channels: int = 1,
+        sample_width: int = 2,
+        max_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        max_queue: int = 60,
+        fsync_seconds: float = 2.0,
+    ):
+        self.prefix = prefix
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.max_frames = int(max_seconds * sample_rate) if max_seconds else None
+        self.max_bytes = max_bytes
+        self.fsync_seconds = fsync_seconds
+        self.files: List[str] = []
+        self.frames_written = 0
+        self.dropped_chunks = 0
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_queue)
+        self._wav: Optional[wave.Wave_write] = None
+        self._file = None
+        self._file_frames = 0
+        self._synced_at = 0.0
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="wav-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def seconds_written(self) -> float:
+        return self.frames_written / self.sample_rate
+
+    def write(self, chunk: bytes) -> None:
+        try:
+            self._queue.put_nowait(chunk)
+        except queue.Full:
+            self.dropped_chunks += 1
+
+    def close(self, timeout: float = 5.0) -> List[str]:
+        """Flush the queue, finalize the current file and return every file written."""
+        if self._thread.is_alive():
+            self._queue.put(_CLOSE)
+            self._thread.join(timeout=timeout)
+        if self._error is not None:
+            print(f"[recorder] writer failed: {self._error}")
+        return list(self.files)
+
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        try:
+            while True:
+                chunks = [self._queue.get()]
+                # drain what else is queued so the header is patched once per batch
+                while len(chunks) < 64:
+                    try:
+                        chunks.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                closing = chunks[-1] is _CLOSE
+                self._append([chunk for chunk in chunks if chunk is not _CLOSE])
+                if closing:
+                    return
+        except BaseException as exc:  # noqa: BLE001
+            self._error = exc
+        finally:
+            self._finish_file()
+
+    def _append(self, chunks: List[bytes]) -> None:
+        frame_bytes = self.channels * self.sample_width
+        for chunk in chunks:
+            frames = len(chunk) // frame_bytes
+            if self._wav is None or self._full(frames):
+                self._finish_file()
+                self._start_file()
+            # wave patches the RIFF/data sizes after every writeframes on a seekable file
+            self._wav.writeframes(chunk)
+            self._file_frames += frames
+            self.frames_written += frames
+        if self._file is not None:
+            self._file.flush()
+            if time.monotonic() - self._synced_at >= self.fsync_seconds:
+                os.fsync(self._file.fileno())
+                self._synced_at = time.monotonic()
+
+    def _full(self, incoming: int) -> bool:
+        """Whether ``incoming`` more frames would push the current file past a limit."""
+        if not self._file_frames:
+            return False
+        frames = self._file_frames + incoming
+        if self.max_frames is not None and frames > self.max_frames:
+            return True
+        # 44-byte canonical PCM header
+        return self.max_bytes is not None and 44 + frames * self.channels * self.sample_width > self.max_bytes
+
+    def _start_file(self) -> None:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.directory, f"{self.prefix}_{stamp}.wav")
+        if path in self.files or os.path.exists(path):
+            path = os.path.join(self.directory, f"{self.prefix}_{stamp}_{len(self.files)}.wav")
+        self._file = open(path, "wb")
+        self._wav = wave.open(self._file, "wb")
+        self._wav.setnchannels(self.channels)
+        self._wav.setsampwidth(self.sample_width)
+        self._wav.setframerate(self.sample_rate)
+        self._file_frames = 0
+        self._synced_at = time.monotonic()
+        self.files.append(path)
+
+    def _finish_file(self) -> None:
+        if self._wav is None:
+            return
+        self._wav.close()  # final header patch; does not close a file object it was given
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._wav = self._file = None
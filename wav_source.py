@@ -0,0 +1,117 @@
+"""
+Replay a WAV file as if it were the microphone.
+
+``WavFileSource`` yields ``FRAMES_PER_BUFFER`` chunks of 16 kHz mono PCM16, the
+same frames the PyAudio capture produces, paced against the wall clock:
+``speed=1.0`` is real time, ``speed=4.0`` four times faster, ``speed=0`` as fast
+as the consumer takes them. It is both an iterator (for the thread-based
+``WeightedStreamClient``) and an async iterator (for ``AsyncWeightedStreamClient``
+and ``SessionManager``), and it reads the files ``testaudio.save_wav_file`` writes.
+
+Usage:
+    from wav_source import WavFileSource
+    WeightedStreamClient(audio_source=WavFileSource("recorded_audio.wav", speed=2.0)).start()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import wave
+from typing import AsyncIterator, Iterator, Optional
+
+from weighted_audio_stream import CHANNELS, FRAMES_PER_BUFFER, SAMPLE_RATE
+
+
+class WavFileSource:
+    """
+    Paced PCM16 chunks from a WAV file; ``loop=True`` rewinds at the end instead of stopping.
+
+    Chunk ``n`` is released ``n * chunk_seconds / speed`` after the first one, so
+    a slow consumer catches up rather than drifting. ``chunks`` and
+    ``audio_seconds`` count what has been handed out.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        speed: float = 1.0,
+        loop: bool = False,
+        frames_per_buffer: int = FRAMES_PER_BUFFER,
+    ):
+        if speed < 0:
+            raise ValueError(f"speed must be >= 0, got {speed}")
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.frames_per_buffer = frames_per_buffer
+        self.chunk_seconds = frames_per_buffer / SAMPLE_RATE
+        self.chunks = 0
+        self._wav: Optional[wave.Wave_read] = None
+        self._started_at: Optional[float] = None
+        self._open()
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.chunks * self.chunk_seconds
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            delay = self._delay()
+            if delay > 0:
+                time.sleep(delay)
+            chunk = self._read()
+            if chunk is None:
+                return
+            yield chunk
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._frames()
+
+    async def _frames(self) -> AsyncIterator[bytes]:
+        while True:
+            delay = self._delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            chunk = self._read()
+            if chunk is None:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+    def _open(self) -> None:
+        wav = wave.open(self.path, "rb")
+        layout = (wav.getframerate(), wav.getnchannels(), wav.getsampwidth())
+        if layout != (SAMPLE_RATE, CHANNELS, 2):
+            wav.close()
+            raise ValueError(
+                f"{self.path}: expected {SAMPLE_RATE} Hz, {CHANNELS} channel, 16-bit PCM; "
+                f"got {layout[0]} Hz, {layout[1]} channel(s), {8 * layout[2]}-bit"
+            )
+        self._wav = wav
+
+    def _delay(self) -> float:
+        now = time.monotonic()
+        if self._started_at is None:
+            self._started_at = now
+        if not self.speed:
+            return 0.0
+        return self._started_at + self.chunks * self.chunk_seconds / self.speed - now
+
+    def _read(self) -> Optional[bytes]:
+        if self._wav is None:
+            return None
+        chunk = self._wav.readframes(self.frames_per_buffer)
+        if not chunk and self.loop and self._wav.getnframes():
+            self._wav.rewind()
+            chunk = self._wav.readframes(self.frames_per_buffer)
+        if not chunk:
+            self.close()
+            return None
+        self.chunks += 1
+        return chunk
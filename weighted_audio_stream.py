@@ -9,18 +9,18 @@ keyword vector (e.g., to steer Livepeer Daydream) or the raw transcript text.
 from __future__ import annotations
 
 import json
+import math
 import os
 import re
 import threading
 import time
 from collections import deque
 from datetime import datetime
-from typing import Callable, Deque, Dict, List, Optional, Tuple
-from urllib.parse import urlencode
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-import pyaudio
-import websocket
-from dotenv import find_dotenv, load_dotenv
+from daydream_api import PromptDispatcher, get_dispatcher, load_env
+from reconnect import Backoff, ReplayBuffer
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -33,12 +33,50 @@ API_ENDPOINT = f"{API_ENDPOINT_BASE_URL}?{urlencode(CONNECTION_PARAMS)}"
 FRAMES_PER_BUFFER = 800  # 50ms @16kHz
 SAMPLE_RATE = CONNECTION_PARAMS["sample_rate"]
 CHANNELS = 1
-FORMAT = pyaudio.paInt16
+FORMAT = 8  # pyaudio.paInt16; spelled out so importing this module does not load PortAudio
 
-load_dotenv(find_dotenv())
-API_KEY = os.getenv("ASSEMBLYAI_API_KEY") or os.getenv("API_KEY")
-DAYDREAM_STREAM_ID = os.getenv("DAYDREAM_STREAM_ID")
-DAYDREAM_API_KEY = os.getenv("DAYDREAM_API_KEY") or os.getenv("DAYDREAM_API_ID")
+
+def capture_format(audio, input_device_index: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Native ``(rate, channels)`` of an input device: its default sample rate and
+    at most two channels. Capturing there and converting with
+    ``audio_dsp.Resampler`` works on interfaces that only run at 44.1/48 kHz
+    stereo and keeps the host from resampling. Falls back to 16 kHz mono.
+    """
+    try:
+        if input_device_index is None:
+            info = audio.get_default_input_device_info()
+        else:
+            info = audio.get_device_info_by_index(input_device_index)
+        return int(info["defaultSampleRate"]), max(1, min(int(info["maxInputChannels"]), 2))
+    except (OSError, KeyError, ValueError):
+        return SAMPLE_RATE, CHANNELS
+
+
+def assemblyai_api_key() -> Optional[str]:
+    load_env()
+    return os.getenv("ASSEMBLYAI_API_KEY") or os.getenv("API_KEY")
+
+
+def assemblyai_endpoint() -> str:
+    """Realtime websocket URL; ``ASSEMBLYAI_ENDPOINT`` points it at ``mock_assemblyai.py``."""
+    load_env()
+    base = os.getenv("ASSEMBLYAI_ENDPOINT")
+    return f"{base}?{urlencode(CONNECTION_PARAMS)}" if base else API_ENDPOINT
+
+
+def with_connection_params(url: str, **params) -> str:
+    """``url`` with ``params`` merged into its query string."""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update({key: str(value) for key, value in params.items()})
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def daydream_settings() -> Tuple[Optional[str], Optional[str]]:
+    """``(stream_id, api_key)`` from the environment / ``.env``."""
+    load_env()
+    return os.getenv("DAYDREAM_STREAM_ID"), os.getenv("DAYDREAM_API_KEY") or os.getenv("DAYDREAM_API_ID")
 
 # ---------------------------------------------------------------------------
 # Keyword momentum tracker
@@ -77,9 +115,127 @@ STOPWORDS = {
 }
 
 
+Keywords = Tuple[Tuple[str, float], ...]
+
+
+class TopKIndex:
+    """
+    Bounded min-heap with a position map that holds the ``capacity`` strongest words.
+
+    ``key`` is read on every comparison, so it must reflect the current weight of a
+    word. Keys may only grow while a word is indexed (uniform decay keeps the order),
+    which lets ``offer`` work in O(log k) without rebuilding the heap.
+    """
+
+    def __init__(self, capacity: int, key: Callable[[str], Tuple[float, int]]):
+        self.capacity = capacity
+        self._key = key
+        self._heap: List[str] = []
+        self._pos: Dict[str, int] = {}
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._pos
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._pos.clear()
+
+    def offer(self, word: str) -> bool:
+        """Insert ``word`` or restore its position after its key grew. Returns True if the index changed."""
+        if self.capacity <= 0:
+            return False
+        position = self._pos.get(word)
+        if position is not None:
+            self._sift_down(position)
+            return True
+        if len(self._heap) < self.capacity:
+            self._heap.append(word)
+            self._pos[word] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+            return True
+        if self._key(word) <= self._key(self._heap[0]):
+            return False
+        del self._pos[self._heap[0]]
+        self._heap[0] = word
+        self._pos[word] = 0
+        self._sift_down(0)
+        return True
+
+    def discard(self, word: str) -> bool:
+        position = self._pos.pop(word, None)
+        if position is None:
+            return False
+        last = self._heap.pop()
+        if position < len(self._heap):
+            self._heap[position] = last
+            self._pos[last] = position
+            self._sift_down(position)
+            self._sift_up(self._pos[last])
+        return True
+
+    def trim(self, is_live: Callable[[str], bool]) -> bool:
+        """Drop the weakest words while they fail ``is_live`` (e.g. decayed under the floor)."""
+        changed = False
+        while self._heap and not is_live(self._heap[0]):
+            self.discard(self._heap[0])
+            changed = True
+        return changed
+
+    def ranked(self) -> List[str]:
+        return sorted(self._heap, key=self._key, reverse=True)
+
+    def weakest(self) -> Optional[str]:
+        return self._heap[0] if self._heap else None
+
+    def _sift_up(self, position: int) -> None:
+        heap, pos, key = self._heap, self._pos, self._key
+        word = heap[position]
+        word_key = key(word)
+        while position > 0:
+            parent = (position - 1) >> 1
+            if key(heap[parent]) <= word_key:
+                break
+            heap[position] = heap[parent]
+            pos[heap[position]] = position
+            position = parent
+        heap[position] = word
+        pos[word] = position
+
+    def _sift_down(self, position: int) -> None:
+        heap, pos, key = self._heap, self._pos, self._key
+        size = len(heap)
+        word = heap[position]
+        word_key = key(word)
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            child_key = key(heap[child])
+            if child + 1 < size:
+                right_key = key(heap[child + 1])
+                if right_key < child_key:
+                    child, child_key = child + 1, right_key
+            if word_key <= child_key:
+                break
+            heap[position] = heap[child]
+            pos[heap[position]] = position
+            position = child
+        heap[position] = word
+        pos[word] = position
+
+
 class KeywordMomentumTracker:
     """
     Maintains a weighted queue of keywords with exponential decay.
+
+    The strongest ``max_keywords`` words live in a ``TopKIndex``; ``current_keywords``
+    returns an immutable snapshot that is only rebuilt (and ``snapshot_version``
+    bumped) when the ranked set or its order changes. Weights in the snapshot are
+    the ones measured at that rebuild. Listeners added with ``add_listener`` are
+    called with each new snapshot on the ingesting thread.
     """
 
     WORD_PATTERN = re.compile(r"[a-zA-Z0-9']+")
@@ -88,27 +244,40 @@ class KeywordMomentumTracker:
         self.max_keywords = max_keywords
         self.halflife = halflife_seconds
         self.decay_floor = decay_floor
+        self._listeners: List[Callable[[Keywords], None]] = []
+        self._index = TopKIndex(max_keywords, key=self._rank_key)
+        self._order: Dict[str, int] = {}
+        self._serial = 0
         self.weights: Dict[str, float] = {}
         self.last_timestamp = time.time()
-        self.last_emitted: Deque[Tuple[str, float]] = deque()
+        self.last_emitted: Keywords = ()
+        self.snapshot_version = 0
 
-    def ingest(self, text: str, now: Optional[float] = None) -> Deque[Tuple[str, float]]:
+    def ingest(self, text: str, now: Optional[float] = None) -> Keywords:
         if not text:
             return self.last_emitted
+        return self.ingest_tokens(self.tokenize(text), now)
 
+    def ingest_tokens(self, tokens: List[str], now: Optional[float] = None) -> Keywords:
+        """Count already tokenized words (output of ``tokenize``)."""
         current_time = now or time.time()
-        self._decay(current_time)
+        changed = self._decay(current_time)
 
-        for token in self._tokenize(text):
+        for token in tokens:
+            if token not in self.weights:
+                self._serial += 1
+                self._order[token] = self._serial
             self.weights[token] = self.weights.get(token, 0.0) + 1.0
+            changed = self._index.offer(token) or changed
 
-        self.last_emitted = self._top_keywords()
+        if changed:
+            self._refresh_snapshot()
         return self.last_emitted
 
-    def _decay(self, current_time: float) -> None:
+    def _decay(self, current_time: float) -> bool:
         elapsed = current_time - self.last_timestamp
         if elapsed <= 0:
-            return
+            return False
 
         decay_factor = 0.1 ** (elapsed / self.halflife)
         stale_keys = []
@@ -119,12 +288,16 @@ class KeywordMomentumTracker:
             else:
                 self.weights[word] = decayed
 
+        changed = False
         for key in stale_keys:
             self.weights.pop(key, None)
+            self._order.pop(key, None)
+            changed = self._index.discard(key) or changed
 
         self.last_timestamp = current_time
+        return changed
 
-    def _tokenize(self, text: str) -> List[str]:
+    def tokenize(self, text: str) -> List[str]:
         tokens = []
         for match in self.WORD_PATTERN.findall(text.lower()):
             if len(match) <= 2 or match in STOPWORDS:
@@ -132,13 +305,536 @@ class KeywordMomentumTracker:
             tokens.append(match)
         return tokens
 
-    def current_keywords(self) -> Deque[Tuple[str, float]]:
-        if not self.last_emitted:
-            self.last_emitted = self._top_keywords()
+    def current_keywords(self) -> Keywords:
+        return self.last_emitted
+
+    def add_listener(self, callback: Callable[[Keywords], None]) -> None:
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Keywords], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _top_keywords(self) -> Keywords:
+        return tuple((word, self._weight(word)) for word in self._index.ranked())
+
+    def _refresh_snapshot(self) -> None:
+        ranked = self._index.ranked()
+        if len(ranked) == len(self.last_emitted) and all(
+            word == previous for word, (previous, _) in zip(ranked, self.last_emitted)
+        ):
+            return
+        self.last_emitted = tuple((word, self._weight(word)) for word in ranked)
+        self.snapshot_version += 1
+        for listener in self._listeners:
+            listener(self.last_emitted)
+
+    def _rank_key(self, word: str) -> Tuple[float, int]:
+        # ties go to the earlier insertion, matching a stable sort over the dict
+        return self.weights[word], -self._order[word]
+
+    def _weight(self, word: str) -> float:
+        return self.weights[word]
+
+
+class LazyKeywordMomentumTracker(KeywordMomentumTracker):
+    """
+    Keyword tracker that applies decay lazily instead of rewriting every weight.
+
+    Weights are stored inflated by a single global decay epoch, so ``ingest`` only
+    touches its own tokens and decay is resolved when a word is touched or read.
+    Entries under ``decay_floor`` are pruned by amortized sweeps once the table
+    doubles in size. The epoch is rebased before the inflation factor would pass
+    ``RESCALE_LIMIT``, also across long idle gaps. Output matches
+    ``KeywordMomentumTracker`` within float tolerance.
+    """
+
+    RESCALE_LIMIT = 1e150
+    RESCALE_EXPONENT = math.log10(RESCALE_LIMIT)
+    MIN_SWEEP_SIZE = 1024
+
+    def __init__(self, max_keywords: int = 8, halflife_seconds: float = 20.0, decay_floor: float = 0.05):
+        # word -> [weight inflated to the epoch, insertion serial]
+        self._entries: Dict[str, List[float]] = {}
+        self._sweep_at = self.MIN_SWEEP_SIZE
+        self._epoch = time.time()
+        super().__init__(max_keywords=max_keywords, halflife_seconds=halflife_seconds, decay_floor=decay_floor)
+        self._epoch = self.last_timestamp
+
+    @property
+    def weights(self) -> Dict[str, float]:
+        """Materialized weights as of the last ingest (O(vocabulary), for inspection only)."""
+        scale = self._deflation(self.last_timestamp)
+        return {
+            word: entry[0] * scale for word, entry in self._entries.items() if entry[0] * scale > self.decay_floor
+        }
+
+    @weights.setter
+    def weights(self, values: Dict[str, float]) -> None:
+        self._entries = {}
+        self._index.clear()
+        if not values:
+            return
+        self._epoch = self.last_timestamp
+        for word, weight in values.items():
+            self._serial += 1
+            self._entries[word] = [weight, self._serial]
+            self._index.offer(word)
+        self._refresh_snapshot()
+
+    def ingest_tokens(self, tokens: List[str], now: Optional[float] = None) -> Keywords:
+        inflation, changed = self._advance(now)
+        threshold = self.decay_floor * inflation
+
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+
+        for token, count in counts.items():
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= threshold:
+                if entry is not None:
+                    # expired: re-insert at the end to keep insertion-order tie breaks
+                    del self._entries[token]
+                    self._index.discard(token)
+                self._serial += 1
+                entry = [0.0, self._serial]
+                self._entries[token] = entry
+            entry[0] += count * inflation
+            changed = self._index.offer(token) or changed
+
+        changed = self._index.trim(lambda word: self._entries[word][0] > threshold) or changed
+
+        if len(self._entries) >= self._sweep_at:
+            self._sweep(threshold)
+
+        if changed:
+            self._refresh_snapshot()
+        return self.last_emitted
+
+    def _rank_key(self, word: str) -> Tuple[float, int]:
+        entry = self._entries[word]
+        return entry[0], -entry[1]
+
+    def _weight(self, word: str) -> float:
+        return self._entries[word][0] * self._deflation(self.last_timestamp)
+
+    def _advance(self, now: Optional[float]) -> Tuple[float, bool]:
+        """Move the clock to ``now``; returns the inflation factor and whether the top-k changed."""
+        current_time = now or time.time()
+        if current_time > self.last_timestamp:
+            self.last_timestamp = current_time
+        if (self.last_timestamp - self._epoch) / self.halflife > self.RESCALE_EXPONENT:
+            return 1.0, self._rebase()
+        return self._inflation(self.last_timestamp), False
+
+    def _inflation(self, timestamp: float) -> float:
+        # only valid within RESCALE_EXPONENT halflives of the epoch; see _advance
+        return 10.0 ** ((timestamp - self._epoch) / self.halflife)
+
+    def _deflation(self, timestamp: float) -> float:
+        # underflows to 0.0 instead of overflowing, however long the gap
+        return 10.0 ** ((self._epoch - timestamp) / self.halflife)
+
+    def _sweep(self, threshold: float) -> None:
+        live: Dict[str, List[float]] = {}
+        for word, entry in self._entries.items():
+            if entry[0] > threshold:
+                live[word] = entry
+            else:
+                self._index.discard(word)
+        self._entries = live
+        self._sweep_at = max(self.MIN_SWEEP_SIZE, 2 * len(self._entries))
+
+    def _rebase(self) -> bool:
+        # after a long idle gap everything may have decayed: the table empties and the epoch restarts
+        scale = self._deflation(self.last_timestamp)
+        rebased: Dict[str, List[float]] = {}
+        changed = False
+        for word, entry in self._entries.items():
+            if entry[0] * scale > self.decay_floor:
+                entry[0] *= scale
+                rebased[word] = entry
+            else:
+                changed = self._index.discard(word) or changed
+        self._entries = rebased
+        self._epoch = self.last_timestamp
+        return changed
+
+
+class SpaceSavingKeywordTracker(LazyKeywordMomentumTracker):
+    """
+    Lazy-decay keyword tracker that never holds more than ``capacity`` words.
+
+    Uses decayed Space-Saving: when the table is full, a new word replaces the
+    weakest tracked word and inherits its weight as a possible overestimate
+    (its ``error``). Because decay is uniform it scales true weights and errors
+    alike, so the usual Space-Saving guarantees hold for decayed weights. With
+    ``W`` the decayed weight of everything ingested so far:
+
+    - every reported weight ``w`` of a word with true weight ``t`` satisfies
+      ``t <= w <= t + error(word) <= t + error_bound()``;
+    - ``error_bound() <= W / capacity``, and is 0.0 until the first eviction, so
+      output is identical to the exact tracker while fewer than ``capacity``
+      words are live;
+    - a word whose true weight exceeds ``W / capacity`` is always tracked, and an
+      emitted word whose ``weight - error`` is at least the next tracked weight
+      is certainly in the exact top ``max_keywords``.
+    """
+
+    def __init__(
+        self,
+        max_keywords: int = 8,
+        halflife_seconds: float = 20.0,
+        decay_floor: float = 0.05,
+        capacity: int = 512,
+    ):
+        if capacity < max_keywords:
+            raise ValueError("capacity must be at least max_keywords")
+        self.capacity = capacity
+        self.evictions = 0
+        # every tracked word, weakest first; its root is the eviction victim
+        self._tracked = TopKIndex(capacity, key=self._rank_key)
+        self._max_error = 0.0
+        super().__init__(max_keywords=max_keywords, halflife_seconds=halflife_seconds, decay_floor=decay_floor)
+
+    @property
+    def weights(self) -> Dict[str, float]:
+        return LazyKeywordMomentumTracker.weights.fget(self)
+
+    @weights.setter
+    def weights(self, values: Dict[str, float]) -> None:
+        if values and len(values) > self.capacity:
+            strongest = set(sorted(values, key=values.get, reverse=True)[: self.capacity])
+            values = {word: weight for word, weight in values.items() if word in strongest}
+        LazyKeywordMomentumTracker.weights.fset(self, values)
+        self._tracked.clear()
+        self._max_error = 0.0
+        for word, entry in self._entries.items():
+            entry.append(0.0)
+            self._tracked.offer(word)
+
+    def ingest_tokens(self, tokens: List[str], now: Optional[float] = None) -> Keywords:
+        inflation, changed = self._advance(now)
+        threshold = self.decay_floor * inflation
+        changed = self._expire(threshold) or changed
+
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+
+        for token, count in counts.items():
+            entry = self._entries.get(token)
+            if entry is None:
+                floor = 0.0
+                if len(self._entries) >= self.capacity:
+                    changed = self._expire(threshold) or changed
+                if len(self._entries) >= self.capacity:
+                    victim = self._tracked.weakest()
+                    floor = self._entries[victim][0]
+                    changed = self._forget(victim) or changed
+                    self._max_error = max(self._max_error, floor)
+                    self.evictions += 1
+                self._serial += 1
+                entry = [floor, self._serial, floor]
+                self._entries[token] = entry
+            entry[0] += count * inflation
+            self._tracked.offer(token)
+            changed = self._index.offer(token) or changed
+
+        if changed:
+            self._refresh_snapshot()
         return self.last_emitted
 
-    def _top_keywords(self) -> Deque[Tuple[str, float]]:
-        return deque(sorted(self.weights.items(), key=lambda item: item[1], reverse=True)[: self.max_keywords])
+    def error(self, word: str) -> float:
+        """Largest possible overestimate of ``word``'s current weight (0.0 if untracked)."""
+        entry = self._entries.get(word)
+        return entry[2] * self._deflation(self.last_timestamp) if entry else 0.0
+
+    def error_bound(self) -> float:
+        """Largest possible overestimate of any reported weight."""
+        return self._max_error * self._deflation(self.last_timestamp)
+
+    def _expire(self, threshold: float, scale: float = 1.0) -> bool:
+        # uniform decay keeps the order, so expired words are always the weakest
+        changed = False
+        while len(self._tracked) and self._entries[self._tracked.weakest()][0] * scale <= threshold:
+            changed = self._forget(self._tracked.weakest()) or changed
+        return changed
+
+    def _forget(self, word: str) -> bool:
+        self._tracked.discard(word)
+        changed = self._index.discard(word)
+        del self._entries[word]
+        return changed
+
+    def _rebase(self) -> bool:
+        scale = self._deflation(self.last_timestamp)
+        changed = self._expire(self.decay_floor, scale)
+        for entry in self._entries.values():
+            entry[2] *= scale
+        self._max_error *= scale
+        return super()._rebase() or changed
+
+
+class MaterialChangeFilter:
+    """
+    Decides whether a new top-k snapshot differs enough from the last emitted one.
+
+    A change is material when a word enters or leaves the top-k or a word moves
+    at least ``rank_shift`` positions. Weight-only changes never are: trackers
+    only publish a snapshot when the ranked set or its order changes, and the
+    prompt is built from the words alone.
+    """
+
+    def __init__(self, rank_shift: int = 1):
+        self.rank_shift = rank_shift
+
+    def is_material(self, previous: Keywords, current: Keywords) -> bool:
+        if not previous or not current:
+            return bool(previous) != bool(current)
+        emitted = {word: rank for rank, (word, _) in enumerate(previous)}
+        if len(emitted) != len(current):
+            return True
+        for rank, (word, _) in enumerate(current):
+            if word not in emitted:
+                return True
+            if abs(rank - emitted[word]) >= self.rank_shift:
+                return True
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Turn delta ingestion
+# ---------------------------------------------------------------------------
+
+
+class _TurnState:
+    __slots__ = ("committed", "sent")
+
+    def __init__(self):
+        self.committed = ""  # transcript prefix whose tokens were already counted
+        self.sent: Dict[str, int] = {}
+
+
+class TurnDeltaIngestor:
+    """
+    Diffs AssemblyAI v3 ``Turn`` payloads against what the same ``turn_order`` already sent.
+
+    Partials resend the growing transcript of a turn, so only words past the
+    committed prefix are tokenized, and the last (possibly incomplete) word is
+    held back until the turn ends. ``end_of_turn`` and the formatted final are
+    reconciled against per-turn token counts so every word is counted once.
+    Words revised away after being counted cannot be retracted from the tracker.
+    After a reconnect, ``carry_over`` turns the words already counted from the
+    old session's unfinished turns into a credit that the new session's first
+    turn spends instead of counting them again.
+    """
+
+    def __init__(
+        self,
+        tokenize: Callable[[str], List[str]],
+        *,
+        formatted_finals: bool = bool(CONNECTION_PARAMS.get("format_turns")),
+        max_open_turns: int = 4,
+    ):
+        self._tokenize = tokenize
+        self.formatted_finals = formatted_finals
+        self.max_open_turns = max_open_turns
+        self._turns: Dict[object, _TurnState] = {}
+        self._credits: Dict[int, Dict[str, int]] = {}
+
+    def carry_over(self, previous: int, session: int) -> None:
+        """The audio of ``previous``'s open turns was replayed into ``session``."""
+        credit = self._credits.pop(previous, {})
+        for turn in [turn for turn in self._turns if turn[0] == previous]:
+            for token, count in self._turns.pop(turn).sent.items():
+                credit[token] = credit.get(token, 0) + count
+        if credit:
+            self._credits[session] = credit
+
+    def feed(self, payload: Dict, session: int = 0) -> Tuple[List[str], Optional[str]]:
+        """
+        Returns ``(new_tokens, final_text)``; ``final_text`` is set once per turn, on
+        its last message (the formatted one when ``formatted_finals`` is enabled).
+        ``session`` tells apart connections, whose ``turn_order`` each start at 0.
+        """
+        turn = (session, payload.get("turn_order"))
+        transcript = payload.get("transcript") or ""
+        end_of_turn = bool(payload.get("end_of_turn"))
+        state = self._turns.get(turn)
+        if state is None:
+            state = self._turns[turn] = _TurnState()
+            self._evict()
+
+        credit = self._credits.get(session)
+        if end_of_turn:
+            tokens = self._spend(credit, self._reconcile(state, self._tokenize(transcript)))
+            state.committed = transcript
+            if payload.get("turn_is_formatted") or not self.formatted_finals:
+                self._turns.pop(turn, None)
+                self._credits.pop(session, None)  # replayed audio ends within the first turn
+                return tokens, transcript
+            return tokens, None
+
+        if transcript.startswith(state.committed):
+            region = transcript[len(state.committed) :]
+            cut = region.rfind(" ")
+            if cut < 0:
+                return [], None
+            tokens = self._tokenize(region[:cut])
+            state.committed = transcript[: len(state.committed) + cut + 1]
+            for token in tokens:
+                state.sent[token] = state.sent.get(token, 0) + 1
+            return self._spend(credit, tokens), None
+
+        # the recognizer revised an already committed word: diff the stable part by counts
+        cut = transcript.rfind(" ")
+        stable = transcript[: cut + 1] if cut >= 0 else ""
+        tokens = self._reconcile(state, self._tokenize(stable))
+        state.committed = stable
+        return self._spend(credit, tokens), None
+
+    @staticmethod
+    def _spend(credit: Optional[Dict[str, int]], tokens: List[str]) -> List[str]:
+        if not credit:
+            return tokens
+        fresh = []
+        for token in tokens:
+            if credit.get(token):
+                credit[token] -= 1
+            else:
+                fresh.append(token)
+        return fresh
+
+    @staticmethod
+    def _reconcile(state: _TurnState, tokens: List[str]) -> List[str]:
+        seen: Dict[str, int] = {}
+        missing = []
+        for token in tokens:
+            seen[token] = seen.get(token, 0) + 1
+            if seen[token] > state.sent.get(token, 0):
+                state.sent[token] = seen[token]
+                missing.append(token)
+        return missing
+
+    def _evict(self) -> None:
+        # turns abandoned by a dropped connection never send a final; keep the newest few
+        while len(self._turns) > self.max_open_turns:
+            self._turns.pop(next(iter(self._turns)))
+
+
+def strip_overlap(previous: str, text: str) -> str:
+    """
+    ``text`` without its leading words that repeat the last words of
+    ``previous``, ignoring case and punctuation: audio kept after a final turn
+    and replayed into a new session is transcribed a second time.
+    """
+    tail = [word.strip(".,!?;:\"").lower() for word in previous.split()]
+    words = text.split()
+    head = [word.strip(".,!?;:\"").lower() for word in words]
+    for size in range(min(len(tail), len(head)), 0, -1):
+        if tail[-size:] == head[:size]:
+            return " ".join(words[size:])
+    return text
+
+
+# ---------------------------------------------------------------------------
+# Sentence segmentation
+# ---------------------------------------------------------------------------
+
+
+class SentenceSegmenter:
+    """
+    Incremental sentence splitter for appended transcript fragments.
+
+    Only the newly appended fragment is scanned for terminal punctuation; the
+    unfinished tail is kept as a list of fragments and force-flushed as a
+    sentence once it reaches ``max_chars`` or has been idle for ``idle_seconds``,
+    so unpunctuated speech can neither grow the buffer nor go quadratic.
+    """
+
+    BOUNDARY = re.compile(r"[.!?]+(?=\s|$)")
+
+    def __init__(
+        self,
+        on_sentence: Callable[[str], None],
+        *,
+        max_chars: int = 400,
+        idle_seconds: float = 6.0,
+    ):
+        self.on_sentence = on_sentence
+        self.max_chars = max_chars
+        self.idle_seconds = idle_seconds
+        self._tail: List[str] = []
+        self._tail_chars = 0
+        self._last_append = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def pending_text(self) -> str:
+        with self._lock:
+            return " ".join(self._tail)
+
+    def append(self, fragment: str, now: Optional[float] = None) -> None:
+        text = fragment.strip()
+        if not text:
+            return
+        current_time = now or time.time()
+        sentences: List[str] = []
+        with self._lock:
+            if self._tail and current_time - self._last_append >= self.idle_seconds:
+                sentences.append(self._take_tail())
+            self._last_append = current_time
+
+            start = 0
+            for match in self.BOUNDARY.finditer(text):
+                self._tail.append(text[start : match.end()].strip())
+                sentences.append(self._take_tail())
+                start = match.end()
+            rest = text[start:].strip()
+            if rest:
+                self._tail.append(rest)
+                self._tail_chars += len(rest) + 1
+            while self._tail_chars > self.max_chars:
+                sentences.append(self._take_prefix())
+        self._emit(sentences)
+
+    def flush_if_idle(self, now: Optional[float] = None) -> None:
+        current_time = now or time.time()
+        with self._lock:
+            if not self._tail or current_time - self._last_append < self.idle_seconds:
+                return
+            sentences = [self._take_tail()]
+        self._emit(sentences)
+
+    def flush(self) -> None:
+        with self._lock:
+            sentences = [self._take_tail()] if self._tail else []
+        self._emit(sentences)
+
+    def _take_tail(self) -> str:
+        sentence = " ".join(self._tail)
+        self._tail = []
+        self._tail_chars = 0
+        return sentence
+
+    def _take_prefix(self) -> str:
+        # cut an over-long tail at the last word boundary that fits
+        joined = self._take_tail()
+        cut = joined.rfind(" ", 0, self.max_chars)
+        if cut <= 0:
+            cut = self.max_chars
+        rest = joined[cut:].strip()
+        if rest:
+            self._tail.append(rest)
+            self._tail_chars = len(rest) + 1
+        return joined[:cut].strip()
+
+    def _emit(self, sentences: List[str]) -> None:
+        for sentence in sentences:
+            if sentence:
+                self.on_sentence(sentence)
 
 
 # ---------------------------------------------------------------------------
@@ -146,39 +842,177 @@ class KeywordMomentumTracker:
 # ---------------------------------------------------------------------------
 
 
+class TranscriptBuffer(deque):
+    """Bounded transcript history that counts every append, so readers can tell what is new."""
+
+    def __init__(self, maxlen: int = 64):
+        super().__init__(maxlen=maxlen)
+        self.appended = 0
+
+    def append(self, text: str) -> None:
+        super().append(text)
+        self.appended += 1
+
+
+class _Session:
+    """One AssemblyAI websocket connection of a ``WeightedStreamClient``."""
+
+    def __init__(self, number: int):
+        self.number = number
+        self.app = None
+        self.thread: Optional[threading.Thread] = None
+        self.begun = threading.Event()
+        self.closed = threading.Event()
+        self.expires_at: Optional[float] = None
+        self.rotate_at: Optional[float] = None
+        self.retiring = False  # Terminate sent: its close is expected
+        self.replayed_after: Optional[str] = None  # last final before the audio replayed into it
+
+    def run(self) -> None:
+        try:
+            self.app.run_forever()
+        finally:
+            self.closed.set()
+
+
 class WeightedStreamClient:
     def __init__(
         self,
         *,
-        on_keywords: Optional[Callable[[Tuple[Tuple[str, float], ...]], None]] = None,
+        on_keywords: Optional[Callable[[Keywords], None]] = None,
         on_transcript: Optional[Callable[[str], None]] = None,
+        on_final: Optional[Callable[[str], None]] = None,
         refresh_interval: float = 5.0,
         stream_id_provider: Optional[Callable[[], Optional[str]]] = None,
         daydream_api_key: Optional[str] = None,
         default_stream_id: Optional[str] = None,
         enable_daydream_updates: bool = True,
+        tracker: Optional[KeywordMomentumTracker] = None,
+        dispatcher: Optional[PromptDispatcher] = None,
+        emit_mode: str = "poll",
+        debounce_seconds: float = 0.25,
+        min_emit_interval: float = 1.0,
+        change_filter: Optional[MaterialChangeFilter] = None,
+        audio_source=None,
+        api_endpoint: Optional[str] = None,
+        vad=None,
+        encoding: str = "pcm_s16le",
+        reconnect: bool = True,
+        replay_seconds: float = 5.0,
+        rotate_before_expiry: float = 60.0,
+        offload_messages: bool = True,
+        dispatch_queue_size: int = 256,
     ):
+        """
+        ``on_transcript`` gets every transcript, partials included, as the turn
+        grows; ``on_final`` gets each turn once, with its final (formatted) text.
+
+        ``audio_source`` is an iterable of 16 kHz mono PCM16 chunks (for example a
+        ``wav_source.WavFileSource``) used instead of the microphone; when it runs
+        out the client sends ``Terminate`` and returns once the server closes.
+        ``api_endpoint`` defaults to ``assemblyai_endpoint()``. ``vad`` (an
+        ``audio_dsp.EnergyVAD``) gates silence out of the uplink.
+        ``encoding="pcm_mulaw"`` sends 8-bit μ-law instead of 16-bit PCM, half
+        the bytes; the endpoint is asked for that encoding.
+
+        With ``reconnect`` a dropped websocket is reopened with jittered backoff
+        and the audio sent since the last final turn (at most ``replay_seconds``)
+        is replayed into the new session; keyword state is kept, and words of the
+        replayed audio that were already counted or emitted are not repeated
+        (see ``TurnDeltaIngestor.carry_over`` and ``strip_overlap``). Sessions are
+        also rotated ``rotate_before_expiry`` seconds before the ``expires_at``
+        from ``Begin``: the successor connects while the old session is still
+        streaming and audio switches over at the next end of turn. Only failing
+        to open the first session ends the stream.
+
+        With ``offload_messages`` (thread-based ``start`` only) the websocket
+        receive thread just queues raw frames: a parse stage and a process
+        stage (tracker, segmenter) handle them in order on worker threads, and
+        ``on_transcript``/``on_final`` run on a ``dispatch.CallbackExecutor``. Queues hold
+        ``dispatch_queue_size`` items; a lagging process stage skips partials
+        superseded by a newer message of the same turn and sheds the oldest
+        partials when full, finals are never dropped (see ``dispatch_stats``).
+
+        ``emit_mode="poll"`` checks the tracker every ``refresh_interval`` seconds.
+        ``emit_mode="push"`` emits when the tracker reports a material top-k change
+        (see ``change_filter``), after ``debounce_seconds`` and no sooner than
+        ``min_emit_interval`` after the previous emission.
+        """
+        if emit_mode not in ("poll", "push"):
+            raise ValueError(f"emit_mode must be 'poll' or 'push', got {emit_mode!r}")
+        if encoding not in ("pcm_s16le", "pcm_mulaw"):
+            raise ValueError(f"encoding must be 'pcm_s16le' or 'pcm_mulaw', got {encoding!r}")
         self.audio = None
         self.stream = None
+        self.resampler = None
+        self.capture = None
         self.ws_app = None
         self.audio_thread = None
         self.refresh_thread = None
         self.stop_event = threading.Event()
-        self.tracker = KeywordMomentumTracker()
+        self.reconnect = reconnect
+        self.rotate_before_expiry = rotate_before_expiry
+        self.backoff = Backoff()
+        self.replay = ReplayBuffer(replay_seconds, bytes_per_second=SAMPLE_RATE * (1 if encoding == "pcm_mulaw" else 2))
+        self.reconnects = 0
+        self.rotations = 0
+        self._api_key: Optional[str] = None
+        self._sessions = 0
+        self._active: Optional[_Session] = None
+        self._latest: Optional[_Session] = None  # last activated; older sessions are superseded
+        self._last_final = ""
+        self._uplink_ready = threading.Condition()
+        self._turn_lock = threading.Lock()
+        self._source_done = threading.Event()
+        self._turn_ended = threading.Event()
+        self.offload_messages = offload_messages
+        self.dispatch_queue_size = dispatch_queue_size
+        self.callbacks = None
+        self.coalesced_partials = 0
+        self._parse_stage = None
+        self._process_stage = None
+        self._latest_message: Dict[Tuple[int, object], int] = {}
+        self._sequence = 0
+        self.audio_source = audio_source
+        self.api_endpoint = api_endpoint or assemblyai_endpoint()
+        self.vad = vad
+        self.encoding = encoding
+        self._encode: Optional[Callable[[bytes], bytes]] = None
+        if encoding == "pcm_mulaw":
+            from audio_dsp import mulaw_encode
+
+            self._encode = mulaw_encode
+            self.api_endpoint = with_connection_params(self.api_endpoint, encoding=encoding)
+        self.tracker = tracker or KeywordMomentumTracker()
+        self.turn_deltas = TurnDeltaIngestor(self.tracker.tokenize)
         self.last_printed: Tuple[str, ...] | None = None
+        self._emitted_version: Optional[int] = None
         self.refresh_interval = refresh_interval
         self.keyword_callback = on_keywords
         self.transcript_callback = on_transcript
+        self.final_callback = on_final
         self.stream_id_provider = stream_id_provider
-        self.default_stream_id = default_stream_id or DAYDREAM_STREAM_ID
-        self.daydream_key = daydream_api_key if daydream_api_key is not None else DAYDREAM_API_KEY
-        self.pending_text = ""
+        env_stream_id, env_api_key = daydream_settings()
+        self.default_stream_id = default_stream_id or env_stream_id
+        self.daydream_key = daydream_api_key if daydream_api_key is not None else env_api_key
         self.latest_sentence_summary = ""
+        self.segmenter = SentenceSegmenter(self._on_sentence)
         self._missing_stream_warning_emitted = False
         self.daydream_enabled = enable_daydream_updates
+        self.dispatcher = dispatcher
+        self.emit_mode = emit_mode
+        self.debounce_seconds = debounce_seconds
+        self.min_emit_interval = min_emit_interval
+        self.change_filter = change_filter or MaterialChangeFilter()
+        self._keywords_changed = threading.Event()
+        self._emitted_keywords: Keywords = ()
+        self._last_emit_at = 0.0
+        if emit_mode == "push":
+            self.tracker.add_listener(self._on_keywords_changed)
 
     def start(self):
-        if not API_KEY:
+        api_key = assemblyai_api_key()
+        if not api_key:
             raise RuntimeError("API_KEY missing. Please set it in your environment.")
         if self.daydream_enabled and not self.daydream_key:
             print("[daydream] disabling automatic updates: DAYDREAM_API_KEY missing.")
@@ -186,74 +1020,297 @@ class WeightedStreamClient:
         if not self.daydream_enabled:
             self._missing_stream_warning_emitted = False
 
+        if self.audio_source is None:
+            self._open_microphone()
+
+        self._api_key = api_key
+        if self.offload_messages:
+            self._start_dispatch()
+        supervisor = threading.Thread(target=self._supervise, name="assemblyai-session", daemon=True)
+        supervisor.start()
+        self.audio_thread = threading.Thread(target=self._stream_audio, name="audio-stream", daemon=True)
+        self.audio_thread.start()
+
+        self.start_emitter()
+
+        try:
+            while supervisor.is_alive():
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            self.stop_event.set()
+            print("\nStopping stream...")
+            session = self._active
+            if session is not None and self._retire(session):
+                time.sleep(1)
+            if self.ws_app:
+                self.ws_app.close()
+            supervisor.join(timeout=2.0)
+        finally:
+            self._cleanup()
+
+    def _open_microphone(self):
+        import pyaudio
+
+        from audio_dsp import Resampler
+        from capture_ring import CaptureRing
+
         self.audio = pyaudio.PyAudio()
+        rate, channels = capture_format(self.audio)
+        self.resampler = Resampler(rate, SAMPLE_RATE, channels)
+        self.capture = CaptureRing(FRAMES_PER_BUFFER * 2)
+
+        def on_audio(in_data, _frame_count, _time_info, status):
+            # PortAudio's thread: convert and copy into the ring, never touch the socket
+            if status & pyaudio.paInputOverflow:
+                self.capture.note_overflow()
+            for frame in self.resampler.process(in_data):
+                self.capture.write(frame)
+            return None, pyaudio.paContinue
+
         try:
             self.stream = self.audio.open(
                 input=True,
-                frames_per_buffer=FRAMES_PER_BUFFER,
-                channels=CHANNELS,
+                frames_per_buffer=rate * FRAMES_PER_BUFFER // SAMPLE_RATE,
+                channels=channels,
                 format=FORMAT,
-                rate=SAMPLE_RATE,
+                rate=rate,
+                stream_callback=on_audio,
             )
-            print("Microphone stream ready. Speak to discover the dominant keywords.")
+            print(f"Microphone stream ready ({rate} Hz, {channels} ch). Speak to discover the dominant keywords.")
         except Exception as exc:
             if self.audio:
                 self.audio.terminate()
             raise RuntimeError(f"Unable to open microphone: {exc}") from exc
 
-        self.ws_app = websocket.WebSocketApp(
-            API_ENDPOINT,
-            header={"Authorization": API_KEY},
+    def _microphone_chunks(self):
+        """Frames from the capture ring as zero-copy views, each released once the consumer moves on."""
+        while not self.stop_event.is_set():
+            frame = self.capture.get(timeout=0.5)
+            if frame is None:
+                continue
+            try:
+                yield frame
+            finally:
+                self.capture.release()
+
+    def capture_stats(self) -> Dict:
+        """Overflow, drop, queue-depth and capture-to-send delay counters of the microphone ring."""
+        stats = getattr(self.audio_source, "stats", None)
+        if stats is not None:
+            return stats()
+        return self.capture.stats() if self.capture is not None else {}
+
+    def uplink_state(self) -> str:
+        """"ready" while a session takes audio, else "connecting", "reconnecting" or "stopped"."""
+        if self.stop_event.is_set():
+            return "stopped"
+        if self._active is not None:
+            return "ready"
+        return "reconnecting" if self._latest is not None else "connecting"
+
+    def start_emitter(self):
+        """Start the keyword emitter thread (``start`` does this after connecting)."""
+        self.refresh_thread = threading.Thread(target=self._emit_loop, name="keyword-refresh", daemon=True)
+        self.refresh_thread.start()
+
+    # ------------------------------------------------------------------
+    # Sessions: connect, replay, rotate
+    # ------------------------------------------------------------------
+
+    def _supervise(self):
+        """Keep one session active until the source is done, reconnecting and rotating as needed."""
+        session = self._connect()
+        if session is None or not self._activate(session):
+            print(f"Unable to start an AssemblyAI session at {self.api_endpoint}.")
+            self.stop_event.set()
+            return
+        while session is not None and not self.stop_event.is_set():
+            if session.closed.is_set():
+                if session.retiring:
+                    return
+                if not self.reconnect:
+                    self.stop_event.set()
+                    return
+                print(f"[ws] session {session.number} dropped; reconnecting.")
+                self.reconnects += 1
+                session = self._reopen()
+            elif session.rotate_at is not None and time.time() >= session.rotate_at and not session.retiring:
+                session = self._rotate(session)
+            else:
+                session.closed.wait(0.25)
+
+    def _reopen(self) -> Optional["_Session"]:
+        while not self.stop_event.is_set():
+            session = self._connect()
+            if session is not None and self._activate(session):
+                self.backoff.reset()
+                if self._source_done.is_set():
+                    self._retire(session)  # the replay was all that was left to transcribe
+                return session
+            delay = self.backoff.next()
+            print(f"[ws] connecting failed; retrying in {delay:.1f}s.")
+            self.stop_event.wait(delay)
+        return None
+
+    def _rotate(self, session: "_Session") -> "_Session":
+        """Connect a successor, hand the audio over at the next end of turn, retire ``session``."""
+        print(f"[ws] session {session.number} expires in {session.expires_at - time.time():.0f}s; rotating.")
+        successor = self._connect()
+        if successor is None:
+            session.rotate_at = time.time() + self.backoff.next()
+            return session
+        self._turn_ended.clear()
+        handover_by = time.monotonic() + min(self.rotate_before_expiry / 2.0, session.expires_at - time.time())
+        while time.monotonic() < handover_by and not self.stop_event.is_set():
+            if self._turn_ended.wait(0.1) or session.closed.is_set() or successor.closed.is_set():
+                break
+        if successor.closed.is_set() or not self._activate(successor):
+            session.rotate_at = time.time() + self.backoff.next()
+            return session
+        self.backoff.reset()
+        self.rotations += 1
+        if self._source_done.is_set() and not successor.retiring:
+            self._retire(successor)  # the source ran out during the handover
+        return successor
+
+    def _connect(self, timeout: float = 10.0) -> Optional["_Session"]:
+        """Open a websocket and wait for its ``Begin``; ``None`` if it fails or times out."""
+        import websocket
+
+        session = _Session(self._sessions)
+        self._sessions += 1
+        session.app = websocket.WebSocketApp(
+            self.api_endpoint,
+            header={"Authorization": self._api_key},
             on_open=self._on_open,
-            on_message=self._on_message,
+            on_message=lambda ws, message: self._on_message(ws, message, session),
             on_error=self._on_error,
-            on_close=self._on_close,
+            on_close=lambda ws, status, msg: self._on_close(ws, status, msg, session),
         )
+        session.thread = threading.Thread(target=session.run, name=f"assemblyai-ws-{session.number}", daemon=True)
+        session.thread.start()
+        deadline = time.monotonic() + timeout
+        while not session.begun.wait(0.05):
+            if session.closed.is_set() or self.stop_event.is_set() or time.monotonic() > deadline:
+                session.app.close()
+                return None
+        if session.expires_at is not None:
+            session.rotate_at = session.expires_at - self.rotate_before_expiry
+        return session
 
-        ws_thread = threading.Thread(target=self.ws_app.run_forever, name="assemblyai-ws", daemon=True)
-        ws_thread.start()
+    def _activate(self, session: "_Session") -> bool:
+        """Replay recent audio into ``session`` and make it the one the uplink feeds."""
+        import websocket
 
-        self.refresh_thread = threading.Thread(target=self._emit_loop, name="keyword-refresh", daemon=True)
-        self.refresh_thread.start()
+        with self._uplink_ready:
+            payloads = self.replay.payloads()
+            try:
+                for payload in payloads:
+                    session.app.send(payload, opcode=websocket.ABNF.OPCODE_BINARY)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[ws] replay into session {session.number} failed: {exc}")
+                session.app.close()
+                return False
+            previous, self._active = self._active, session
+            self._hand_over(session, bool(payloads))
+            self.ws_app = session.app
+            self._uplink_ready.notify_all()
+        if payloads:
+            print(f"[ws] session {session.number}: replayed {len(payloads) * self.replay.chunk_bytes / self.replay.bytes_per_second:.1f}s of audio.")
+        if previous is not None and not previous.closed.is_set():
+            self._retire(previous)
+        return True
 
+    def _hand_over(self, session, replayed: bool) -> None:
+        """Supersede the previous session; what ``session`` re-transcribes from the replay is not counted twice."""
+        with self._turn_lock:
+            previous, self._latest = self._latest, session
+            if previous is None:
+                return
+            self.turn_deltas.carry_over(previous.number, session.number)
+            if replayed:
+                session.replayed_after = self._last_final
+
+    def _retire(self, session: "_Session") -> bool:
+        """Ask ``session`` to finish its last turn and close; its remaining messages are still handled."""
+        session.retiring = True
         try:
-            while ws_thread.is_alive():
-                time.sleep(0.1)
-        except KeyboardInterrupt:
-            self.stop_event.set()
-            print("\nStopping stream...")
-            if self.ws_app and self.ws_app.sock and self.ws_app.sock.connected:
-                try:
-                    self.ws_app.send(json.dumps({"type": "Terminate"}))
-                    time.sleep(1)
-                except Exception as exc:  # noqa: BLE001
-                    print(f"Error sending terminate message: {exc}")
-            if self.ws_app:
-                self.ws_app.close()
-            ws_thread.join(timeout=2.0)
-        finally:
-            self._cleanup()
+            session.app.send(json.dumps({"type": "Terminate"}))
+        except Exception as exc:  # noqa: BLE001
+            print(f"Error sending terminate message: {exc}")
+            session.app.close()
+            return False
+        closer = threading.Timer(5.0, session.app.close)
+        closer.daemon = True
+        closer.start()
+        return True
+
+    def _stream_audio(self):
+        source = self.audio_source if self.audio_source is not None else self._microphone_chunks()
+        try:
+            for audio_chunk in source:
+                if self.stop_event.is_set():
+                    return
+                for payload in self._uplink(audio_chunk):
+                    if not self._send_audio(payload):
+                        return
+        except Exception as exc:  # noqa: BLE001
+            print(f"Audio streaming error: {exc}")
+            return
+        if self.stop_event.is_set():
+            return
+        print("Audio source exhausted.")
+        self._source_done.set()
+        with self._uplink_ready:
+            session = self._active
+        if session is not None:
+            self._retire(session)
+
+    def _send_audio(self, payload) -> bool:
+        """Send to the active session, waiting while there is none; ``False`` once stopping."""
+        import websocket
+
+        with self._uplink_ready:
+            while self._active is None:
+                if self.stop_event.is_set():
+                    return False
+                self._uplink_ready.wait(0.5)
+            session = self._active
+            self.replay.append(payload)
+        # send outside the lock: a stalled socket must not block _on_close or _activate
+        try:
+            session.app.send(payload, opcode=websocket.ABNF.OPCODE_BINARY)
+        except Exception as exc:  # noqa: BLE001
+            # the payload is in the replay buffer; the supervisor reconnects and resends it
+            print(f"[ws] send on session {session.number} failed: {exc}")
+            with self._uplink_ready:
+                if self._active is session:
+                    self._active = None
+        return True
+
+    def _uplink(self, chunk: bytes) -> List[bytes]:
+        """Payloads to send for one captured chunk."""
+        payloads = self.vad.feed(chunk) if self.vad is not None else [chunk]
+        if self._encode is not None:
+            return [self._encode(payload) for payload in payloads]
+        return payloads
 
     # ------------------------------------------------------------------
     # WebSocket callbacks
     # ------------------------------------------------------------------
 
-    def _on_open(self, ws):
+    def _on_open(self, _ws):
         print("Connected to AssemblyAI streaming endpoint.")
 
-        def stream_audio():
-            while not self.stop_event.is_set():
-                try:
-                    audio_chunk = self.stream.read(FRAMES_PER_BUFFER, exception_on_overflow=False)
-                    ws.send(audio_chunk, opcode=websocket.ABNF.OPCODE_BINARY)
-                except Exception as exc:  # noqa: BLE001
-                    print(f"Audio streaming error: {exc}")
-                    break
-
-        self.audio_thread = threading.Thread(target=stream_audio, name="audio-stream", daemon=True)
-        self.audio_thread.start()
+    def _on_message(self, _ws, message, session: Optional["_Session"] = None):
+        """Receive thread: with ``offload_messages`` running, only queue the raw frame."""
+        if self._parse_stage is not None:
+            self._parse_stage.submit((session, message))
+        else:
+            self._parse_message((session, message))
 
-    def _on_message(self, _ws, message):
+    def _parse_message(self, frame: Tuple[Optional["_Session"], str]):
+        session, message = frame
         try:
             payload = json.loads(message)
         except json.JSONDecodeError:
@@ -265,39 +1322,124 @@ class WeightedStreamClient:
             session_id = payload.get("id")
             expires_at = payload.get("expires_at")
             print(f"Session started ({session_id}), expires at {datetime.fromtimestamp(expires_at)}.")
+            if session is not None:
+                session.expires_at = expires_at
+                session.begun.set()
             return
 
         if msg_type != "Turn":
             return
 
+        if self._process_stage is None:
+            self._handle_turn(session, payload)
+            return
+        # note the newest message per turn, so the process stage can skip partials it supersedes
+        self._sequence += 1
+        self._latest_message[(session.number if session is not None else 0, payload.get("turn_order"))] = self._sequence
+        self._process_stage.submit((session, payload, self._sequence))
+
+    def _process_message(self, item: Tuple[Optional["_Session"], Dict, int]):
+        session, payload, sequence = item
+        key = (session.number if session is not None else 0, payload.get("turn_order"))
+        latest = self._latest_message.get(key, sequence)
+        if latest > sequence and not payload.get("end_of_turn"):
+            self.coalesced_partials += 1
+            return
+        if latest == sequence and payload.get("end_of_turn"):
+            self._latest_message.pop(key, None)
+        self._handle_turn(session, payload)
+
+    def _handle_turn(self, session: Optional["_Session"], payload: Dict):
+        number = session.number if session is not None else 0
+        with self._turn_lock:
+            if session is not None and self._latest is not None and session.number < self._latest.number:
+                # superseded: its audio since the last final was replayed into the successor
+                return
+            if session is not None and session.replayed_after is not None:
+                transcript = strip_overlap(session.replayed_after, payload.get("transcript") or "")
+                payload = dict(payload, transcript=transcript)
+            tokens, final_text = self.turn_deltas.feed(payload, number)
+            if tokens:
+                self.tracker.ingest_tokens(tokens)
+            if final_text is not None:
+                self._last_final = final_text if final_text.strip() else self._last_final
+                if session is not None:
+                    session.replayed_after = None
+            if payload.get("end_of_turn") and session is not None and session is self._latest:
+                self.replay.commit()
+                if final_text is not None:
+                    # hand over only after the turn's last (formatted) message
+                    self._turn_ended.set()
         transcript = payload.get("transcript") or ""
         if not transcript.strip():
             return
 
-        self.tracker.ingest(transcript)
         if self.transcript_callback:
-            try:
-                self.transcript_callback(transcript.strip())
-            except Exception as exc:  # noqa: BLE001
-                print(f"[transcript callback] error: {exc}")
-        self._ingest_sentence(transcript)
+            self._callback("transcript", self.transcript_callback, transcript.strip(), sheddable=not payload.get("end_of_turn"))
+        if final_text:
+            if self.final_callback:
+                self._callback("final", self.final_callback, final_text.strip())
+            self._ingest_sentence(final_text)
+
+    def _callback(self, name: str, callback: Callable, *args, sheddable: bool = False):
+        if self.callbacks is not None:
+            self.callbacks.call(name, callback, *args, sheddable=sheddable)
+            return
+        try:
+            callback(*args)
+        except Exception as exc:  # noqa: BLE001
+            print(f"[{name} callback] error: {exc}")
+
+    def _start_dispatch(self):
+        from dispatch import CallbackExecutor, Stage
+
+        self.callbacks = CallbackExecutor("transcript-callbacks", maxsize=self.dispatch_queue_size)
+        self._process_stage = Stage(
+            "asr-process",
+            self._process_message,
+            maxsize=self.dispatch_queue_size,
+            sheddable=lambda item: not item[1].get("end_of_turn"),
+        )
+        self._parse_stage = Stage("asr-parse", self._parse_message, maxsize=4 * self.dispatch_queue_size)
+
+    def _stop_dispatch(self):
+        # drain in pipeline order so the last finals are handled before shutdown
+        for stage in (self._parse_stage, self._process_stage, self.callbacks):
+            if stage is not None:
+                stage.close()
+
+    def dispatch_stats(self) -> Dict:
+        """Queue depth, lag and shedding per stage, plus per-callback timings (empty when handled inline)."""
+        if self._parse_stage is None:
+            return {}
+        return {
+            "parse": self._parse_stage.stats(),
+            "process": self._process_stage.stats(),
+            "callbacks": self.callbacks.stats(),
+            "coalesced_partials": self.coalesced_partials,
+        }
 
     def _on_error(self, _ws, error):
+        # the session's close follows; the supervisor decides whether to reconnect
         print(f"WebSocket error: {error}")
-        self.stop_event.set()
 
-    def _on_close(self, _ws, status, msg):
+    def _on_close(self, _ws, status, msg, session: Optional["_Session"] = None):
         print(f"WebSocket closed. status={status}, msg={msg}")
-        self.stop_event.set()
-        if self.audio_thread and self.audio_thread.is_alive():
-            self.audio_thread.join(timeout=1.0)
+        if session is None:
+            return
+        session.closed.set()
+        with self._uplink_ready:
+            if self._active is session:
+                self._active = None
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
     def _cleanup(self):
+        self._stop_dispatch()
         self.stop_event.set()
+        self._keywords_changed.set()
         if self.refresh_thread and self.refresh_thread.is_alive():
             self.refresh_thread.join(timeout=1.0)
         if self.stream:
@@ -306,44 +1448,87 @@ class WeightedStreamClient:
             self.stream.close()
         if self.audio:
             self.audio.terminate()
+        close = getattr(self.audio_source, "close", None)
+        if close:
+            close()
+        self._report_audio()
         print("Clean exit.")
 
+    def _report_audio(self):
+        if self.vad is not None:
+            print(f"[vad] suppressed {self.vad.suppressed_fraction:.0%} of {self.vad.seconds:.0f}s of audio.")
+        stats = self.capture_stats()
+        if stats:
+            print(
+                f"[capture] {stats['captured_frames']} frames, {stats['dropped_frames']} dropped, "
+                f"{stats['overflows']} overflows, max queue {stats['max_queue_depth']}."
+            )
+
     def _emit_loop(self):
+        if self.emit_mode == "push":
+            self._push_loop()
+        else:
+            self._poll_loop()
+        print("Keyword emitter stopped.")
+
+    def _poll_loop(self):
         while not self.stop_event.is_set():
-            keywords = tuple(self.tracker.current_keywords())
-            snapshot = tuple(f"({word}, {weight:.2f})" for word, weight in keywords)
-            if snapshot and snapshot != self.last_printed:
-                self.last_printed = snapshot
-                formatted = ", ".join(snapshot)
-                phrase: Optional[str] = None
-                if self.daydream_enabled:
-                    phrase = self.latest_sentence_summary or self._keywords_to_phrase(keywords)
-                    if phrase:
-                        print(f"[summary] {phrase}")
-                print(f"[keywords] {formatted}")
-                if self.keyword_callback:
-                    try:
-                        self.keyword_callback(keywords)
-                    except Exception as exc:  # noqa: BLE001
-                        print(f"[keyword callback] error: {exc}")
-                if self.daydream_enabled:
-                    stream_id = self._resolve_stream_id()
-                    if not stream_id:
-                        self.stop_event.wait(self.refresh_interval)
-                        continue
-                    if not self.daydream_key:
-                        print("[daydream] unable to update stream: missing API key")
-                        self.daydream_enabled = False
-                    else:
-                        try:
-                            update_prompt(stream_id, self.daydream_key, phrase or formatted)
-                        except requests.RequestException as exc:
-                            print(f"[daydream] failed to update stream: {exc}")
-            elif not snapshot and self.last_printed:
-                self.last_printed = ()
-                print("[keywords] (listening)")
+            self.segmenter.flush_if_idle()
+            version = self.tracker.snapshot_version
+            if version != self._emitted_version:
+                self._emitted_version = version
+                self._emit(self.tracker.current_keywords())
             self.stop_event.wait(self.refresh_interval)
-        print("Keyword emitter stopped.")
+
+    def _push_loop(self):
+        while not self.stop_event.is_set():
+            self.segmenter.flush_if_idle()
+            if not self._keywords_changed.wait(self.refresh_interval):
+                continue
+            # let a burst of partials settle, and keep emissions min_emit_interval apart
+            delay = max(self.debounce_seconds, self._last_emit_at + self.min_emit_interval - time.monotonic())
+            if self.stop_event.wait(delay):
+                break
+            self._keywords_changed.clear()
+            self._emit(self.tracker.current_keywords())
+
+    def _on_keywords_changed(self, keywords: Keywords):
+        if self.change_filter.is_material(self._emitted_keywords, keywords):
+            self._keywords_changed.set()
+
+    def _emit(self, keywords: Keywords):
+        snapshot = tuple(f"({word}, {weight:.2f})" for word, weight in keywords)
+        if snapshot and snapshot != self.last_printed:
+            self.last_printed = snapshot
+            self._emitted_keywords = keywords
+            self._last_emit_at = time.monotonic()
+            formatted = ", ".join(snapshot)
+            phrase: Optional[str] = None
+            if self.daydream_enabled:
+                phrase = self.latest_sentence_summary or self._keywords_to_phrase(keywords)
+                if phrase:
+                    print(f"[summary] {phrase}")
+            print(f"[keywords] {formatted}")
+            if self.keyword_callback:
+                try:
+                    self.keyword_callback(keywords)
+                except Exception as exc:  # noqa: BLE001
+                    print(f"[keyword callback] error: {exc}")
+            if self.daydream_enabled:
+                stream_id = self._resolve_stream_id()
+                if not stream_id:
+                    return
+                if not self.daydream_key:
+                    print("[daydream] unable to update stream: missing API key")
+                    self.daydream_enabled = False
+                else:
+                    # queued off this thread; a newer prompt replaces one not yet sent
+                    dispatcher = self.dispatcher or get_dispatcher()
+                    dispatcher.submit(stream_id, self.daydream_key, phrase or formatted)
+        elif not snapshot and self.last_printed:
+            self.last_printed = ()
+            self._emitted_keywords = ()
+            print("[keywords] (listening)")
 
     def _resolve_stream_id(self) -> Optional[str]:
         if not self.daydream_enabled:
@@ -360,23 +1545,12 @@ class WeightedStreamClient:
         return None
 
     def _ingest_sentence(self, text: str):
-        fragment = text.strip()
-        if not fragment:
-            return
-        if self.pending_text:
-            self.pending_text += " "
-        self.pending_text += fragment
+        self.segmenter.append(text)
 
-        sentences = re.split(r"(?<=[.!?])\s+", self.pending_text)
-        if len(sentences) <= 1:
-            return
-
-        # keep last unfinished fragment
-        self.pending_text = sentences[-1]
-        for sentence in sentences[:-1]:
-            summary = self._sentence_summary(sentence)
-            if summary:
-                self.latest_sentence_summary = summary
+    def _on_sentence(self, sentence: str):
+        summary = self._sentence_summary(sentence)
+        if summary:
+            self.latest_sentence_summary = summary
 
     def _sentence_summary(self, sentence: str) -> str:
         words = []
@@ -396,7 +1570,7 @@ class WeightedStreamClient:
         return primary
 
     @staticmethod
-    def _keywords_to_phrase(keywords: Tuple[Tuple[str, float], ...]) -> str:
+    def _keywords_to_phrase(keywords: Keywords) -> str:
         words = []
         for word, _ in keywords:
             if len(word) <= 3:
@@ -414,21 +1588,26 @@ def update_prompt(stream_id: str, auth_key: str, prompt: str) -> None:
         raise ValueError("stream_id is required to update Daydream")
     if not auth_key:
         raise ValueError("Daydream API key missing")
-    url = f"https://api.daydream.live/v1/streams/{stream_id}"
-
-    payload = {
-        "params": {
-            # "prompt": [[keyword, weight] for keyword, weight in list(prompt.items())]
-            "prompt": prompt
-        }
-    }
-    headers = {
-        "Authorization": f"Bearer {auth_key}",
-        "Content-Type": "application/json"
-    }
+    get_dispatcher().send(stream_id, auth_key, prompt)
 
-    response = requests.patch(url, json=payload, headers=headers, timeout=10)
-    response.raise_for_status()
 
 if __name__ == "__main__":
-    WeightedStreamClient().start()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream microphone (or WAV) audio to AssemblyAI and track keywords.")
+    parser.add_argument("--wav", help="replay this 16 kHz mono PCM16 WAV file instead of the microphone")
+    parser.add_argument("--speed", type=float, default=1.0, help="WAV replay speed (1 = real time, 0 = unpaced)")
+    parser.add_argument("--vad", action="store_true", help="gate silence out of the uplink (audio_dsp.EnergyVAD)")
+    parser.add_argument("--encoding", choices=("pcm_s16le", "pcm_mulaw"), default="pcm_s16le")
+    args = parser.parse_args()
+
+    source = vad = None
+    if args.wav:
+        from wav_source import WavFileSource
+
+        source = WavFileSource(args.wav, speed=args.speed)
+    if args.vad:
+        from audio_dsp import EnergyVAD
+
+        vad = EnergyVAD()
+    WeightedStreamClient(audio_source=source, vad=vad, encoding=args.encoding).start()